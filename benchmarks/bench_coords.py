@@ -0,0 +1,58 @@
+"""
+좌표계 정규화 검증/속도 벤치마크
+poi.coords 의 기준점 역변환 검증(check_reference_points, PROJ 결과와 비교)과 TM 좌표 X/Y 축 방향 판별을
+전체 빌드(python -m poi.build) 없이 확인하고, 서울 영역 합성 TM 좌표 열의 정규화 시간을 출력한다.
+검증에 실패하면 종료 코드 1 로 끝난다.
+
+실행: python benchmarks/bench_coords.py --rows 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from poi.coords import check_reference_points, detect_swapped, normalize_coordinates  # noqa: E402
+
+# 서울 영역의 중부원점 TM(2010) 좌표 범위 (m)
+SEOUL_TM_X_RANGE = (180_000, 220_000)
+SEOUL_TM_Y_RANGE = (530_000, 570_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    problems = check_reference_points()
+    for problem in problems:
+        print(f"기준점 오차 초과: {problem}")
+
+    rng = np.random.default_rng(args.seed)
+    x = rng.uniform(*SEOUL_TM_X_RANGE, args.rows)
+    y = rng.uniform(*SEOUL_TM_Y_RANGE, args.rows)
+
+    start = time.perf_counter()
+    lng, lat, projection, swapped = normalize_coordinates(x, y)
+    elapsed = time.perf_counter() - start
+    swapped_lng, swapped_lat, swapped_projection, swapped_rows = normalize_coordinates(y, x)
+
+    # 뒤바뀐 열도 같은 좌표계로 감지되고, 모든 행이 같은 위치로 교정되어야 한다
+    if detect_swapped(x, y, "EPSG:5186") or not detect_swapped(y, x, "EPSG:5186"):
+        problems.append("축 방향 판별 실패")
+    if (projection, swapped) != ("EPSG:5186", 0) or (swapped_projection, swapped_rows) != ("EPSG:5186", args.rows):
+        problems.append(f"감지 결과 {projection}/{swapped}, 뒤바뀐 열 {swapped_projection}/{swapped_rows}")
+    elif not (np.array_equal(lat, swapped_lat) and np.array_equal(lng, swapped_lng)):
+        problems.append("뒤바뀐 열의 교정 결과가 다릅니다")
+
+    print(f"normalize_coordinates ({args.rows:,}행, 중부원점 TM): {elapsed * 1000:10.1f} ms")
+    print("검증 통과" if not problems else f"검증 실패: {'; '.join(problems)}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
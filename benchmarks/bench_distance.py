@@ -0,0 +1,50 @@
+"""
+거리 계산 정확도/속도 벤치마크
+geopy geodesic(두 점씩 파이썬 호출)과 poi.geo 의 하버사인(haversine_m), 타원체 보정 하버사인
+(distance_m)을 서울 영역 임의의 점 쌍으로 비교해 geodesic 대비 최대 오차와 처리 시간을 출력한다.
+poi.geo 문서의 오차 범위를 다시 확인할 때 쓴다.
+
+실행: python benchmarks/bench_distance.py --pairs 20000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from geopy.distance import geodesic
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from poi.geo import distance_m, haversine_m  # noqa: E402
+from synthetic import SEOUL_LAT_RANGE, SEOUL_LNG_RANGE  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    lat1, lat2 = rng.uniform(*SEOUL_LAT_RANGE, (2, args.pairs))
+    lng1, lng2 = rng.uniform(*SEOUL_LNG_RANGE, (2, args.pairs))
+
+    start = time.perf_counter()
+    reference = np.array([geodesic((a, b), (c, d)).meters for a, b, c, d in
+                          zip(lat1.tolist(), lng1.tolist(), lat2.tolist(), lng2.tolist())])
+    geodesic_s = time.perf_counter() - start
+    print(f"{'geodesic':<12} {geodesic_s * 1000:10.1f} ms")
+
+    far = reference > 100  # 상대 오차는 100m 넘는 쌍에서만
+    for name, function in (("haversine_m", haversine_m), ("distance_m", distance_m)):
+        start = time.perf_counter()
+        result = function(lat1, lng1, lat2, lng2)
+        elapsed = time.perf_counter() - start
+        error = np.abs(result - reference)
+        print(f"{name:<12} {elapsed * 1000:10.1f} ms ({geodesic_s / elapsed:,.0f}배)  "
+              f"최대 오차 {error.max():.3f} m, 최대 상대 오차 {(error[far] / reference[far]).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
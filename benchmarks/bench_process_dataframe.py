@@ -0,0 +1,125 @@
+"""
+process_dataframe 마커 생성 단계 벤치마크
+기존 iterrows 기반 행 반복 방식과 열 단위(벡터화) 방식을 합성 데이터로 비교한다.
+
+실행: python benchmarks/bench_process_dataframe.py --rows 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from poi.constants import CATEGORY_COLORS  # noqa: E402
+from poi.ingest import build_markers, process_dataframe  # noqa: E402
+from poi.table import build_info_html  # noqa: E402
+
+
+def make_synthetic_frame(rows, seed=0):
+    """asset/ 엑셀 파일과 같은 열 구성의 합성 데이터 (결측/범위 밖 좌표 포함)"""
+    rng = np.random.default_rng(seed)
+    names_ko = np.array([f"장소{i}" for i in range(rows)], dtype=object)
+    names_ko[rng.random(rows) < 0.05] = None
+    addresses = np.array([f"서울특별시 종로구 세종대로 {i}" for i in range(rows)], dtype=object)
+    addresses[rng.random(rows) < 0.2] = None
+
+    lng = rng.uniform(126.76, 127.18, rows)
+    lat = rng.uniform(37.41, 37.70, rows)
+    lng[rng.random(rows) < 0.01] = 0
+    lat[rng.random(rows) < 0.01] = 200.0
+
+    return pd.DataFrame({
+        "명칭(한국어)": names_ko,
+        "명칭(영어)": [f"Place {i}" for i in range(rows)],
+        "명칭(중국어)": [f"地点{i}" for i in range(rows)],
+        "도로명 주소": addresses,
+        "X좌표": lng,
+        "Y좌표": lat,
+    })
+
+
+def legacy_build_markers(valid_df, category, x_col, y_col, name_col=None, address_col=None):
+    """변경 전 process_dataframe의 행 단위 마커 생성 루프 (비교 기준)"""
+    markers = []
+    for idx, row in valid_df.iterrows():
+        try:
+            if name_col and pd.notna(row.get(name_col)):
+                name = str(row[name_col])
+            else:
+                name = f"{category} #{idx+1}"
+
+            lat = float(row[y_col])
+            lng = float(row[x_col])
+
+            if not (33 <= lat <= 43 and 124 <= lng <= 132):
+                continue
+
+            address = ""
+            if address_col and address_col in row and pd.notna(row[address_col]):
+                address = row[address_col]
+
+            info = build_info_html(row, name, address, category)
+            color = CATEGORY_COLORS.get(category, "gray")
+
+            markers.append({
+                'lat': lat,
+                'lng': lng,
+                'title': name,
+                'color': color,
+                'category': category,
+                'info': info,
+                'address': address
+            })
+        except Exception as e:
+            print(f"마커 생성 오류 (행 #{idx}): {e}")
+            continue
+    return markers
+
+
+def vectorized_build_markers(valid_df, category, x_col, y_col, name_col=None, address_col=None):
+    """열 단위 마커 생성 + 단일 언어 표시용 변환 (기존 루프와 같은 출력)"""
+    table = build_markers(valid_df, category, x_col, y_col, {"한국어": name_col}, {"한국어": address_col})
+    return table.markers(language="한국어")
+
+
+def timed(func, *args, repeat=3):
+    """최솟값 기준 실행 시간(초)과 마지막 결과"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    category = "종로구 관광지"
+    df = make_synthetic_frame(args.rows)
+    valid_df = df[(df["X좌표"] != 0) & (df["Y좌표"] != 0)]
+    columns = (category, "X좌표", "Y좌표", "명칭(한국어)", "도로명 주소")
+
+    legacy_time, legacy = timed(legacy_build_markers, valid_df, *columns, repeat=args.repeat)
+    vector_time, vectorized = timed(vectorized_build_markers, valid_df, *columns, repeat=args.repeat)
+    full_time, _ = timed(process_dataframe, df, category, ("한국어", "영어", "중국어"),
+                         lambda level, message: None, repeat=args.repeat)
+
+    assert legacy == vectorized, "벡터화 결과가 기존 루프와 다릅니다."
+
+    print(f"행 수: {args.rows:,} (마커 {len(vectorized):,}개)")
+    print(f"기존 iterrows 루프 : {legacy_time * 1000:10.1f} ms")
+    print(f"열 단위 build_markers: {vector_time * 1000:10.1f} ms  ({legacy_time / vector_time:.1f}배)")
+    print(f"process_dataframe 전체 (3개 언어): {full_time * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
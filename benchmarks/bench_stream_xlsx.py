@@ -0,0 +1,89 @@
+"""
+큰 xlsx 적재 벤치마크 (pd.read_excel 전체 읽기 vs openpyxl read_only 스트리밍)
+사용하지 않는 열이 많은 합성 워크북을 만들어 방식마다 새 프로세스에서 적재하고
+실행 시간과 최대 RSS 를 비교한다.
+
+실행: python benchmarks/bench_stream_xlsx.py --rows 100000 --extra-columns 20
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_dataframe import make_synthetic_frame  # noqa: E402
+from synthetic import write_workbook  # noqa: E402
+from poi.ingest import ingest_stream, process_dataframe  # noqa: E402
+
+CATEGORY = "종로구 관광지"
+LANGUAGES = ("한국어", "영어", "중국어")
+
+
+def write_synthetic_workbook(path, rows, extra_columns):
+    """합성 데이터 + 적재에 쓰이지 않는 설명 열을 가진 워크북 생성 (write_only)"""
+    df = make_synthetic_frame(rows)
+    for i in range(extra_columns):
+        df[f"설명{i}"] = [f"설명 {i}-{j} " * 4 for j in range(rows)]
+
+    write_workbook(path, df)
+
+
+def load_read_excel(path, chunk_size):
+    df = pd.read_excel(path, engine="openpyxl")
+    return process_dataframe(df, CATEGORY, LANGUAGES, lambda level, message: None)
+
+
+def load_stream(path, chunk_size):
+    markers, _ = ingest_stream(Path(path), CATEGORY, LANGUAGES, (), lambda level, message: None, chunk_size)
+    return markers
+
+
+def measure(mode, path, chunk_size, queue):
+    """자식 프로세스에서 적재 후 (시간, 최대 RSS MB, 마커 수) 전달"""
+    start = time.perf_counter()
+    markers = {"read_excel": load_read_excel, "stream": load_stream}[mode](path, chunk_size)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+    queue.put((elapsed, peak_mb, len(markers)))
+
+
+def run_isolated(mode, path, chunk_size):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(mode, path, chunk_size, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--extra-columns", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "synthetic.xlsx")
+        write_synthetic_workbook(path, args.rows, args.extra_columns)
+        size_mb = Path(path).stat().st_size / 1024 / 1024
+
+        full_time, full_peak, full_count = run_isolated("read_excel", path, args.chunk_size)
+        stream_time, stream_peak, stream_count = run_isolated("stream", path, args.chunk_size)
+
+    assert full_count == stream_count, "스트리밍 결과의 마커 수가 다릅니다."
+
+    print(f"행 수: {args.rows:,}, 열 수: {6 + args.extra_columns}, 파일 크기: {size_mb:.1f} MB (마커 {full_count:,}개)")
+    print(f"pd.read_excel 전체     : {full_time * 1000:10.1f} ms, 최대 RSS {full_peak:8.1f} MB")
+    print(f"스트리밍 ({args.chunk_size:,}행 청크): {stream_time * 1000:10.1f} ms, 최대 RSS {stream_peak:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
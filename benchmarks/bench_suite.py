@@ -0,0 +1,326 @@
+"""
+적재/렌더링 단계별 규모 벤치마크 (합성 서울 POI 1천/1만/10만 개)
+단계마다 새 프로세스에서 load_excel_files, process_dataframe, recommend_courses,
+GridIndex.nearest_per_group(내 주변 장소), GridIndex.corridor(코스 경로 주변 장소),
+reachable(이동 수단/시간별 도달 가능 장소), proximity_join(호텔별 주변 장소 집계), ClusterLevels(확대 수준별 클러스터 생성),
+write_pairwise(POI 간 거리 표 빌드), viewport_payload(화면 영역 마커/클러스터 응답), create_google_maps_html 을 실행해 실행 시간, 최대 RSS, 전달 크기를 재고 JSON 으로 저장한다.
+커밋마다 결과 파일을 남겨 두고 --compare 로 이전 결과와 비교한다.
+
+    wall_s         반복 실행 중 가장 짧은 시간(초)
+    peak_rss_mb    단계를 실행한 프로세스의 최대 RSS (데이터 준비 포함)
+    rss_growth_mb  데이터 준비가 끝난 뒤 단계 실행으로 늘어난 최대 RSS
+    html_bytes     create_google_maps_html 결과 HTML 크기 (UTF-8, 전체 마커를 담은 지도)
+    payload_bytes  viewport_payload 응답 JSON 크기 (UTF-8, 화면 영역 마커/클러스터만 담은 응답)
+    file_bytes     write_pairwise 가 쓴 거리 표 파일 크기 (전체 행렬 또는 최근접 이웃 표)
+
+실행: python benchmarks/bench_suite.py --sizes 1000 10000 100000
+      python benchmarks/bench_suite.py --compare benchmarks/results/<이전 커밋>.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_process_dataframe import make_synthetic_frame  # noqa: E402
+from synthetic import SEOUL_LAT_RANGE, SEOUL_LNG_RANGE, make_synthetic_table, write_synthetic_assets  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+LANGUAGES = ("한국어", "영어", "중국어")
+CATEGORY = "종로구 관광지"
+VIEWPORT_ZOOM = 12  # 지도 화면 영역 응답을 잴 때의 확대 수준 (서울시청 중심, 지도 페이지 첫 화면)
+# 경로 주변 질의를 잴 때의 하루 코스 (경복궁 → 서울시청 → 남산서울타워 → 잠실, 약 20km)와 폭 (m)
+CORRIDOR_ROUTE = ((37.5796, 126.9770), (37.5665, 126.9780), (37.5512, 126.9882), (37.5133, 127.1002))
+CORRIDOR_WIDTH_M = 300
+HOTELS = 400  # 호텔 주변 집계를 잴 때의 합성 호텔 수 (hotel_fin_0331_1.csv 의 좌표 있는 호텔 수와 비슷)
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024  # macOS: 바이트, Linux: KB
+
+
+def quiet(level, message):
+    pass
+
+
+def import_app():
+    """
+    Streamlit 런타임 없이 앱 모듈 가져오기
+    st 호출마다 나오는 bare mode 경고를 숨기려고 측정용 자식 프로세스의 경고 로그를 끈다.
+    """
+    logging.disable(logging.WARNING)
+    import streamlit_hotel_viewer_with_fonts as app
+    return app
+
+
+#################################################
+# 단계 정의: 이름 → (준비 함수, 실행 함수, 결과 요약 함수)
+#################################################
+
+def setup_load(pois, asset_dir):
+    return asset_dir
+
+
+def run_load(asset_dir):
+    from poi.ingest import load_excel_files
+    return load_excel_files(report=quiet, parallel=False, folder=asset_dir)
+
+
+def setup_process(pois, asset_dir):
+    return make_synthetic_frame(pois)
+
+
+def run_process(df):
+    from poi.ingest import process_dataframe
+    return process_dataframe(df, CATEGORY, LANGUAGES, quiet)
+
+
+def setup_recommend(pois, asset_dir):
+    from poi.spatial import GridIndex
+    table = make_synthetic_table(pois)
+    return import_app(), table, GridIndex(table.lat, table.lng)  # 저장소처럼 인덱스는 미리 한 번 만든다
+
+
+def run_recommend(data):
+    app, table, index = data
+    random.seed(0)
+    return app.recommend_courses(table, ["역사/문화", "맛집"], 3, spatial_index=index)
+
+
+def setup_nearby(pois, asset_dir):
+    from poi.spatial import GridIndex
+    table = make_synthetic_table(pois)
+    return table, GridIndex(table.lat, table.lng)
+
+
+def run_nearby(data):
+    table, index = data
+    return index.nearest_per_group(37.5665, 126.9780, table.category_code, 5)
+
+
+def run_corridor(data):
+    table, index = data
+    lats, lngs = zip(*CORRIDOR_ROUTE)
+    return index.corridor(lats, lngs, CORRIDOR_WIDTH_M)
+
+
+def run_reachable(data):
+    from poi.reach import reachable
+    table, index = data
+    return reachable(index, 37.5665, 126.9780, table.category_code)
+
+
+def setup_hotels(pois, asset_dir):
+    import numpy as np
+    table, index = setup_nearby(pois, asset_dir)
+    rng = np.random.default_rng(1)
+    return table, index, rng.uniform(*SEOUL_LAT_RANGE, HOTELS), rng.uniform(*SEOUL_LNG_RANGE, HOTELS)
+
+
+def run_hotels(data):
+    from poi.hotels import proximity_join
+    table, index, lat, lng = data
+    return proximity_join(lat, lng, index, table.category_code)
+
+
+def setup_viewport(pois, asset_dir):
+    from poi.cluster import ClusterLevels
+    from poi.spatial import GridIndex
+    table = make_synthetic_table(pois)
+    return table, GridIndex(table.lat, table.lng), ClusterLevels(table.lat, table.lng)  # 저장소처럼 미리 한 번 만든다
+
+
+def run_viewport(data):
+    from poi.viewport import initial_bounds, viewport_payload
+    table, index, clusters = data
+    return viewport_payload(table, index, initial_bounds(37.5665, 126.9780, VIEWPORT_ZOOM), VIEWPORT_ZOOM,
+                            clusters=clusters)
+
+
+def setup_clusters(pois, asset_dir):
+    return make_synthetic_table(pois)
+
+
+def run_clusters(table):
+    from poi.cluster import ClusterLevels
+    return ClusterLevels(table.lat, table.lng)
+
+
+def setup_pairwise(pois, asset_dir):
+    return make_synthetic_table(pois)
+
+
+def run_pairwise(table):
+    from poi.pairwise import write_pairwise
+    entry = write_pairwise(table, Path.cwd(), "bench")  # 반복마다 새 임시 작업 폴더
+    entry["file_bytes"] = sum(Path(name).stat().st_size for name in entry["files"].values())
+    return entry
+
+
+def setup_html(pois, asset_dir):
+    return import_app(), make_synthetic_table(pois)
+
+
+def run_html(data):
+    app, table = data
+    return app.create_google_maps_html("BENCHMARK_KEY", 37.5665, 126.9780, poi_table=table, poi_language="한국어")
+
+
+STAGES = {
+    "load_excel_files": (setup_load, run_load, lambda table: {"markers": len(table)}),
+    "process_dataframe": (setup_process, run_process, lambda table: {"markers": len(table)}),
+    "recommend_courses": (setup_recommend, run_recommend, lambda courses: {"courses": len(courses)}),
+    "nearest_per_group": (setup_nearby, run_nearby, lambda nearby: {"markers": sum(len(rows) for rows, _ in nearby.values())}),
+    "corridor": (setup_nearby, run_corridor, lambda corridor: {"markers": len(corridor[0])}),
+    "reachable": (setup_nearby, run_reachable,
+                  lambda reach: {"markers": max(len(band["rows"]) for bands in reach.values() for band in bands.values())}),
+    "hotel_proximity": (setup_hotels, run_hotels, lambda joined: {"markers": int(joined[0][:, :, -1].sum())}),
+    "cluster_levels": (setup_clusters, run_clusters, lambda clusters: {"markers": len(clusters)}),
+    "write_pairwise": (setup_pairwise, run_pairwise,
+                       lambda entry: {"markers": entry["rows"], "file_bytes": entry["file_bytes"]}),
+    "viewport_payload": (setup_viewport, run_viewport,
+                         lambda payload: {"markers": len(payload["rows"]), "clusters": len(payload["clusters"]),
+                                          "payload_bytes": len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))}),
+    "create_google_maps_html": (setup_html, run_html, lambda html: {"html_bytes": len(html.encode("utf-8"))}),
+}
+
+
+#################################################
+# 측정
+#################################################
+
+def measure(stage, pois, asset_dir, repeat, queue):
+    """
+    자식 프로세스에서 단계를 repeat 번 실행해 결과 사전 전달
+    반복마다 빈 임시 작업 폴더로 옮겨 실행하므로 적재 캐시(data/snapshots, 열 매핑 저장소)가
+    다음 반복이나 저장소의 data/ 폴더에 영향을 주지 않는다.
+    """
+    setup, run, summarize = STAGES[stage]
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        data = setup(pois, asset_dir)
+        baseline = peak_rss_mb()
+
+        best = float("inf")
+        output = None
+        for i in range(repeat):
+            os.chdir(tempfile.mkdtemp(prefix=f"run{i}-", dir=workdir))
+            start = time.perf_counter()
+            output = run(data)
+            best = min(best, time.perf_counter() - start)
+
+        peak = peak_rss_mb()
+        queue.put({
+            "stage": stage,
+            "pois": pois,
+            "wall_s": round(best, 6),
+            "peak_rss_mb": round(peak, 1),
+            "rss_growth_mb": round(peak - baseline, 1),
+            **summarize(output),
+        })
+
+
+def run_isolated(stage, pois, asset_dir, repeat):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(stage, pois, str(asset_dir), repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def git_revision():
+    """(짧은 커밋 해시, 작업 트리 변경 여부) - git 이 없으면 ("unknown", False)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, check=True,
+                               capture_output=True, text=True).stdout.strip() != ""
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def compare(current, baseline, baseline_path):
+    """같은 (단계, POI 수) 결과끼리 이전 결과 대비 비율 출력"""
+    previous = {(result["stage"], result["pois"]): result for result in baseline["results"]}
+
+    print(f"\n비교 기준: {baseline['commit']} ({baseline_path})")
+    for result in current["results"]:
+        before = previous.get((result["stage"], result["pois"]))
+        if before is None:
+            continue
+        ratios = []
+        for key in ("wall_s", "peak_rss_mb", "html_bytes", "payload_bytes", "file_bytes"):
+            if key in result and before.get(key):
+                ratios.append(f"{key} {result[key] / before[key]:.2f}배")
+        print(f"{result['stage']:<24} {result['pois']:>8,}  " + ", ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help=f"결과 JSON 경로 (기본: {RESULTS_DIR.name}/<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    # 결과를 같은 경로에 덮어쓸 수 있으므로 비교 기준을 먼저 읽어 둔다
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pois in args.sizes:
+            asset_dir = Path(tmp) / f"asset-{pois}"
+            if "load_excel_files" in args.stages:
+                write_synthetic_assets(asset_dir, pois)
+            for stage in args.stages:
+                result = run_isolated(stage, pois, asset_dir, args.repeat)
+                report["results"].append(result)
+                extra = ", ".join(f"{key}={result[key]:,}" for key in
+                                  ("markers", "clusters", "courses", "html_bytes", "payload_bytes", "file_bytes")
+                                  if key in result)
+                print(f"{stage:<24} {pois:>8,}  {result['wall_s'] * 1000:10.1f} ms  "
+                      f"최대 RSS {result['peak_rss_mb']:8.1f} MB (+{result['rss_growth_mb']:.1f})  {extra}")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}{'-dirty' if dirty else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if baseline is not None:
+        compare(report, baseline, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+벤치마크용 합성 서울 POI 데이터 생성
+asset/ 폴더와 같은 형식의 워크북 묶음과, 적재를 거치지 않은 MarkerTable 을 만든다.
+좌표는 서울 영역 안에서 고르게 뽑는다 (워크북에는 결측/범위 밖 좌표가 일부 섞인다).
+
+실행: python benchmarks/synthetic.py --pois 10000 --out-dir /tmp/synthetic_asset
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_dataframe import make_synthetic_frame  # noqa: E402
+from poi.constants import FILE_CATEGORIES  # noqa: E402
+from poi.table import MarkerTable  # noqa: E402
+
+# 서울 영역 (make_synthetic_frame 과 같은 범위)
+SEOUL_LAT_RANGE = (37.41, 37.70)
+SEOUL_LNG_RANGE = (126.76, 127.18)
+
+# 카테고리별 합성 워크북 이름 (detect_file_category 가 카테고리를 알아보는 키워드 포함)
+WORKBOOK_NAMES = {category: f"합성 {keywords[0]} 정보.xlsx" for category, keywords in FILE_CATEGORIES.items()}
+
+
+def write_workbook(path, df):
+    """데이터프레임을 write_only 워크북으로 저장 (pd.to_excel 보다 메모리를 적게 씀)"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        sheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(path)
+
+
+def write_synthetic_assets(folder, pois, seed=0):
+    """POI pois 개를 카테고리별 워크북으로 나눠 folder 에 저장하고 파일 경로 목록 반환"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    names = list(WORKBOOK_NAMES.values())
+    sizes = [pois // len(names) + (i < pois % len(names)) for i in range(len(names))]
+    paths = []
+    for i, (name, rows) in enumerate(zip(names, sizes)):
+        path = folder / name
+        write_workbook(path, make_synthetic_frame(rows, seed=seed + i))
+        paths.append(path)
+    return paths
+
+
+def make_synthetic_table(pois, seed=0):
+    """적재를 거치지 않은 합성 MarkerTable (모든 좌표가 서울 영역 안, 카테고리는 고르게 섞음)"""
+    rng = np.random.default_rng(seed)
+    categories = list(FILE_CATEGORIES)
+    addresses = [f"서울특별시 종로구 세종대로 {i}" for i in range(pois)]
+    return MarkerTable.from_columns(
+        rng.uniform(*SEOUL_LAT_RANGE, pois),
+        rng.uniform(*SEOUL_LNG_RANGE, pois),
+        [categories[i % len(categories)] for i in range(pois)],
+        {
+            "한국어": [f"장소{i}" for i in range(pois)],
+            "영어": [f"Place {i}" for i in range(pois)],
+            "중국어": [f"地点{i}" for i in range(pois)],
+        },
+        {"한국어": addresses, "영어": addresses, "중국어": addresses},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pois", type=int, default=10_000)
+    parser.add_argument("--out-dir", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in write_synthetic_assets(args.out_dir, args.pois, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
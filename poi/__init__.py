@@ -0,0 +1 @@
+"""서울 관광 POI 데이터 계층 (저장소, 적재, 공간 연산)"""
@@ -0,0 +1,77 @@
+"""
+POI 저장소 오프라인 빌드 (Streamlit 없이 실행)
+에셋 폴더의 원본 파일을 적재하고 검증해 버전이 붙은 저장소 파일을 만든다.
+문제는 st.error/st.warning 대신 로그로 남기며, 검증(좌표 변환 기준점 포함)에 실패하면 기존 저장소를 그대로 둔다.
+앱은 시작할 때 원본 파일 내용이 빌드 당시와 같으면 원본을 파싱하지 않고 이 파일을 읽는다.
+
+실행: python -m poi.build --asset-dir asset --out-dir data/store
+"""
+import argparse
+import logging
+import sys
+
+from poi.compiled import COMPILED_DIR, write_compiled_store
+from poi.coords import check_reference_points
+from poi.ingest import ingest_folder, log_report, report_total
+from poi.table import MarkerTable
+
+logger = logging.getLogger("poi.build")
+
+
+def build(asset_dir="asset", out_dir=COMPILED_DIR, parallel=None, strict=False):
+    """저장소를 빌드해 매니페스트 반환 (실패 시 None)"""
+    counts = {"error": 0, "warning": 0}
+
+    def report(level, message):
+        if level in counts:
+            counts[level] += 1
+        log_report(level, message)
+
+    # 좌표계 변환식을 기준점으로 먼저 검증 (틀린 변환으로 만든 저장소가 배포되지 않도록)
+    problems = check_reference_points()
+    if problems:
+        logger.error("좌표 변환 기준점 검증 실패: %s", "; ".join(problems))
+        return None
+
+    results = ingest_folder(asset_dir, report, parallel)
+    table = MarkerTable.concat(table for _, table in results)
+    report_total(table, report)
+
+    if strict and (counts["error"] or counts["warning"]):
+        logger.error("적재 중 오류 %d개, 경고 %d개가 있어 저장소를 만들지 않습니다 (--strict).",
+                     counts["error"], counts["warning"])
+        return None
+
+    try:
+        manifest = write_compiled_store(table, [(path, len(part)) for path, part in results], out_dir)
+    except ValueError as e:
+        logger.error("저장소 검증 실패: %s", e)
+        return None
+
+    logger.info("저장소 %s 작성 완료: 마커 %d개, 원본 파일 %d개 (%s)",
+                manifest["version"], manifest["rows"], len(manifest["sources"]), out_dir)
+    distances = manifest["dedup"]["distances"]
+    logger.info("POI 간 거리 표: %s (장소 %d개)", "전체 행렬" if distances["kind"] == "matrix"
+                else f"최근접 {distances['k']}개", distances["rows"])
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--asset-dir", default="asset", help="원본 파일 폴더 (기본: asset)")
+    parser.add_argument("--out-dir", default=str(COMPILED_DIR), help=f"저장소 폴더 (기본: {COMPILED_DIR})")
+    parser.add_argument("--serial", action="store_true", help="프로세스 풀 없이 순차 적재")
+    parser.add_argument("--strict", action="store_true", help="적재 중 오류/경고가 하나라도 있으면 실패")
+    parser.add_argument("-v", "--verbose", action="store_true", help="정보 메시지까지 출력")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logger.setLevel(logging.INFO)
+
+    manifest = build(args.asset_dir, args.out_dir, parallel=False if args.serial else None, strict=args.strict)
+    return 0 if manifest is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""확대 수준별 서버 측 마커 클러스터 (웹 메르카토르 4분 격자 계층)
+
+확대 수준 z 에서 화면 CELL_PX 픽셀 크기의 격자 칸 하나에 든 POI 를 한 클러스터로 묶는다.
+칸 크기가 2의 거듭제곱 픽셀이므로 z 의 칸 하나는 z+1 의 칸 네 개를 정확히 덮는다.
+가장 큰 확대 수준(MAX_ZOOM)의 칸을 먼저 묶고, 칸 번호를 한 비트씩 밀어 위 수준 클러스터를
+차례로 만든다 (supercluster 와 같은 계층, 수준마다 전체 POI 를 다시 훑지 않음).
+클러스터 좌표는 속한 POI 위경도의 평균이며, POI 가 하나뿐인 클러스터는 지도에 실제 마커로 그린다.
+MAX_ZOOM 보다 더 확대하면 클러스터 없이 모든 마커를 그린다.
+"""
+import numpy as np
+
+MIN_ZOOM = 8
+MAX_ZOOM = 18
+# 클러스터 격자 칸 크기 (화면 픽셀, 2의 거듭제곱)
+CELL_PX = 64
+# 웹 메르카토르 타일 한 장의 픽셀 크기
+TILE_SIZE = 256
+
+
+def mercator(lat, lng):
+    """위경도 → 웹 메르카토르 세계 좌표 (x, y 모두 0~1, y 는 북쪽이 0)"""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878)
+    sin = np.sin(np.radians(lat))
+    x = (np.asarray(lng, dtype=np.float64) + 180.0) / 360.0
+    y = 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * np.pi)
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+def _merge(keys, labels, count, lat_sum, lng_sum):
+    """정렬되지 않은 칸 번호별로 묶은 (칸 번호, 라벨, 개수, 위도 합, 경도 합, 묶이기 전 → 묶은 뒤 번호)"""
+    merged_keys, parent = np.unique(keys, return_inverse=True)
+    size = len(merged_keys)
+    return (merged_keys, parent[labels],
+            np.bincount(parent, count, minlength=size),
+            np.bincount(parent, lat_sum, minlength=size),
+            np.bincount(parent, lng_sum, minlength=size),
+            parent)
+
+
+class ClusterLevels:
+    """
+    확대 수준별 클러스터 (읽기 전용)
+    rows 는 클러스터링한 POI 의 테이블 행 번호(오름차순)이고, levels[z] 는
+    (labels, lat, lng, count, expansion) 이다. labels 는 rows 순서의 POI 별 클러스터 번호,
+    lat/lng/count 는 클러스터별 평균 좌표와 POI 수, expansion 은 클러스터를 눌렀을 때
+    둘 이상으로 나뉘는 가장 작은 확대 수준이다.
+    """
+    __slots__ = ("rows", "levels", "min_zoom", "max_zoom")
+
+    def __init__(self, lat, lng, rows=None, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, cell_px=CELL_PX):
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        self.rows = np.arange(len(lat), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+        self.min_zoom, self.max_zoom = min_zoom, max_zoom
+        self.levels = {}
+
+        # 가장 큰 확대 수준의 칸 좌표 (세계 한 변의 칸 수 = 2^z * TILE_SIZE / cell_px)
+        cells_per_side = float(2 ** max_zoom * TILE_SIZE // cell_px)
+        x, y = mercator(lat, lng)
+        cell_x = (x * cells_per_side).astype(np.int64)
+        cell_y = (y * cells_per_side).astype(np.int64)
+
+        ones = np.ones(len(lat))
+        keys, labels, count, lat_sum, lng_sum, _ = _merge((cell_x << 32) | cell_y, np.arange(len(lat)), ones, lat, lng)
+        expansion = np.full(len(keys), max_zoom + 1, dtype=np.int64)
+        self.levels[max_zoom] = (labels, lat_sum / np.maximum(count, 1), lng_sum / np.maximum(count, 1), count, expansion)
+
+        for zoom in range(max_zoom - 1, min_zoom - 1, -1):
+            parent_keys = ((keys >> 33) << 32) | ((keys & 0xFFFFFFFF) >> 1)
+            keys, labels, count, lat_sum, lng_sum, parent = _merge(parent_keys, labels, count, lat_sum, lng_sum)
+
+            # 자식 칸이 하나뿐이면 그 자식이 나뉘는 수준까지 건너뜀
+            children = np.bincount(parent, minlength=len(keys))
+            some_child = np.empty(len(keys), dtype=np.int64)
+            some_child[parent] = np.arange(len(parent))
+            expansion = np.where(children > 1, zoom + 1, expansion[some_child])
+            self.levels[zoom] = (labels, lat_sum / np.maximum(count, 1), lng_sum / np.maximum(count, 1), count, expansion)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"ClusterLevels(points={len(self)}, zooms={self.min_zoom}-{self.max_zoom})"
+
+    def query(self, rows, zoom):
+        """
+        화면 영역 안 테이블 행들의 (클러스터 목록, 실제 마커로 그릴 행 번호)
+        클러스터 목록은 [(클러스터 번호, 위도, 경도, POI 수, 펼침 확대 수준)] 이며 POI 수는 영역 밖을 포함한
+        전체 수이다. zoom 이 max_zoom 보다 크면 클러스터 없이 모든 행을 돌려준다.
+        rows 중 클러스터링하지 않은 행(다른 카테고리)은 제외한다.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        positions = np.searchsorted(self.rows, rows)
+        inside = positions < len(self.rows)
+        inside[inside] = self.rows[positions[inside]] == rows[inside]
+        rows, positions = rows[inside], positions[inside]
+        if zoom > self.max_zoom:
+            return [], rows
+
+        labels, lat, lng, count, expansion = self.levels[max(int(zoom), self.min_zoom)]
+        point_labels = labels[positions]
+        single = count[point_labels] == 1
+        clusters = np.unique(point_labels[~single])
+        return (list(zip(clusters.tolist(), lat[clusters].tolist(), lng[clusters].tolist(),
+                         count[clusters].astype(np.int64).tolist(), expansion[clusters].tolist())),
+                rows[single])
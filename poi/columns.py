@@ -0,0 +1,89 @@
+"""원본 파일별 열 매핑 저장소 (좌표/이름/주소 열)
+
+처음 적재에 성공한 파일의 감지 결과를 data/column_mappings.json 에 기록해 두고,
+다음 적재부터는 휴리스틱 감지 없이 기록된 열을 바로 사용한다.
+JSON 파일은 직접 고칠 수 있으며, 기록된 열이 실제 파일에 없으면 다시 감지해 덮어쓴다.
+"crs" 는 선택 항목으로, 값 범위로 구별할 수 없는 좌표계(poi.coords.PROJECTIONS 의
+서부/동부/동해원점 TM 등)를 지정할 때만 적는다. 없으면 좌표 값으로 자동 감지한다.
+"swap_xy" 도 선택 항목으로, TM 좌표의 X/Y 가 파일 전체에서 뒤바뀌어 있는지(true/false)를 지정한다.
+없으면 좌표 값으로 판별한다 (poi.coords.detect_swapped).
+
+    {
+      "format": 1,
+      "files": {
+        "<파일 이름>": {
+          "category": "체육시설",
+          "x": "X좌표", "y": "Y좌표",
+          "names": {"한국어": "명칭(한국어)", "영어": "명칭(영어)", "중국어": "명칭(중국어)"},
+          "addresses": {"한국어": "주소(한국어)", "영어": null, "중국어": null},
+          "crs": "EPSG:5185"
+        }
+      }
+    }
+"""
+import json
+from pathlib import Path
+
+from poi.snapshot import write_json
+
+REGISTRY_PATH = Path("data") / "column_mappings.json"
+REGISTRY_FORMAT = 1
+
+
+def load_registry(path=REGISTRY_PATH):
+    """{파일 이름: 열 매핑} (파일이 없거나 형식이 다르면 빈 사전)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("format") != REGISTRY_FORMAT:
+        return {}
+    return dict(data.get("files", {}))
+
+
+def save_registry(registry, path=REGISTRY_PATH):
+    """열 매핑 저장 (실패 시 False 반환, 적재는 계속)"""
+    path = Path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(path, {"format": REGISTRY_FORMAT, "files": dict(sorted(registry.items()))})
+    except OSError:
+        return False
+    return True
+
+
+def candidate_mappings(registry, file_name, category):
+    """
+    파일에 적용해 볼 매핑 목록
+    파일 이름이 같은 매핑을 먼저, 이어서 같은 카테고리(FILE_CATEGORIES 기준)의
+    다른 파일 매핑을 시도한다 (날짜가 붙은 새 판 파일 등).
+    """
+    candidates = []
+    if file_name in registry:
+        candidates.append(registry[file_name])
+    candidates.extend(mapping for name, mapping in registry.items()
+                      if name != file_name and mapping.get("category") == category)
+    return candidates
+
+
+def mapping_applies(mapping, df, languages):
+    """매핑이 요청 언어를 모두 포함하고, 기록된 열이 모두 데이터프레임에 있는지"""
+    try:
+        required = [mapping["x"], mapping["y"]]
+        optional = [mapping[key][language] for key in ("names", "addresses") for language in languages]
+    except (KeyError, TypeError):
+        return False
+    return (all(column in df.columns for column in required) and
+            all(column is None or column in df.columns for column in optional))
+
+
+def make_mapping(category, columns):
+    """detect_columns 결과를 저장소 항목으로 변환"""
+    return {
+        "category": category,
+        "x": columns["x"],
+        "y": columns["y"],
+        "names": dict(columns["names"]),
+        "addresses": dict(columns["addresses"]),
+    }
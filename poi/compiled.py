@@ -0,0 +1,262 @@
+"""오프라인으로 미리 만든 POI 저장소 파일 (python -m poi.build 로 생성)
+
+data/store/current.json 매니페스트가 현재 버전의 데이터 파일(poi-<버전>.bin)과
+빌드에 쓰인 원본 파일 목록(이름, 크기, SHA-256, 테이블 내 행 범위)을 가리킨다.
+버전은 원본 파일 내용으로 정해지므로 다른 서버에 복사해도 그대로 유효하다.
+데이터 파일은 poi.poifile 의 고정 레이아웃이며, 읽을 때 mmap 해 프로세스 간에 공유한다.
+중복 병합(poi.dedup) 결과도 함께 만들어 둔다: 정규 POI 테이블(poi-<버전>-dedup.bin, 중복이
+없으면 원본 테이블 파일을 그대로 가리킴)과 정규 POI 별 원본 행 번호(poi-<버전>-links.npy).
+정규 POI 간 거리 표(poi.pairwise: 전체 행렬 또는 최근접 이웃 표)도 같은 버전으로 만들어 둔다.
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from poi.constants import KOREA_LAT_RANGE, KOREA_LNG_RANGE, SOURCE_PATTERNS
+from poi.dedup import DEDUP_RADIUS_M, deduplicate
+from poi.pairwise import open_pairwise, write_pairwise
+from poi.poifile import open_poi_file, write_poi_file
+from poi.snapshot import content_hash, write_json
+from poi.table import CATEGORY_NAMES, MarkerTable, category_code
+
+COMPILED_DIR = Path("data") / "store"
+COMPILED_FORMAT = 3
+MANIFEST_NAME = "current.json"
+
+
+def source_files(folder, patterns=SOURCE_PATTERNS):
+    """에셋 폴더의 원본 파일 목록 (이름순)"""
+    folder = Path(folder)
+    if not folder.exists():
+        return []
+    return sorted({path for pattern in patterns for path in folder.glob(pattern)})
+
+
+def content_version(sources):
+    """원본 파일 이름과 내용 해시로 정한 버전 문자열"""
+    digest = hashlib.sha1()
+    for source in sources:
+        digest.update(f"{source['name']}|{source['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def validate_table(table):
+    """저장소 테이블 검증 - 문제 설명 목록 반환 (빈 목록이면 통과)"""
+    problems = []
+    rows = len(table)
+    if rows == 0:
+        problems.append("마커가 없습니다.")
+    if len(table.lng) != rows or len(table.category_code) != rows:
+        problems.append("좌표/카테고리 배열 길이가 다릅니다.")
+        return problems
+
+    if not (np.isfinite(table.lat).all() and np.isfinite(table.lng).all()):
+        problems.append("좌표에 NaN/무한대 값이 있습니다.")
+    outside = ~((table.lat >= KOREA_LAT_RANGE[0]) & (table.lat <= KOREA_LAT_RANGE[1]) &
+                (table.lng >= KOREA_LNG_RANGE[0]) & (table.lng <= KOREA_LNG_RANGE[1]))
+    if outside.any():
+        problems.append(f"한국 영역 밖 좌표 {int(outside.sum())}개")
+    if len(table.category_code) and int(table.category_code.max()) >= len(CATEGORY_NAMES):
+        problems.append("알 수 없는 카테고리 코드가 있습니다.")
+
+    if set(table.titles) != set(table.addresses):
+        problems.append("이름/주소 언어 목록이 다릅니다.")
+    for kind, pools in (("이름", table.titles), ("주소", table.addresses)):
+        for language, pool in pools.items():
+            offsets = pool.offsets
+            if len(pool) != rows:
+                problems.append(f"{language} {kind} 개수({len(pool)})가 마커 수와 다릅니다.")
+            elif offsets[0] != 0 or offsets[-1] != len(pool.heap) or (np.diff(offsets) < 0).any():
+                problems.append(f"{language} {kind} 오프셋이 올바르지 않습니다.")
+            else:
+                try:
+                    bytes(pool.heap).decode("utf-8")
+                except UnicodeDecodeError:
+                    problems.append(f"{language} {kind} 문자열이 UTF-8이 아닙니다.")
+    return problems
+
+
+def _unique_pools(table):
+    """테이블이 쓰는 문자열 풀 목록과 {언어: 풀 번호} (이름, 주소)"""
+    pools = []
+    index = {}
+
+    def number(pool):
+        if id(pool) not in index:
+            index[id(pool)] = len(pools)
+            pools.append(pool)
+        return index[id(pool)]
+
+    titles = {language: number(pool) for language, pool in table.titles.items()}
+    addresses = {language: number(pool) for language, pool in table.addresses.items()}
+    return pools, titles, addresses
+
+
+def _write_table(path, table):
+    """테이블을 데이터 파일로 저장하고 매니페스트 항목 반환"""
+    pools, titles, addresses = _unique_pools(table)
+    write_poi_file(path, table.lat, table.lng, table.category_code, pools)
+    return {
+        "rows": len(table),
+        "languages": list(table.titles),
+        "titles": titles,
+        "addresses": addresses,
+        "data": path.name,
+        "data_sha256": content_hash(path),
+    }
+
+
+def _open_table(out_dir, entry, categories):
+    """매니페스트 항목의 데이터 파일을 mmap 해 MarkerTable 로 (쓸 수 없으면 None)"""
+    data_path = Path(out_dir) / entry["data"]
+    try:
+        if content_hash(data_path) != entry["data_sha256"]:
+            return None
+        lat, lng, codes, pools = open_poi_file(data_path)
+    except (OSError, ValueError):
+        return None
+    if len(lat) != entry["rows"]:
+        return None
+
+    if categories != list(CATEGORY_NAMES):
+        remap = np.array([category_code(name) for name in categories], dtype=np.uint8)
+        codes = remap[codes]
+
+    return MarkerTable(lat, lng, codes,
+                       {language: pools[i] for language, i in entry["titles"].items()},
+                       {language: pools[i] for language, i in entry["addresses"].items()})
+
+
+def write_compiled_store(table, files, out_dir=COMPILED_DIR):
+    """
+    검증된 테이블을 버전이 붙은 데이터 파일로 저장하고 매니페스트를 교체
+    files 는 [(원본 파일 경로, 행 수)] 이며 테이블은 이 순서로 이어 붙인 것이어야 한다.
+    검증에 실패하면 ValueError. 새 매니페스트를 쓴 뒤 이전 데이터 파일은 지운다.
+    """
+    problems = validate_table(table)
+    if sum(rows for _, rows in files) != len(table):
+        problems.append("원본 파일별 행 수의 합이 마커 수와 다릅니다.")
+    if problems:
+        raise ValueError("; ".join(problems))
+
+    sources = []
+    start = 0
+    for path, rows in files:
+        path = Path(path)
+        sources.append({
+            "name": path.name,
+            "size": path.stat().st_size,
+            "sha256": content_hash(path),
+            "rows": [start, start + rows],
+        })
+        start += rows
+    version = content_version(sources)
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    canonical, offsets, rows = deduplicate(table)
+
+    manifest = {
+        "format": COMPILED_FORMAT,
+        "version": version,
+        "created_at": time.time(),
+        "categories": list(CATEGORY_NAMES),
+        **_write_table(out_dir / f"poi-{version}.bin", table),
+        "sources": sources,
+        "dedup": {"radius_m": DEDUP_RADIUS_M},
+    }
+    if canonical is table:
+        manifest["dedup"].update({key: manifest[key] for key in ("data", "data_sha256", "rows", "titles", "addresses")})
+    else:
+        manifest["dedup"].update(_write_table(out_dir / f"poi-{version}-dedup.bin", canonical))
+    links_path = out_dir / f"poi-{version}-links.npy"
+    np.save(links_path, np.concatenate([offsets, rows]).astype("<i8"))
+    manifest["dedup"].update({"links": links_path.name, "links_sha256": content_hash(links_path)})
+    manifest["dedup"]["distances"] = write_pairwise(canonical, out_dir, version)
+    write_json(out_dir / MANIFEST_NAME, manifest)
+
+    # 이전 데이터 파일 삭제 (mmap 중인 프로세스는 삭제 후에도 기존 매핑을 계속 쓴다)
+    for old_path in out_dir.glob("poi-*"):
+        if not old_path.name.startswith(f"poi-{version}") and old_path.suffix in (".bin", ".npy", ".npz"):
+            try:
+                old_path.unlink()
+            except OSError:
+                pass  # Windows 에서 다른 프로세스가 매핑 중인 경우
+    return manifest
+
+
+def load_manifest(out_dir=COMPILED_DIR):
+    """현재 매니페스트 (없거나 형식이 다르면 None)"""
+    try:
+        with open(Path(out_dir) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == COMPILED_FORMAT else None
+
+
+def sources_match(manifest, asset_folder):
+    """
+    에셋 폴더의 원본 파일이 빌드 당시와 같은지 (이름/크기를 먼저 비교하고 같으면 내용 해시 비교)
+    원본 파일이 하나도 없으면 원본 없이 배포된 것으로 보고 True.
+    """
+    paths = source_files(asset_folder)
+    if not paths:
+        return True
+    sources = manifest["sources"]
+    if [path.name for path in paths] != [source["name"] for source in sources]:
+        return False
+    if any(path.stat().st_size != source["size"] for path, source in zip(paths, sources)):
+        return False
+    return all(content_hash(path) == source["sha256"] for path, source in zip(paths, sources))
+
+
+def load_compiled_store(out_dir=COMPILED_DIR, asset_folder=None):
+    """
+    미리 만든 저장소를 읽어 (MarkerTable, 매니페스트, 중복 병합 결과) 반환, 쓸 수 없으면 None
+    중복 병합 결과는 poi.dedup.deduplicate 와 같은 (정규 테이블, 오프셋 배열, 원본 행 번호 배열)이다.
+    asset_folder 를 주면 원본 파일 내용이 빌드 당시와 같을 때만 사용한다.
+    카테고리 목록이 빌드 이후 바뀌었으면 카테고리 이름 기준으로 코드를 다시 매긴다.
+    """
+    manifest = load_manifest(out_dir)
+    if manifest is None:
+        return None
+    if asset_folder is not None and not sources_match(manifest, asset_folder):
+        return None
+
+    # 빌드 때 검증한 내용과 해시가 같으므로 다시 검증하지 않는다 (mmap 페이지를 복사하지 않도록)
+    table = _open_table(out_dir, manifest, manifest["categories"])
+    if table is None:
+        return None
+
+    # 중복 병합 결과도 미리 만든 것을 쓴다 (병합 반경이 바뀌었으면 다시 계산)
+    dedup = manifest["dedup"]
+    canonical = None
+    if dedup["radius_m"] == DEDUP_RADIUS_M:
+        canonical = table if dedup["data"] == manifest["data"] else _open_table(out_dir, dedup, manifest["categories"])
+    if canonical is None:
+        return table, manifest, deduplicate(table)
+
+    links_path = Path(out_dir) / dedup["links"]
+    try:
+        if content_hash(links_path) != dedup["links_sha256"]:
+            return table, manifest, deduplicate(table)
+        links = np.load(links_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return table, manifest, deduplicate(table)
+    count = dedup["rows"]
+    return table, manifest, (canonical, links[:count + 1], links[count + 1:])
+
+
+def load_pairwise(out_dir, manifest, canonical):
+    """
+    미리 만든 정규 POI 간 거리 표를 mmap 해 PairwiseDistances 로, 쓸 수 없으면 None
+    병합 반경이 바뀌어 정규 테이블을 다시 계산한 경우에는 행 번호가 맞지 않으므로 쓰지 않는다.
+    """
+    dedup = manifest["dedup"]
+    if dedup["radius_m"] != DEDUP_RADIUS_M:
+        return None
+    return open_pairwise(out_dir, dedup.get("distances"), canonical)
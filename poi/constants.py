@@ -0,0 +1,31 @@
+"""POI 데이터 계층 공통 상수"""
+
+# 지원 언어 (한 번의 적재로 모든 언어의 이름/주소를 추출)
+LANGUAGES = ("한국어", "영어", "중국어")
+
+# 카테고리별 마커 색상
+CATEGORY_COLORS = {
+    "체육시설": "blue",
+    "공연행사": "purple",
+    "관광기념품": "green",
+    "한국음식점": "orange",
+    "미술관/전시": "pink",
+    "종로구 관광지": "red",
+    "기타": "gray"
+}
+
+# 파일 분류용 카테고리 매핑 (기존 FILE_CATEGORIES는 그대로 유지)
+FILE_CATEGORIES = {
+    "체육시설": ["체육시설", "공연행사"],
+    "관광기념품": ["관광기념품", "외국인전용"],
+    "한국음식점": ["음식점", "한국음식"],
+    "미술관/전시": ["미술관", "전시"],
+    "종로구 관광지": ["종로구", "관광데이터"]
+}
+
+# 한국 영역 좌표 범위 (경도 124-132, 위도 33-43)
+KOREA_LNG_RANGE = (124, 132)
+KOREA_LAT_RANGE = (33, 43)
+
+# 에셋 폴더에서 적재하는 원본 파일 형식
+SOURCE_PATTERNS = ("*.xlsx", "*.csv")
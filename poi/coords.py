@@ -0,0 +1,246 @@
+"""좌표계 정규화 (한국 TM/UTM-K 투영 좌표 → WGS84 경위도, 뒤바뀐 축 교정)
+
+외부 라이브러리(pyproj 등) 없이 NumPy 배열 연산만으로 열 전체를 한 번에 변환한다.
+역변환은 GRS80 타원체의 횡메르카토르(Snyder, USGS PP 1395) 급수식이며, PROJ 결과와의
+차이는 원점 경선에서 경도 4도 안은 3mm, 5도 안은 1.2cm, 7도 안은 13cm 이하다
+(7도는 한국 영역 사각형 끝을 반대편 끝 원점의 TM 좌표로 나타낼 때. REFERENCE_POINTS, check_reference_points).
+GRS80 과 WGS84 의 차이는 무시할 수 있을 만큼 작다. Bessel 타원체 기반의 옛 좌표계
+(EPSG:5174 등)는 측지계 변환이 필요하므로 지원하지 않는다.
+"""
+import numpy as np
+
+from poi.constants import KOREA_LAT_RANGE, KOREA_LNG_RANGE
+
+# GRS80 타원체
+GRS80_A = 6378137.0
+GRS80_F = 1 / 298.257222101
+
+# 한국 투영 좌표계 (KGD2002, GRS80 횡메르카토르)
+PROJECTIONS = {
+    "EPSG:5179": {"label": "UTM-K", "lat0": 38.0, "lon0": 127.5, "k0": 0.9996, "x0": 1000000.0, "y0": 2000000.0},
+    "EPSG:5186": {"label": "중부원점 TM(2010)", "lat0": 38.0, "lon0": 127.0, "k0": 1.0, "x0": 200000.0, "y0": 600000.0},
+    "EPSG:5185": {"label": "서부원점 TM(2010)", "lat0": 38.0, "lon0": 125.0, "k0": 1.0, "x0": 200000.0, "y0": 600000.0},
+    "EPSG:5187": {"label": "동부원점 TM(2010)", "lat0": 38.0, "lon0": 129.0, "k0": 1.0, "x0": 200000.0, "y0": 600000.0},
+    "EPSG:5188": {"label": "동해원점 TM(2010)", "lat0": 38.0, "lon0": 131.0, "k0": 1.0, "x0": 200000.0, "y0": 600000.0},
+    "EPSG:5181": {"label": "중부원점 TM", "lat0": 38.0, "lon0": 127.0, "k0": 1.0, "x0": 200000.0, "y0": 500000.0},
+}
+WGS84 = "WGS84"
+
+# 값 범위로 자동 감지할 좌표계 (앞선 것이 우선)
+# 원점만 다른 TM 좌표계(서부/동부/동해, 구 중부원점)는 값 범위가 겹쳐 구별할 수 없으므로
+# 서울 데이터에 맞는 중부원점(2010)만 자동 감지하고, 나머지는 열 매핑의 "crs" 로 지정한다.
+AUTO_PROJECTIONS = (WGS84, "EPSG:5179", "EPSG:5186")
+# 행마다 X/Y 뒤바뀜을 교정하는 좌표계 (한국 영역에서 두 축의 값 범위가 겹치지 않아 행마다 확실히 구별된다).
+# TM 좌표계는 두 축의 값 범위가 겹쳐 뒤바뀐 좌표도 역변환하면 한국 영역 사각형 안(남해/대한해협 바다 등)에
+# 떨어지므로, 축 방향을 데이터 단위로 한 번 정해 모든 행에 적용한다 (detect_swapped).
+ROW_SWAP_PROJECTIONS = (WGS84, "EPSG:5179")
+# TM 좌표 축 방향 판별에 쓰는 대략의 육지 영역 (남, 서, 북, 동)
+LAND_BOXES = (
+    (34.0, 124.5, 43.0, 129.6),   # 한반도 본토와 서해/남해 섬
+    (33.1, 126.1, 33.6, 127.0),   # 제주도
+    (37.2, 130.7, 37.6, 131.95),  # 울릉도/독도
+)
+
+# 검증용 기준점: (이름, 위도, 경도, {좌표계: (X, Y)}) - 투영 좌표는 PROJ 9 로 계산한 값
+REFERENCE_POINTS = (
+    ("서울시청", 37.566535, 126.9779692, {"EPSG:5179": (953898.467, 1952035.979),
+                                          "EPSG:5186": (198053.647, 551888.916),
+                                          "EPSG:5181": (198053.647, 451888.916)}),
+    ("부산시청", 35.179816, 129.0750223, {"EPSG:5179": (1143414.393, 1688305.106),
+                                          "EPSG:5186": (389023.670, 289016.626),
+                                          "EPSG:5187": (206833.633, 287046.647)}),
+    ("제주도청", 33.4889, 126.4983, {"EPSG:5179": (906942.978, 1500122.428),
+                                     "EPSG:5186": (153374.576, 99585.982),
+                                     "EPSG:5185": (339249.872, 100478.107)}),
+    ("독도", 37.2426, 131.8669, {"EPSG:5179": (1387412.760, 1924915.058),
+                                 "EPSG:5188": (276919.166, 516288.862)}),
+    ("백령도", 37.9667, 124.7167, {"EPSG:5179": (755499.644, 1999960.402),
+                                   "EPSG:5185": (175105.791, 596341.691)}),
+    # 한국 영역 사각형 모서리 (UTM-K 끝, 원점에서 경도 5도/7도)
+    ("한국 영역 북동 모서리", 43.0, 132.0, {"EPSG:5179": (1366814.278, 2564834.333),
+                                           "EPSG:5186": (607741.367, 1167371.411),
+                                           "EPSG:5185": (770885.510, 1179067.268)}),
+    ("한국 영역 남서 모서리", 33.0, 124.0, {"EPSG:5179": (672961.244, 1450916.346),
+                                           "EPSG:5187": (-267508.999, 56377.241),
+                                           "EPSG:5188": (-454838.352, 67102.652)}),
+)
+# 원점 경선에서의 경도 차이(도)별 허용 오차 (m) - 모듈 설명의 오차 범위와 같은 값
+REFERENCE_TOLERANCES = ((4.0, 0.003), (5.0, 0.012), (7.0, 0.13))
+
+
+def _meridian_arc(phi, e2):
+    """적도에서 위도 phi 까지의 자오선 호 길이 (m)"""
+    e4, e6 = e2 * e2, e2 * e2 * e2
+    return GRS80_A * ((1 - e2 / 4 - 3 * e4 / 64 - 5 * e6 / 256) * phi
+                      - (3 * e2 / 8 + 3 * e4 / 32 + 45 * e6 / 1024) * np.sin(2 * phi)
+                      + (15 * e4 / 256 + 45 * e6 / 1024) * np.sin(4 * phi)
+                      - (35 * e6 / 3072) * np.sin(6 * phi))
+
+
+def tm_to_wgs84(x, y, projection):
+    """횡메르카토르 투영 좌표 배열 (X=동향, Y=북향) → (위도, 경도) 배열"""
+    params = PROJECTIONS[projection]
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    e2 = GRS80_F * (2 - GRS80_F)
+    ep2 = e2 / (1 - e2)
+    k0 = params["k0"]
+    lon0 = np.radians(params["lon0"])
+    m0 = _meridian_arc(np.radians(params["lat0"]), e2)
+
+    # 발 위도 (footpoint latitude)
+    m = m0 + (y - params["y0"]) / k0
+    mu = m / (GRS80_A * (1 - e2 / 4 - 3 * e2 ** 2 / 64 - 5 * e2 ** 3 / 256))
+    e1 = (1 - np.sqrt(1 - e2)) / (1 + np.sqrt(1 - e2))
+    phi1 = (mu + (3 * e1 / 2 - 27 * e1 ** 3 / 32) * np.sin(2 * mu)
+            + (21 * e1 ** 2 / 16 - 55 * e1 ** 4 / 32) * np.sin(4 * mu)
+            + (151 * e1 ** 3 / 96) * np.sin(6 * mu)
+            + (1097 * e1 ** 4 / 512) * np.sin(8 * mu))
+
+    sin1, cos1, tan1 = np.sin(phi1), np.cos(phi1), np.tan(phi1)
+    c1 = ep2 * cos1 ** 2
+    t1 = tan1 ** 2
+    w = 1 - e2 * sin1 ** 2
+    n1 = GRS80_A / np.sqrt(w)
+    r1 = GRS80_A * (1 - e2) / w ** 1.5
+    d = (x - params["x0"]) / (n1 * k0)
+
+    lat = phi1 - (n1 * tan1 / r1) * (d ** 2 / 2
+                                     - (5 + 3 * t1 + 10 * c1 - 4 * c1 ** 2 - 9 * ep2) * d ** 4 / 24
+                                     + (61 + 90 * t1 + 298 * c1 + 45 * t1 ** 2 - 252 * ep2 - 3 * c1 ** 2) * d ** 6 / 720)
+    lng = lon0 + (d - (1 + 2 * t1 + c1) * d ** 3 / 6
+                  + (5 - 2 * c1 + 28 * t1 - 3 * c1 ** 2 + 8 * ep2 + 24 * t1 ** 2) * d ** 5 / 120) / cos1
+    return np.degrees(lat), np.degrees(lng)
+
+
+def in_korea(lat, lng):
+    """한국 영역(KOREA_LAT_RANGE/KOREA_LNG_RANGE) 안에 있는지 (NaN 은 False)"""
+    return ((lat >= KOREA_LAT_RANGE[0]) & (lat <= KOREA_LAT_RANGE[1]) &
+            (lng >= KOREA_LNG_RANGE[0]) & (lng <= KOREA_LNG_RANGE[1]))
+
+
+def on_land(lat, lng):
+    """대략의 육지 영역(LAND_BOXES) 안에 있는지 (NaN 은 False)"""
+    inside = np.zeros(np.shape(lat), dtype=bool)
+    for south, west, north, east in LAND_BOXES:
+        inside |= (lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)
+    return inside
+
+
+def _sample(x, y, sample_size):
+    """유한한 좌표 행 중 최대 sample_size 개를 고르게 뽑은 (X, Y) 배열"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(finite) > sample_size:
+        finite = finite[np.linspace(0, len(finite) - 1, sample_size).astype(np.int64)]
+    return x[finite], y[finite]
+
+
+def _to_wgs84(x, y, projection):
+    """(위도, 경도) 배열 - 좌표계가 WGS84 이면 그대로 (X=경도, Y=위도)"""
+    if projection == WGS84:
+        return y, x
+    return tm_to_wgs84(x, y, projection)
+
+
+def detect_swapped(x, y, projection, sample_size=2000):
+    """
+    TM 좌표 데이터 전체의 X/Y 뒤바뀜 여부 - 표본을 그대로 본 결과와 뒤바꿔 본 결과 중
+    육지 영역(LAND_BOXES)에 더 많이 드는 쪽 (같으면 그대로).
+    행마다 교정하는 좌표계(ROW_SWAP_PROJECTIONS)는 항상 False.
+    """
+    if projection in ROW_SWAP_PROJECTIONS:
+        return False
+    xs, ys = _sample(x, y, sample_size)
+    straight = int(on_land(*_to_wgs84(xs, ys, projection)).sum())
+    swapped = int(on_land(*_to_wgs84(ys, xs, projection)).sum())
+    return swapped > straight
+
+
+def _convert(x, y, projection, swapped=None):
+    """
+    (위도, 경도, 유효 여부, 뒤바뀐 행 여부) 반환
+    ROW_SWAP_PROJECTIONS 는 X/Y 를 그대로 본 결과와 뒤바꿔 본 결과 중 한국 영역에 드는 쪽을 행마다 고르고,
+    TM 좌표계는 swapped(없으면 detect_swapped)로 정한 축 방향을 모든 행에 적용한다.
+    """
+    if projection not in ROW_SWAP_PROJECTIONS:
+        if swapped is None:
+            swapped = detect_swapped(x, y, projection)
+        lat, lng = _to_wgs84(y, x, projection) if swapped else _to_wgs84(x, y, projection)
+        valid = in_korea(lat, lng)
+        return lat, lng, valid, valid if swapped else np.zeros(len(x), dtype=bool)
+
+    lat, lng = _to_wgs84(x, y, projection)
+    valid = in_korea(lat, lng)
+    if valid.all():
+        return lat, lng, valid, np.zeros(len(x), dtype=bool)
+
+    swapped_lat, swapped_lng = _to_wgs84(y, x, projection)
+    swapped = ~valid & in_korea(swapped_lat, swapped_lng)
+    lat = np.where(swapped, swapped_lat, lat)
+    lng = np.where(swapped, swapped_lng, lng)
+    return lat, lng, valid | swapped, swapped
+
+
+def detect_projection(x, y, sample_size=2000):
+    """
+    값 범위로 좌표계 감지 - AUTO_PROJECTIONS 중 표본 좌표가 한국 영역에 가장 많이 드는 것
+    (X/Y 가 뒤바뀐 좌표도 유효로 센다). 유효한 좌표가 하나도 없으면 None.
+    """
+    xs, ys = _sample(x, y, sample_size)
+    if not len(xs):
+        return None
+
+    best, best_count = None, 0
+    for projection in AUTO_PROJECTIONS:
+        count = int(_convert(xs, ys, projection)[2].sum())
+        if count > best_count:
+            best, best_count = projection, count
+            if count == len(xs):
+                break
+    return best
+
+
+def normalize_coordinates(x, y, projection=None, swapped=None):
+    """
+    X/Y 좌표 열을 WGS84 (경도, 위도) 배열로 정규화
+    projection 이 없으면 detect_projection 으로 감지하고, X/Y 가 뒤바뀐 좌표를 교정한다
+    (WGS84/UTM-K 는 행마다, TM 좌표는 swapped 또는 detect_swapped 로 정한 데이터 전체의 축 방향으로).
+    반환: (경도, 위도, 좌표계 이름 또는 None, 교정한 행 수) - 변환할 수 없는 행은 한국 영역 밖 값으로 남는다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if projection is None:
+        projection = detect_projection(x, y)
+        if projection is None:
+            return x, y, None, 0
+
+    lat, lng, _, swapped_rows = _convert(x, y, projection, swapped)
+    return lng, lat, projection, int(swapped_rows.sum())
+
+
+def projection_label(projection):
+    """좌표계 표시 이름"""
+    if projection == WGS84:
+        return "WGS84 경위도"
+    return f"{PROJECTIONS[projection]['label']} ({projection})"
+
+
+def reference_tolerance_m(offset_deg):
+    """원점 경선에서 경도 offset_deg 도 떨어진 점의 허용 오차 (m, 범위 밖이면 inf)"""
+    return next((tolerance for limit, tolerance in REFERENCE_TOLERANCES if abs(offset_deg) <= limit), np.inf)
+
+
+def check_reference_points():
+    """기준점 역변환 검증 - 허용 오차(REFERENCE_TOLERANCES)를 넘는 기준점 설명 목록 (빈 목록이면 통과)"""
+    problems = []
+    for name, lat, lng, projected in REFERENCE_POINTS:
+        for projection, (x, y) in projected.items():
+            got_lat, got_lng = tm_to_wgs84(x, y, projection)
+            error_m = np.hypot((got_lat - lat) * 111320.0, (got_lng - lng) * 111320.0 * np.cos(np.radians(lat)))
+            tolerance_m = reference_tolerance_m(lng - PROJECTIONS[projection]["lon0"])
+            if not error_m <= tolerance_m:
+                problems.append(f"{name} {projection}: 오차 {float(error_m):.3f} m (허용 {tolerance_m} m)")
+    return problems
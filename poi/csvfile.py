@@ -0,0 +1,80 @@
+"""CSV 원본 파일 읽기 (인코딩 감지 결과 캐시 + pyarrow CSV 리더)"""
+import codecs
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from poi.snapshot import SNAPSHOT_DIR, source_cache_name, write_json
+from poi.xlsx import header_names
+
+# 시도할 인코딩 (서울시 공공데이터 CSV는 대부분 cp949/euc-kr 또는 BOM 있는 UTF-8)
+# utf-8-sig 는 BOM 없는 UTF-8도 읽으며, cp949 는 euc-kr 의 상위 집합이다.
+CSV_ENCODINGS = ("utf-8-sig", "cp949")
+
+
+def detect_encoding(path, encodings=CSV_ENCODINGS, chunk_size=1 << 20):
+    """파일 전체를 오류 없이 디코딩하는 첫 번째 인코딩 (없으면 None)"""
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return None
+
+
+def cached_encoding(path, cache_dir=SNAPSHOT_DIR):
+    """
+    파일 지문(크기+수정시각)별로 한 번만 인코딩을 감지하고 결과를 캐시
+    캐시는 원본 파일마다 따로(<절대 경로 해시>.encoding.json, 스냅샷 메타데이터와 같은 방식) 두므로
+    여러 프로세스가 동시에 다른 CSV 를 적재해도 서로의 기록을 덮어쓰지 않는다.
+    캐시 저장에 실패해도 감지 결과는 반환한다.
+    """
+    path = Path(path)
+    cache_path = Path(cache_dir) / f"{source_cache_name(path)}.encoding.json"
+    stat = path.stat()
+
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        entry = None
+
+    if (isinstance(entry, dict) and entry.get("source") == str(path.resolve()) and
+            entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns):
+        return entry["encoding"]
+
+    encoding = detect_encoding(path)
+    if encoding is None:
+        raise ValueError(f"'{path.name}' 파일을 지원하는 인코딩({', '.join(CSV_ENCODINGS)})으로 읽을 수 없습니다.")
+
+    entry = {"source": str(path.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "encoding": encoding}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(cache_path, entry)
+    except OSError:
+        pass
+    return encoding
+
+
+def read_csv_frame(path, cache_dir=SNAPSHOT_DIR):
+    """
+    CSV 파일을 데이터프레임으로 읽기
+    pyarrow CSV 리더(멀티스레드)를 우선 사용하고, 없으면 pd.read_csv 로 읽는다.
+    열 이름은 pd.read_csv/read_excel 과 같게 맞춘다 (빈 머리글은 'Unnamed: i').
+    """
+    encoding = cached_encoding(path, cache_dir)
+    try:
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return pd.read_csv(path, encoding=encoding)
+
+    table = pa_csv.read_csv(path, read_options=pa_csv.ReadOptions(encoding=encoding))
+    df = table.to_pandas()
+    df.columns = header_names(None if name == "" else name for name in df.columns)
+    return df
@@ -0,0 +1,173 @@
+"""원본 파일 간 중복 POI 병합
+
+같은 장소가 여러 원본 파일(한국어+영어 판과 중국어 판, 음식점과 기념품점 등)이나
+같은 파일의 여러 행(회차만 다른 행사 등)에 나오면 지도에 마커가 겹치고 추천 코스에
+같은 장소가 두 번 들어간다. 여기서는 적재가 끝난 테이블(파일별 테이블을 이어 붙인 것)의
+행을 정규 POI 로 묶는다.
+
+1. 공간 해시: 좌표를 반경 크기의 격자 칸으로 나누고, 같은 칸과 이웃 8칸만 후보로 본다.
+2. 이름 비교: 모든 언어의 이름을 정규화(NFKC, 대소문자/공백/문장부호 제거)해 어느 언어끼리든
+   하나라도 같으면 후보 쌍이 된다. 이름이 없어 만든 대체 이름('카테고리 #번호')은 비교하지 않는다.
+3. 후보 쌍 중 거리가 반경 이내인 것을 연결 요소로 묶어 정규 POI 하나로 만든다.
+
+후보 생성은 (이름, 격자 칸) 키의 조인이므로 행 수에 거의 선형으로 늘어난다.
+정규 POI 는 묶음의 첫 행(원본 순서 기준)의 좌표/카테고리를 쓰고, 언어별 이름/주소는 묶음에서
+처음 나오는 실제 값으로 채운다. 정규 POI 마다 원본 행 번호 목록을 함께 돌려준다.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from poi.geo import METERS_PER_DEGREE, haversine_m
+from poi.table import CATEGORY_NAMES, MarkerTable, StringPool
+
+# 같은 장소로 볼 최대 거리(m)
+DEDUP_RADIUS_M = 50.0
+# 이보다 짧은 정규화 이름은 비교하지 않음 (한 글자 이름끼리 우연히 같은 경우)
+MIN_NAME_LENGTH = 2
+
+_NON_WORD = re.compile(r"[\W_]+")
+_FALLBACK_NUMBER = re.compile(r" #\d+")
+
+
+def normalize_name(name):
+    """비교용 이름 (NFKC 정규화, 대소문자 무시, 공백/문장부호/깨진 문자 '?' 제거)"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", name).casefold())
+
+
+def is_fallback_title(title, category):
+    """poi.ingest.build_markers 가 이름이 없는 행에 붙인 대체 이름('카테고리 #번호')인지"""
+    return title.startswith(category) and _FALLBACK_NUMBER.fullmatch(title, len(category)) is not None
+
+
+def _name_keys(table):
+    """(행 번호 배열, 정규화 이름 코드 배열) - 행마다 언어별 이름 중 비교할 수 있는 것"""
+    categories = [CATEGORY_NAMES[code] for code in table.category_code.tolist()]
+    rows = []
+    names = []
+    pools = {id(pool): pool for pool in table.titles.values()}
+    for pool in pools.values():
+        for row, (title, category) in enumerate(zip(pool.tolist(), categories)):
+            if is_fallback_title(title, category):
+                continue
+            name = normalize_name(title)
+            if len(name) >= MIN_NAME_LENGTH:
+                rows.append(row)
+                names.append(name)
+    codes, _ = pd.factorize(pd.Series(names, dtype=object))
+    return np.asarray(rows, dtype=np.int64), codes.astype(np.int64)
+
+
+def match_pairs(table, radius_m=DEDUP_RADIUS_M):
+    """같은 장소로 보이는 행 쌍 (i < j) 배열 두 개"""
+    rows, names = _name_keys(table)
+    empty = np.empty(0, dtype=np.int64)
+    if len(rows) < 2:
+        return empty, empty
+
+    # 격자 칸 크기: 위도 방향 radius_m, 경도 방향은 가장 높은 위도에서도 radius_m 이상
+    lat, lng = table.lat[rows], table.lng[rows]
+    cell_lat = radius_m / METERS_PER_DEGREE
+    cell_lng = cell_lat / np.cos(np.radians(min(float(np.abs(lat).max()), 89.0)))
+    keys = pd.DataFrame({
+        "row": rows,
+        "name": names,
+        "cy": np.floor(lat / cell_lat).astype(np.int64),
+        "cx": np.floor(lng / cell_lng).astype(np.int64),
+    })
+
+    # 같은 이름을 가진 행이 하나뿐이면 후보가 될 수 없으므로 미리 제외
+    keys = keys[keys.duplicated("name", keep=False)]
+    if keys.empty:
+        return empty, empty
+
+    neighbours = pd.concat([keys.assign(cy=keys["cy"] + dy, cx=keys["cx"] + dx)
+                            for dy in (-1, 0, 1) for dx in (-1, 0, 1)], ignore_index=True)
+    candidates = keys.merge(neighbours, on=["name", "cy", "cx"], suffixes=("", "_other"))
+    first = candidates["row"].to_numpy()
+    second = candidates["row_other"].to_numpy()
+    forward = first < second
+    pairs = np.unique(np.stack([first[forward], second[forward]], axis=1), axis=0)
+    if not len(pairs):
+        return empty, empty
+
+    i, j = pairs[:, 0], pairs[:, 1]
+    near = haversine_m(table.lat[i], table.lng[i], table.lat[j], table.lng[j]) <= radius_m
+    return i[near], j[near]
+
+
+def connected_components(count, first, second):
+    """행 쌍으로 이어진 묶음 번호 배열 (묶음의 가장 작은 행 번호를 번호로 씀)"""
+    labels = np.arange(count, dtype=np.int64)
+    if not len(first):
+        return labels
+    while True:
+        # 쌍의 양쪽을 더 작은 번호로 맞추고, 번호를 따라가며 경로를 줄인다
+        low = np.minimum(labels[first], labels[second])
+        np.minimum.at(labels, first, low)
+        np.minimum.at(labels, second, low)
+        np.minimum.at(labels, labels[first], low)
+        np.minimum.at(labels, labels[second], low)
+        labels = labels[labels]
+        if np.array_equal(labels[first], labels[second]):
+            while not np.array_equal(labels, labels[labels]):
+                labels = labels[labels]
+            return labels
+
+
+def _is_empty(value, category):
+    """빈 주소인지"""
+    return not value
+
+
+def _first_present(values, missing, member_rows, group_starts, representatives):
+    """묶음마다 missing 이 아닌 첫 값 (없으면 대표 행의 값)"""
+    present = ~missing[member_rows]
+    positions = np.where(present, np.arange(len(member_rows)), len(member_rows))
+    first = np.minimum.reduceat(positions, group_starts)
+    found = first < len(member_rows)
+    chosen = np.where(found, member_rows[np.minimum(first, len(member_rows) - 1)], representatives)
+    return StringPool.from_strings([values[row] for row in chosen.tolist()])
+
+
+def deduplicate(table, radius_m=DEDUP_RADIUS_M):
+    """
+    중복 행을 정규 POI 로 병합
+    반환: (정규 MarkerTable, 원본 행 오프셋 배열, 원본 행 번호 배열)
+    k번째 정규 POI 의 원본 행은 rows[offsets[k]:offsets[k + 1]] 이다 (원본 순서).
+    중복이 없으면 입력 테이블을 그대로 돌려준다.
+    """
+    count = len(table)
+    first, second = match_pairs(table, radius_m)
+    labels = connected_components(count, first, second)
+
+    representatives = np.flatnonzero(labels == np.arange(count))
+    if len(representatives) == count:
+        return table, np.arange(count + 1, dtype=np.int64), np.arange(count, dtype=np.int64)
+
+    group = np.searchsorted(representatives, labels)
+    member_rows = np.argsort(group, kind="stable")
+    sizes = np.bincount(group, minlength=len(representatives))
+    offsets = np.zeros(len(representatives) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    group_starts = offsets[:-1]
+
+    categories = [CATEGORY_NAMES[code] for code in table.category_code.tolist()]
+    pools = {}
+
+    def merged(pool, is_missing):
+        key = (id(pool), is_missing)
+        if key not in pools:
+            values = pool.tolist()
+            missing = np.fromiter((is_missing(value, category) for value, category in zip(values, categories)),
+                                  dtype=bool, count=count)
+            pools[key] = _first_present(values, missing, member_rows, group_starts, representatives)
+        return pools[key]
+
+    canonical = MarkerTable(
+        table.lat[representatives], table.lng[representatives], table.category_code[representatives],
+        {language: merged(pool, is_fallback_title) for language, pool in table.titles.items()},
+        {language: merged(pool, _is_empty) for language, pool in table.addresses.items()})
+    return canonical, offsets, member_rows.astype(np.int64)
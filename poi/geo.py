@@ -0,0 +1,92 @@
+"""위경도 거리 계산 (NumPy 배열 연산)
+
+geopy 의 geodesic(타원체 측지선, Karney)을 두 점마다 파이썬에서 부르는 대신, 배열 전체를 한 번에
+계산하는 하버사인 거리를 쓴다.
+
+    haversine_m     구면(평균 반지름) 하버사인. 서울 규모(수십 km)에서 geodesic 대비 상대 오차
+                    최대 약 0.24% (남북 방향은 길게, 동서 방향은 짧게 나옴)
+    distance_m      하버사인 중심각에 두 점 중간 위도의 GRS80/WGS84 곡률 반지름(진행 방향의
+                    오일러 곡률 반지름)을 곱한 거리. 한반도 안 50km 이내에서 geodesic 대비
+                    상대 오차 1e-5 미만, 서울 안 임의의 두 점에서 절대 오차 0.5m 미만
+
+거리 표시/이동 시간/코스 추천처럼 geodesic 을 대신하는 곳은 distance_m 계열을 쓴다.
+
+    distance_m(lat, lng, lats, lngs)            한 점 → 여러 점 (브로드캐스트)
+    distance_matrix_m(lat1, lng1, lat2, lng2)   여러 점 × 여러 점 행렬
+    leg_distances_m(lats, lngs)                 경로의 연속한 두 점 사이 구간 거리
+    segment_distance_m(lat, lng, ...)           점에서 선분까지의 거리와 선분 위 가장 가까운 위치
+"""
+import numpy as np
+
+# 지구 평균 반지름 (m, IUGG)
+EARTH_RADIUS_M = 6371008.8
+# 위도 1도의 길이 (m, 근삿값)
+METERS_PER_DEGREE = 111320.0
+# 위도 1도의 가장 짧은 길이 (m, 적도의 자오선 방향) - 반경을 도 단위 영역으로 바꿀 때 영역이 모자라지 않게 씀
+MIN_METERS_PER_DEGREE_LAT = 110574.0
+
+# GRS80 타원체 (WGS84 와 mm 이하 차이)
+ELLIPSOID_A = 6378137.0
+ELLIPSOID_E2 = 0.00669438002290
+
+
+def _central_angle(lat1, lng1, lat2, lng2):
+    """하버사인 중심각 (라디안)"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """하버사인 거리(m) - 인자는 스칼라 또는 브로드캐스트 가능한 배열"""
+    return EARTH_RADIUS_M * _central_angle(lat1, lng1, lat2, lng2)
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+    """
+    타원체 곡률 반지름으로 보정한 하버사인 거리(m) - 인자는 스칼라 또는 브로드캐스트 가능한 배열
+    두 점 중간 위도에서 자오선/묘유선 곡률 반지름 M, N 을 구하고 진행 방향 α 의
+    오일러 곡률 반지름 1 / (cos²α/M + sin²α/N) 을 중심각에 곱한다.
+    """
+    lat1, lng1, lat2, lng2 = (np.asarray(value, dtype=np.float64) for value in (lat1, lng1, lat2, lng2))
+    mid_lat = np.radians((lat1 + lat2) / 2)
+    w = 1 - ELLIPSOID_E2 * np.sin(mid_lat) ** 2
+    meridian = ELLIPSOID_A * (1 - ELLIPSOID_E2) / w ** 1.5
+    prime_vertical = ELLIPSOID_A / np.sqrt(w)
+
+    north = np.radians(lat2 - lat1)
+    east = np.radians(lng2 - lng1) * np.cos(mid_lat)
+    length = north ** 2 + east ** 2
+    cos2 = np.divide(north ** 2, length, out=np.ones_like(length), where=length > 0)
+    radius = 1 / (cos2 / meridian + (1 - cos2) / prime_vertical)
+    return radius * _central_angle(lat1, lng1, lat2, lng2)
+
+
+def distance_matrix_m(lat1, lng1, lat2, lng2):
+    """첫 번째 점들(행) × 두 번째 점들(열)의 거리 행렬(m)"""
+    lat1, lng1 = np.asarray(lat1, dtype=np.float64)[:, None], np.asarray(lng1, dtype=np.float64)[:, None]
+    lat2, lng2 = np.asarray(lat2, dtype=np.float64)[None, :], np.asarray(lng2, dtype=np.float64)[None, :]
+    return distance_m(lat1, lng1, lat2, lng2)
+
+
+def leg_distances_m(lats, lngs):
+    """경로 점들의 연속 구간 거리(m) 배열 (점이 n개면 n-1개)"""
+    lats, lngs = np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64)
+    return distance_m(lats[:-1], lngs[:-1], lats[1:], lngs[1:])
+
+
+def segment_distance_m(lat, lng, lat1, lng1, lat2, lng2):
+    """
+    점 (lat, lng) 에서 선분 (lat1, lng1)-(lat2, lng2) 까지의 거리(m)와 선분 위 가장 가까운 위치 t (0~1)
+    가장 가까운 위치는 선분 중간 위도 기준의 평면(경도에 cos 을 곱한 도 단위)에서 구하고,
+    거리는 그 위치까지 distance_m 으로 잰다. 인자는 스칼라 또는 브로드캐스트 가능한 배열이다.
+    """
+    lat, lng, lat1, lng1, lat2, lng2 = (np.asarray(value, dtype=np.float64)
+                                        for value in (lat, lng, lat1, lng1, lat2, lng2))
+    scale = np.cos(np.radians((lat1 + lat2) / 2))
+    dx, dy = (lng2 - lng1) * scale, lat2 - lat1
+    length2 = dx ** 2 + dy ** 2
+    projection = (lng - lng1) * scale * dx + (lat - lat1) * dy
+    projection, length2 = np.broadcast_arrays(projection, length2)
+    t = np.clip(np.divide(projection, length2, out=np.zeros(projection.shape), where=length2 > 0), 0, 1)
+    return distance_m(lat, lng, lat1 + t * (lat2 - lat1), lng1 + t * (lng2 - lng1)), t
@@ -0,0 +1,137 @@
+"""호텔 주변 POI 집계 (호텔 × POI 공간 조인, 두 데이터 버전별 파일 캐시)
+
+호텔 파일(hotel_fin_0331_1.csv: 호텔 이름, 지역, 측면별 점수 6개, 주소, 위경도)의 호텔마다
+POI 카테고리별로 PROXIMITY_RADII_M 반경 안의 개수와 가장 가까운 거리를 미리 계산해 둔다.
+POI 저장소의 공유 공간 인덱스(poi.spatial)로 호텔마다 가장 큰 반경 질의 한 번과 카테고리별 최근접
+질의 한 번만 하므로, 호텔 수 × POI 수 전체 거리를 계산하지 않는다.
+
+결과는 data/proximity/hotel-proximity-<호텔 파일 내용 해시>-<POI 저장소 버전>.npz 에 저장하며,
+두 데이터 중 하나라도 바뀌면 파일 이름이 달라져 다시 계산한다 (이전 파일은 지움).
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+from poi.csvfile import read_csv_frame
+from poi.snapshot import content_hash
+from poi.table import CATEGORY_NAMES
+
+HOTEL_FILE = Path("hotel_fin_0331_1.csv")
+PROXIMITY_DIR = Path("data") / "proximity"
+# 호텔 파일의 측면별 점수 열
+ASPECT_COLUMNS = ("소음", "가격", "위치", "서비스", "청결", "편의시설")
+# 카테고리별 개수를 세는 반경 (m)
+PROXIMITY_RADII_M = (500, 1000, 2000)
+
+
+class HotelProximity:
+    """
+    호텔별 주변 POI 집계 표 (읽기 전용)
+    counts[호텔, 카테고리 코드, 반경 번호] 는 반경 안 POI 수, nearest[호텔, 카테고리 코드] 는 가장 가까운
+    POI 까지 거리(m, 그 카테고리 POI 가 없으면 inf)이다. 호텔 정보는 names/locations/addresses/lat/lng 와
+    aspects[호텔, ASPECT_COLUMNS 순서] 배열로 보관한다.
+    """
+    __slots__ = ("names", "locations", "addresses", "lat", "lng", "aspects", "radii", "counts", "nearest", "version")
+
+    def __init__(self, hotels, counts, nearest, radii=PROXIMITY_RADII_M, version=None):
+        self.names = hotels["names"]
+        self.locations = hotels["locations"]
+        self.addresses = hotels["addresses"]
+        self.lat = hotels["lat"]
+        self.lng = hotels["lng"]
+        self.aspects = hotels["aspects"]
+        self.radii = tuple(int(radius) for radius in radii)
+        self.counts = counts
+        self.nearest = nearest
+        self.version = version
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f"HotelProximity(hotels={len(self)}, radii={self.radii}, version={self.version})"
+
+    def neighbourhood_scores(self, radius_m, weights=None):
+        """
+        호텔별 주변 점수 - 반경 radius_m(PROXIMITY_RADII_M 중 하나) 안 카테고리별 개수의 log(1+개수) 가중합
+        weights 는 {카테고리 이름: 가중치} 이며 없으면 모든 카테고리 1.0, 없는 카테고리는 0 이다.
+        """
+        counts = self.counts[:, :, self.radii.index(int(radius_m))]
+        if weights is None:
+            vector = np.ones(counts.shape[1])
+        else:
+            vector = np.array([weights.get(name, 0.0) for name in CATEGORY_NAMES[:counts.shape[1]]])
+        return np.log1p(counts) @ vector
+
+    def rank(self, radius_m, weights=None, limit=10):
+        """주변 점수가 높은 호텔 행 번호 (같으면 파일 순서)"""
+        scores = self.neighbourhood_scores(radius_m, weights)
+        return np.argsort(-scores, kind="stable")[:limit]
+
+
+def read_hotels(path=HOTEL_FILE):
+    """호텔 파일에서 좌표가 있는 호텔만 읽어 {열 이름: 배열} 반환 (인코딩은 자동 감지, cp949)"""
+    df = read_csv_frame(path)
+    df = df[df["Latitude"].notna() & df["Longitude"].notna()]
+    return {
+        "names": df["Hotel"].astype(str).to_numpy(),
+        "locations": df["Location"].fillna("").astype(str).to_numpy(),
+        "addresses": df["주소"].fillna("").astype(str).to_numpy(),
+        "lat": df["Latitude"].to_numpy(dtype=np.float64),
+        "lng": df["Longitude"].to_numpy(dtype=np.float64),
+        "aspects": df[list(ASPECT_COLUMNS)].to_numpy(dtype=np.float64),
+    }
+
+
+def proximity_join(lat, lng, index, codes, radii=PROXIMITY_RADII_M):
+    """
+    지점(호텔)마다 카테고리별 반경 안 POI 수와 최근접 거리
+    (counts int32 [지점, 카테고리, 반경], nearest float32 [지점, 카테고리]) 반환
+    index 는 POI 좌표의 GridIndex, codes 는 POI 카테고리 코드 배열이다.
+    """
+    categories = len(CATEGORY_NAMES)
+    counts = np.zeros((len(lat), categories, len(radii)), dtype=np.int32)
+    nearest = np.full((len(lat), categories), np.inf, dtype=np.float32)
+    largest = max(radii)
+    for point, (point_lat, point_lng) in enumerate(zip(np.asarray(lat).tolist(), np.asarray(lng).tolist())):
+        rows, distances = index.within(point_lat, point_lng, largest)
+        row_codes = codes[rows]
+        for i, radius_m in enumerate(radii):
+            counts[point, :, i] = np.bincount(row_codes[distances <= radius_m], minlength=categories)[:categories]
+        for code, (_, distance) in index.nearest_per_group(point_lat, point_lng, codes, 1).items():
+            nearest[point, code] = distance[0]
+    return counts, nearest
+
+
+def load_hotel_proximity(store, path=HOTEL_FILE, cache_dir=PROXIMITY_DIR):
+    """
+    호텔별 주변 POI 집계 표 (HotelProximity)
+    호텔 파일 내용 해시와 POI 저장소 버전이 같은 캐시 파일이 있으면 읽고, 없으면 계산해 저장한다.
+    캐시 저장에 실패해도 계산 결과는 반환한다.
+    """
+    path, cache_dir = Path(path), Path(cache_dir)
+    hotels = read_hotels(path)
+    version = f"{content_hash(path)[:12]}-{store.version}"
+    cache_path = cache_dir / f"hotel-proximity-{version}.npz"
+
+    try:
+        with np.load(cache_path) as cached:
+            if tuple(cached["radii"].tolist()) == PROXIMITY_RADII_M and len(cached["counts"]) == len(hotels["names"]):
+                return HotelProximity(hotels, cached["counts"], cached["nearest"], PROXIMITY_RADII_M, version)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    table = store.table
+    counts, nearest = proximity_join(hotels["lat"], hotels["lng"], store.spatial_index, table.category_code)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, counts=counts, nearest=nearest, radii=np.array(PROXIMITY_RADII_M))
+        os.replace(tmp_path, cache_path)
+        for old_path in cache_dir.glob("hotel-proximity-*.npz"):
+            if old_path != cache_path and ".tmp" not in old_path.name:
+                old_path.unlink()
+    except OSError:
+        pass
+    return HotelProximity(hotels, counts, nearest, PROXIMITY_RADII_M, version)
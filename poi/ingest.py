@@ -0,0 +1,477 @@
+"""원본 데이터 파일을 Google Maps 마커 형식으로 변환하는 적재 단계"""
+import logging
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from poi.columns import REGISTRY_PATH, candidate_mappings, load_registry, make_mapping, mapping_applies, save_registry
+from poi.constants import FILE_CATEGORIES, KOREA_LAT_RANGE, KOREA_LNG_RANGE, LANGUAGES, SOURCE_PATTERNS
+from poi.coords import (PROJECTIONS, WGS84, detect_projection, detect_swapped, in_korea, normalize_coordinates,
+                        projection_label)
+from poi.snapshot import find_snapshot, read_source_frame
+from poi.table import MarkerTable
+from poi.xlsx import STREAM_CHUNK_ROWS, STREAM_MIN_BYTES, iter_sheet_chunks
+
+# 병렬 적재 설정 (POI_INGEST_PARALLEL=0 이면 항상 순차 처리)
+INGEST_PARALLEL = os.environ.get("POI_INGEST_PARALLEL", "1") != "0"
+INGEST_PARALLEL_MIN_FILES = 2
+INGEST_MAX_WORKERS = None  # None이면 CPU 수
+
+
+LOG_LEVELS = {
+    "error": logging.ERROR,
+    "warning": logging.WARNING,
+    "info": logging.INFO,
+    "success": logging.INFO,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def streamlit_report(level, message):
+    """적재 중 메시지를 st.error/st.warning/st.info/st.success 로 표시"""
+    import streamlit as st
+    getattr(st, level)(message)
+
+def log_report(level, message):
+    """적재 메시지를 st 대신 logging 으로 기록 (백그라운드 스레드, 명령행 도구용)"""
+    logger.log(LOG_LEVELS.get(level, logging.INFO), message)
+
+#################################################
+# 데이터 로드 함수
+#################################################
+
+def load_excel_files(report=streamlit_report, parallel=None, folder="asset"):
+    """데이터 폴더에서 Excel/CSV 파일 로드 - 모든 언어를 한 번에 추출하고, 파싱이 필요한 파일은 프로세스 풀로 병렬 처리"""
+    results = ingest_folder(folder, report, parallel)
+    all_markers = MarkerTable.concat(table for _, table in results)
+    if results:
+        report_total(all_markers, report)
+    
+    return all_markers
+
+def ingest_folder(folder="asset", report=streamlit_report, parallel=None):
+    """데이터 폴더의 원본 파일을 이름순으로 적재해 [(파일 경로, MarkerTable)] 반환"""
+    data_folder = Path(folder)
+    results = []
+    
+    # 파일이 존재하는지 확인
+    if not data_folder.exists():
+        report("error", f"데이터 폴더({data_folder})가 존재하지 않습니다.")
+        return results
+    
+    # 파일 목록 확인 (병합 순서가 실행마다 같도록 이름순 정렬)
+    excel_files = sorted({path for pattern in SOURCE_PATTERNS for path in data_folder.glob(pattern)})
+    
+    if not excel_files:
+        #st.error("Excel 파일을 찾을 수 없습니다. GitHub 저장소의 파일을 확인해주세요.")
+        report("info", f"확인할 경로: {', '.join(f'{folder}/{pattern}' for pattern in SOURCE_PATTERNS)}")
+        return results
+    
+    # 찾은 파일 목록 표시
+    #st.success(f"{len(excel_files)}개의 Excel 파일을 찾았습니다.")
+    # for file_path in excel_files:
+    #     st.info(f"파일 발견: {file_path.name}")
+    
+    # 각 파일 처리 (결과는 항상 파일 목록 순서대로 병합)
+    jobs = [(file_path, detect_file_category(file_path)) for file_path in excel_files]
+    if parallel is None:
+        parallel = INGEST_PARALLEL
+    
+    for (file_path, _), (table, messages) in zip(jobs, ingest_jobs(jobs, parallel, report)):
+        # 파일별 메시지를 순서대로 전달
+        for level, message in messages:
+            report(level, message)
+        results.append((file_path, table))
+    
+    return results
+
+def report_total(markers, report=streamlit_report):
+    """적재 결과 마커 수 보고"""
+    if not len(markers):
+        report("error", "모든 파일에서 유효한 마커를 찾을 수 없습니다.")
+    else:
+        report("success", f"총 {len(markers)}개의 마커를 성공적으로 로드했습니다.")
+
+def detect_file_category(file_path):
+    """파일 이름의 키워드로 카테고리 결정 (FILE_CATEGORIES)"""
+    file_name_lower = Path(file_path).name.lower()
+    
+    for category, keywords in FILE_CATEGORIES.items():
+        if any(keyword.lower() in file_name_lower for keyword in keywords):
+            return category
+    return "기타"
+
+def ingest_file(file_path, file_category, languages=LANGUAGES, mappings=()):
+    """
+    파일 하나를 읽어 마커로 변환 (프로세스 풀 워커에서도 실행)
+    st 호출 대신 (level, message) 목록을 모아 마커와 함께 반환한다.
+    mappings 중 이 파일에 맞는 첫 열 매핑을 쓰고, 맞는 것이 없으면 휴리스틱으로 감지한다.
+    새로 감지해 적재에 성공한 열 매핑은 세 번째 값으로 돌려준다 (없으면 None).
+    """
+    messages = []
+    
+    def report(level, message):
+        messages.append((level, message))
+    
+    markers = MarkerTable.empty()
+    learned = None
+    try:
+        # 스냅샷이 없는 큰 워크북은 전체를 읽지 않고 필요한 열만 청크 단위로 변환
+        if (Path(file_path).suffix.lower() == ".xlsx" and find_snapshot(file_path) is None and
+                Path(file_path).stat().st_size >= STREAM_MIN_BYTES):
+            # 빈 파일/유효한 마커 없음 경고는 ingest_stream 이 한 번만 남긴다
+            markers, learned = ingest_stream(file_path, file_category, languages, mappings, report)
+            return markers, messages, learned
+        
+        # 파일 로드 (지문이 같으면 컬럼형 스냅샷 사용, 바뀐 파일만 openpyxl로 파싱)
+        #st.info(f"'{file_path.name}' 파일을 '{file_category}' 카테고리로 로드 중...")
+        df = read_source_frame(file_path)
+        
+        if df.empty:
+            report("warning", f"'{file_path.name}' 파일에 데이터가 없습니다.")
+            return markers, messages, learned
+        
+        # 열 매핑 결정 (저장소에 없거나 열이 바뀐 파일만 휴리스틱 감지)
+        columns = next((mapping for mapping in mappings if mapping_applies(mapping, df, languages)), None)
+        detected = columns is None
+        if detected:
+            columns = detect_columns(df, file_category, languages, report)
+            if columns is None:
+                return markers, messages, learned
+        
+        # 데이터 전처리 및 마커 변환
+        markers = process_dataframe(df, file_category, languages, report, columns)
+        
+        if not len(markers):
+            report("warning", f"'{file_path.name}'에서 유효한 마커를 추출할 수 없습니다.")
+        elif detected:
+            learned = make_mapping(file_category, columns)
+        
+    except Exception as e:
+        report("error", f"'{file_path.name}' 파일 처리 오류: {str(e)}")
+        report("error", traceback.format_exc())
+    
+    return markers, messages, learned
+
+def ingest_stream(file_path, file_category, languages=LANGUAGES, mappings=(), report=streamlit_report,
+                  chunk_size=STREAM_CHUNK_ROWS):
+    """
+    워크북을 openpyxl read_only 모드로 스트리밍해 chunk_size 행마다 마커로 변환
+    첫 청크(모든 열)로 열 매핑을 정하고(저장소 매핑 또는 휴리스틱), 이후 청크는 매핑된 열만 읽는다.
+    스냅샷은 만들지 않는다 (전체 데이터프레임이 필요하므로).
+    빈 파일이거나 유효한 마커가 없으면 경고를 한 번 남긴다 (열 감지 실패는 detect_columns 가 보고).
+    반환: (MarkerTable, 새로 감지한 열 매핑 또는 None)
+    """
+    selected = {}
+    
+    def select_columns(first_chunk):
+        columns = next((mapping for mapping in mappings if mapping_applies(mapping, first_chunk, languages)), None)
+        selected["detected"] = columns is None
+        if columns is None:
+            columns = detect_columns(first_chunk, file_category, languages, report)
+            if columns is None:
+                return None
+        x = pd.to_numeric(first_chunk[columns["x"]], errors="coerce")
+        y = pd.to_numeric(first_chunk[columns["y"]], errors="coerce")
+        if columns.get("crs") is None:
+            # 청크마다 좌표계가 다르게 감지되지 않도록 첫 청크로 정해 둔다
+            crs = detect_projection(x, y)
+            if crs is not None:
+                if crs != WGS84:
+                    report("info", f"'{file_category}' 좌표를 {projection_label(crs)}에서 WGS84 경위도로 변환합니다.")
+                columns = {**columns, "crs": crs}
+        if columns.get("swap_xy") is None and (columns.get("crs") == WGS84 or columns.get("crs") in PROJECTIONS):
+            # TM 좌표의 X/Y 축 방향도 첫 청크로 한 번만 정한다
+            columns = {**columns, "swap_xy": detect_swapped(x, y, columns["crs"])}
+        selected["columns"] = columns
+        return [columns["x"], columns["y"], *columns["names"].values(), *columns["addresses"].values()]
+    
+    tables = [process_dataframe(chunk, file_category, languages, report, selected["columns"])
+              for chunk in iter_sheet_chunks(file_path, select_columns, chunk_size)]
+    markers = MarkerTable.concat(tables)
+    
+    if not selected:
+        report("warning", f"'{file_path.name}' 파일에 데이터가 없습니다.")
+    elif "columns" in selected and not len(markers):
+        report("warning", f"'{file_path.name}'에서 유효한 마커를 추출할 수 없습니다.")
+    learned = selected.get("detected") and len(markers)
+    return markers, (make_mapping(file_category, selected["columns"]) if learned else None)
+
+def ingest_jobs(jobs, parallel=True, report=streamlit_report, registry_path=REGISTRY_PATH):
+    """
+    (파일, 카테고리) 작업 목록을 처리해 작업 순서대로 (MarkerTable, 메시지) 목록 반환
+    스냅샷이 없는 파일이 INGEST_PARALLEL_MIN_FILES개 이상이면 openpyxl 파싱을
+    프로세스 풀로 분산하고, 스냅샷으로 읽을 수 있는 파일은 현재 프로세스에서 처리한다.
+    풀 생성/실행에 실패하면 남은 파일을 순차 처리로 전환한다.
+    열 매핑 저장소(registry_path, None이면 사용 안 함)의 매핑을 작업에 넘기고,
+    새로 감지된 매핑은 모든 작업이 끝난 뒤 현재 프로세스에서 한 번에 저장한다.
+    """
+    registry = load_registry(registry_path) if registry_path is not None else {}
+    jobs = [(file_path, file_category, LANGUAGES,
+             candidate_mappings(registry, Path(file_path).name, file_category))
+            for file_path, file_category in jobs]
+    results = [None] * len(jobs)
+    
+    pending = [i for i, job in enumerate(jobs) if find_snapshot(job[0]) is None]
+    if parallel and len(pending) >= INGEST_PARALLEL_MIN_FILES:
+        max_workers = min(len(pending), INGEST_MAX_WORKERS or os.cpu_count() or 1)
+        try:
+            # Streamlit 서버는 다중 스레드이므로 fork 대신 spawn 사용
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = {i: executor.submit(ingest_file, *jobs[i]) for i in pending}
+                for i, future in futures.items():
+                    results[i] = future.result()
+        except Exception as e:
+            report("warning", f"병렬 적재에 실패해 순차 처리로 전환합니다: {e}")
+    
+    for i, job in enumerate(jobs):
+        if results[i] is None:
+            results[i] = ingest_file(*job)
+    
+    # 새로 감지한 열 매핑 기록
+    learned = {Path(job[0]).name: result[2] for job, result in zip(jobs, results) if result[2] is not None}
+    if learned and registry_path is not None:
+        registry.update(learned)
+        if not save_registry(registry, registry_path):
+            report("warning", f"열 매핑 저장소({registry_path})를 저장하지 못했습니다.")
+    
+    return [(markers, messages) for markers, messages, _ in results]
+
+def detect_columns(df, category, languages=LANGUAGES, report=streamlit_report):
+    """
+    열 이름/값 범위 휴리스틱으로 좌표·이름·주소 열 감지 (열 매핑 저장소에 없는 파일용)
+    {"x": 열, "y": 열, "names": {언어: 열}, "addresses": {언어: 열}} 반환, 좌표 열이 없으면 None
+    """
+    # 1. X, Y 좌표 열 감지 (대소문자 및 다양한 이름 형식 지원)
+    x_candidates = [col for col in df.columns if ('x' in col.lower() or 'X' in col) and '좌표' in col]
+    y_candidates = [col for col in df.columns if ('y' in col.lower() or 'Y' in col) and '좌표' in col]
+    
+    # 중국어 좌표 열 처리
+    # if not x_candidates:
+    #     x_candidates = [col for col in df.columns if 'X坐标' in col or 'x坐标' in col]
+    # if not y_candidates:
+    #     y_candidates = [col for col in df.columns if 'Y坐标' in col or 'y坐标' in col]
+    
+    # 단순 X, Y 열 확인
+    # if not x_candidates:
+    #     x_candidates = [col for col in df.columns if col.upper() == 'X' or col.lower() == 'x']
+    # if not y_candidates:
+    #     y_candidates = [col for col in df.columns if col.upper() == 'Y' or col.lower() == 'y']
+    
+    # 경도/위도 열 확인
+    # if not x_candidates:
+    #     x_candidates = [col for col in df.columns if '경도' in col or 'longitude' in col.lower() or 'lon' in col.lower()]
+    # if not y_candidates:
+    #     y_candidates = [col for col in df.columns if '위도' in col or 'latitude' in col.lower() or 'lat' in col.lower()]
+    
+    # X, Y 좌표 열 선택
+    x_col = x_candidates[0] if x_candidates else None
+    y_col = y_candidates[0] if y_candidates else None
+    
+    # 2. X, Y 좌표 열이 없는 경우 숫자 열에서 자동 감지
+    if not x_col or not y_col:
+        report("warning", f"'{category}' 데이터에서 명시적인 X, Y 좌표 열을 찾을 수 없습니다. 숫자 열에서 자동 감지를 시도합니다.")
+        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+        
+        if len(numeric_cols) >= 2:
+            # 각 열의 값 범위를 분석하여 위경도 추정
+            for col in numeric_cols:
+                if df[col].dropna().empty:
+                    continue
+                    
+                # 열의 값 통계 확인
+                col_mean = df[col].mean()
+                col_min = df[col].min()
+                col_max = df[col].max()
+                
+                # 경도(X) 범위 확인: 한국 경도는 대략 124-132
+                if 120 <= col_mean <= 140:
+                    x_col = col
+                    report("info", f"X좌표(경도)로 '{col}' 열을 자동 감지했습니다. 범위: {col_min:.2f}~{col_max:.2f}")
+                
+                # 위도(Y) 범위 확인: 한국 위도는 대략 33-43
+                elif 30 <= col_mean <= 45:
+                    y_col = col
+                    report("info", f"Y좌표(위도)로 '{col}' 열을 자동 감지했습니다. 범위: {col_min:.2f}~{col_max:.2f}")
+    
+    # 3. 좌표 열을 여전히 못 찾은 경우 마지막 시도: 단순히 마지막 두 개의 숫자 열 사용
+    # if not x_col or not y_col:
+    #     numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    #     if len(numeric_cols) >= 2:
+    #         x_col = numeric_cols[-2]  # 뒤에서 두 번째 숫자 열
+    #         y_col = numeric_cols[-1]  # 마지막 숫자 열
+    #         st.warning(f"좌표 추정: X좌표='{x_col}', Y좌표='{y_col}' (마지막 두 숫자 열)")
+    
+    # 4. 여전히 좌표 열을 찾지 못한 경우
+    if not x_col or not y_col:
+        report("error", f"'{category}' 데이터에서 X, Y 좌표 열을 찾을 수 없습니다.")
+        report("error", f"사용 가능한 열: {', '.join(df.columns.tolist())}")
+        return None
+    
+    # 5. 언어별 이름/주소 열 결정
+    return {
+        "x": x_col,
+        "y": y_col,
+        "names": {language: get_name_column(df, category, language) for language in languages},
+        "addresses": {language: get_address_column(df, language) for language in languages},
+    }
+
+def process_dataframe(df, category, languages=LANGUAGES, report=streamlit_report, columns=None):
+    """
+    데이터프레임을 Google Maps 마커 형식으로 변환 - X, Y 좌표 처리 개선 (모든 언어 동시 추출)
+    columns는 detect_columns 형식의 열 매핑이며, 없으면 휴리스틱으로 감지한다.
+    """
+    if columns is None:
+        columns = detect_columns(df, category, languages, report)
+        if columns is None:
+            return MarkerTable.empty()
+    x_col, y_col = columns["x"], columns["y"]
+    
+    # 1. 좌표 데이터 전처리
+    #st.success(f"좌표 열 감지 성공: X='{x_col}', Y='{y_col}'")
+    
+    # NaN 값 처리 (숫자로 바꿀 수 없는 값도 NaN 으로 보고 제거)
+    x = pd.to_numeric(df[x_col], errors="coerce")
+    y = pd.to_numeric(df[y_col], errors="coerce")
+    keep = x.notna() & y.notna() & (x != 0) & (y != 0)  # 0 값 제거
+    df, x, y = df[keep], x[keep], y[keep]
+    
+    # 2. 좌표계 정규화 (WGS84 경위도 / UTM-K / TM 을 값 범위로 감지해 열 전체를 한 번에 변환)
+    projection = columns.get("crs")
+    if projection is not None and projection != WGS84 and projection not in PROJECTIONS:
+        report("warning", f"'{category}' 열 매핑의 좌표계 '{projection}'를 알 수 없어 자동 감지합니다.")
+        projection = None
+    lng, lat, detected, swapped = normalize_coordinates(x.to_numpy(dtype=float), y.to_numpy(dtype=float), projection,
+                                                        columns.get("swap_xy") if projection is not None else None)
+    if projection is None and detected not in (None, WGS84):
+        report("info", f"'{category}' 좌표를 {projection_label(detected)}에서 WGS84 경위도로 변환합니다.")
+    if swapped:
+        report("info", f"'{category}' 데이터에서 X, Y가 바뀐 좌표 {swapped}개를 교정했습니다.")
+    
+    # 한국 영역 좌표만 남김 (경도 124-132, 위도 33-43)
+    valid_coords = in_korea(lat, lng)
+    valid_df = df[valid_coords].assign(**{x_col: lng[valid_coords], y_col: lat[valid_coords]})
+    
+    if valid_df.empty:
+        report("error", f"'{category}' 데이터에 유효한 한국 영역 좌표가 없습니다.")
+        if len(df):
+            report("info", f"원본 좌표 범위: X({x.min():.2f}~{x.max():.2f}), Y({y.min():.2f}~{y.max():.2f})")
+        return MarkerTable.empty()
+    
+    # 3. 언어별 이름/주소 열
+    name_cols = {language: columns["names"].get(language) for language in languages}
+    address_cols = {language: columns["addresses"].get(language) for language in languages}
+    
+    # 4. 열 단위 연산으로 마커 테이블 일괄 생성 (모든 언어의 이름/주소를 함께 저장)
+    markers = build_markers(valid_df, category, x_col, y_col, name_cols, address_cols)
+    
+    #st.success(f"'{category}' 데이터에서 {len(markers)}개의 마커를 성공적으로 생성했습니다.")
+    return markers
+
+def build_markers(valid_df, category, x_col, y_col, name_cols=None, address_cols=None):
+    """
+    좌표가 검증된 데이터프레임을 열 단위 연산으로 MarkerTable 로 변환 (행 반복 없음)
+    name_cols/address_cols는 {언어: 열 이름} 이며, 테이블의 언어별 문자열 풀로 저장된다.
+    """
+    if valid_df.empty:
+        return MarkerTable.empty()
+    
+    # 좌표 추출 및 최종 유효성 마스크
+    lat = valid_df[y_col].to_numpy(dtype=float)  # 위도 (Y좌표)
+    lng = valid_df[x_col].to_numpy(dtype=float)  # 경도 (X좌표)
+    in_bounds = ((lat >= KOREA_LAT_RANGE[0]) & (lat <= KOREA_LAT_RANGE[1]) &
+                 (lng >= KOREA_LNG_RANGE[0]) & (lng <= KOREA_LNG_RANGE[1]))
+    if not in_bounds.all():
+        valid_df = valid_df[in_bounds]
+        lat = lat[in_bounds]
+        lng = lng[in_bounds]
+    if valid_df.empty:
+        return MarkerTable.empty()
+    
+    name_cols = name_cols or {}
+    address_cols = address_cols or {}
+    languages = list(dict.fromkeys([*name_cols, *address_cols])) or list(LANGUAGES)
+    
+    # 이름: 값이 없으면 "카테고리 #행번호"로 대체 (같은 열은 한 번만 변환)
+    fallback_names = pd.Series(valid_df.index + 1, index=valid_df.index).astype(str).radd(f"{category} #")
+    name_values = {}
+    for col in set(name_cols.values()):
+        if col:
+            names = valid_df[col]
+            name_values[col] = names.astype(object).where(names.isna(), names.astype(str)).fillna(fallback_names).tolist()
+    fallback_values = fallback_names.tolist()
+    
+    # 주소: 값이 없으면 빈 문자열
+    address_values = {}
+    for col in set(address_cols.values()):
+        if col and col in valid_df.columns:
+            address_values[col] = valid_df[col].astype(object).where(valid_df[col].notna(), "").tolist()
+    empty_values = [""] * len(valid_df)
+    
+    # 열 단위 값을 그대로 구조체 배열 테이블로 저장 (같은 열을 쓰는 언어는 문자열 풀 공유)
+    return MarkerTable.from_columns(
+        lat, lng, category,
+        {language: name_values.get(name_cols.get(language), fallback_values) for language in languages},
+        {language: address_values.get(address_cols.get(language), empty_values) for language in languages}
+    )
+
+# 이름 열 결정 함수
+def get_name_column(df, category, language):
+    """카테고리와 언어에 따른 이름 열 결정"""
+    name_candidates = []
+    
+    # 언어별 기본 후보
+    if language == "한국어":
+        name_candidates = ['명칭(한국어)', '명칭', '이름', '시설명', '관광지명', '장소명', '상호', '상호명']
+    elif language == "영어":
+        name_candidates = ['명칭(영어)', 'PLACE', 'NAME', 'TITLE', 'ENGLISH_NAME', 'name']
+    elif language == "중국어":
+        name_candidates = ['명칭(중국어)', '名称', '中文名', '名稱']
+    
+    # 카테고리별 특수 처리
+    if category == "종로구 관광지" and language == "중국어":
+        name_candidates = ['名称'] + name_candidates
+    elif category == "한국음식점":
+        if language == "한국어":
+            name_candidates = ['상호명(한글)', '상호명', '업소명'] + name_candidates
+        elif language == "영어":
+            name_candidates = ['상호명(영문)', '영문명'] + name_candidates
+        elif language == "중국어":
+            name_candidates = ['상호명(중문)', '중문명'] + name_candidates
+    
+    # 후보 열 중 존재하는 첫 번째 열 사용
+    for col in name_candidates:
+        if col in df.columns:
+            return col
+    
+    # 명칭 열이 없으면 첫 번째 문자열 열 사용
+    string_cols = [col for col in df.columns if df[col].dtype == 'object']
+    if string_cols:
+        return string_cols[0]
+    
+    return None
+
+# 주소 열 결정 함수
+def get_address_column(df, language):
+    """언어에 따른 주소 열 결정"""
+    address_candidates = []
+    
+    if language == "한국어":
+        address_candidates = ['주소(한국어)', '주소', '소재지', '도로명주소', '지번주소', '위치', 'ADDRESS']
+    elif language == "영어":
+        address_candidates = ['주소(영어)', 'ENGLISH_ADDRESS', 'address', 'location']
+    elif language == "중국어":
+        address_candidates = ['주소(중국어)', '地址', '位置', '中文地址']
+    
+    # 후보 열 중 존재하는 첫 번째 열 사용
+    for col in address_candidates:
+        if col in df.columns:
+            return col
+    
+    return None
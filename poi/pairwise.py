@@ -0,0 +1,167 @@
+"""POI 간 거리 표 (오프라인 생성, mmap 공유)
+
+정규 POI 가 MATRIX_MAX_POIS 개 이하면 전체 float32 거리 행렬(n×n, m)을 저장하고,
+그보다 많으면 POI 마다 가장 가까운 TOP_K 개 이웃의 (행 번호 int32, 거리 float32) 표를 저장한다.
+파일은 저장소 버전이 붙은 .npy 이며 (python -m poi.build 가 함께 만듦) 읽을 때 mmap 하므로
+프로세스 간에 공유되고, 조회는 배열 인덱싱이다. 이웃 표에 없는 쌍(서로 먼 POI)은
+poi.geo.distance_m 으로 계산한다.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from poi.geo import METERS_PER_DEGREE, MIN_METERS_PER_DEGREE_LAT, distance_m, distance_matrix_m
+from poi.snapshot import content_hash
+from poi.spatial import GridIndex
+
+# 전체 행렬을 만드는 최대 POI 수 (4096개면 64MB)
+MATRIX_MAX_POIS = 4096
+# 전체 행렬 대신 저장하는 POI 별 최근접 이웃 수
+TOP_K = 64
+# 행렬을 만들 때 한 번에 계산하는 행 수 (메모리 사용량 제한)
+BLOCK_ROWS = 256
+# 이웃 표를 만들 때 점들을 묶는 정사각 타일의 한 변 (m)
+TILE_M = 1000.0
+# 이웃 표를 만들 때 한 번에 만드는 거리 블록의 최대 원소 수 (메모리 사용량 제한)
+BLOCK_ELEMENTS = 1 << 22
+
+
+class PairwiseDistances:
+    """
+    POI 간 거리 조회 (읽기 전용)
+    matrix 가 있으면 전체 행렬, 없으면 neighbours/neighbour_distances 이웃 표를 쓴다.
+    """
+    __slots__ = ("lat", "lng", "matrix", "neighbours", "neighbour_distances")
+
+    def __init__(self, lat, lng, matrix=None, neighbours=None, neighbour_distances=None):
+        self.lat = lat
+        self.lng = lng
+        self.matrix = matrix
+        self.neighbours = neighbours
+        self.neighbour_distances = neighbour_distances
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __repr__(self):
+        kind = "matrix" if self.matrix is not None else f"top{self.neighbours.shape[1]}"
+        return f"PairwiseDistances(points={len(self)}, kind={kind})"
+
+    def lookup(self, row, rows):
+        """POI row 에서 POI rows 까지의 거리(m) 배열"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.matrix is not None:
+            return self.matrix[row, rows].astype(np.float64)
+
+        # 이웃 표에서 찾고, 없는 행만 직접 계산
+        neighbours = self.neighbours[row]
+        order = np.argsort(neighbours)
+        positions = np.minimum(np.searchsorted(neighbours, rows, sorter=order), len(order) - 1)
+        found = neighbours[order[positions]] == rows
+        result = np.empty(len(rows))
+        result[found] = self.neighbour_distances[row][order[positions[found]]]
+        missing = rows[~found]
+        result[~found] = distance_m(self.lat[row], self.lng[row], self.lat[missing], self.lng[missing])
+        result[rows == row] = 0.0
+        return result
+
+    def legs(self, rows):
+        """POI rows 순서로 이동할 때의 연속 구간 거리(m) 배열"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.matrix is not None:
+            return self.matrix[rows[:-1], rows[1:]].astype(np.float64)
+        return np.array([self.lookup(first, [second])[0] for first, second in zip(rows[:-1].tolist(), rows[1:].tolist())])
+
+
+def nearest_neighbours(lat, lng, k):
+    """
+    점마다 자기 자신을 뺀 최근접 k개의 (행 번호 int32, 거리 float32) 배열 - 가까운 순
+    점들을 한 변 TILE_M 의 정사각 타일로 묶고, 타일 영역을 margin 만큼 넓힌 영역의 점들과의
+    거리 블록을 한 번에 계산한다. k번째 거리가 margin 이하인 점은 답이 확정되고, 나머지 점만
+    margin 을 두 배로 늘려 다시 계산한다.
+    """
+    lat, lng = np.asarray(lat, dtype=np.float64), np.asarray(lng, dtype=np.float64)
+    index = GridIndex(lat, lng)
+    neighbours = np.empty((len(lat), k), dtype="<i4")
+    distances = np.empty((len(lat), k), dtype="<f4")
+
+    tile_lat = TILE_M / METERS_PER_DEGREE
+    tile_lng = tile_lat / np.cos(np.radians(min(float(np.abs(lat).max()), 89.0)))
+    tiles = np.floor(lat / tile_lat).astype(np.int64) * (1 << 32) + np.floor(lng / tile_lng).astype(np.int64)
+    order = np.argsort(tiles, kind="stable")
+    bounds = np.flatnonzero(np.diff(tiles[order])) + 1
+
+    for pending in np.split(order, bounds):
+        margin = index.cell_m
+        while len(pending):
+            south, north = lat[pending].min(), lat[pending].max()
+            dlat = margin / MIN_METERS_PER_DEGREE_LAT
+            dlng = dlat / max(np.cos(np.radians(min(max(abs(south), abs(north)) + dlat, 89.0))), 1e-6)
+            candidates = index.bbox(south - dlat, lng[pending].min() - dlng, north + dlat, lng[pending].max() + dlng)
+            if len(candidates) <= k:
+                margin *= 2
+                continue
+
+            unresolved = []
+            step = max(1, BLOCK_ELEMENTS // len(candidates))
+            for chunk in (pending[i:i + step] for i in range(0, len(pending), step)):
+                block = distance_matrix_m(lat[chunk], lng[chunk], lat[candidates], lng[candidates])
+                block[chunk[:, None] == candidates[None, :]] = np.inf
+                nearest = np.argpartition(block, k - 1, axis=1)[:, :k]
+                distance = np.take_along_axis(block, nearest, axis=1)
+                ranking = np.argsort(distance, axis=1, kind="stable")
+                nearest = np.take_along_axis(nearest, ranking, axis=1)
+                distance = np.take_along_axis(distance, ranking, axis=1)
+
+                done = distance[:, -1] <= margin
+                neighbours[chunk[done]] = candidates[nearest[done]]
+                distances[chunk[done]] = distance[done]
+                unresolved.append(chunk[~done])
+            pending = np.concatenate(unresolved)
+            margin *= 2
+    return neighbours, distances
+
+
+def write_pairwise(table, out_dir, version):
+    """테이블의 거리 표 파일을 저장하고 매니페스트 항목 반환"""
+    out_dir = Path(out_dir)
+    count = len(table)
+    if count <= MATRIX_MAX_POIS:
+        path = out_dir / f"poi-{version}-distances.npy"
+        matrix = np.lib.format.open_memmap(path, mode="w+", dtype="<f4", shape=(count, count))
+        for start in range(0, count, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, count)
+            matrix[start:end] = distance_matrix_m(table.lat[start:end], table.lng[start:end], table.lat, table.lng)
+        matrix.flush()
+        del matrix
+        return {"kind": "matrix", "rows": count, "files": {"matrix": path.name},
+                "sha256": {"matrix": content_hash(path)}}
+
+    # 큰 저장소: POI 마다 자기 자신을 뺀 최근접 TOP_K 개
+    k = min(TOP_K, count - 1)
+    neighbours, distances = nearest_neighbours(table.lat, table.lng, k)
+    files = {"neighbours": f"poi-{version}-neighbours.npy", "distances": f"poi-{version}-neighbour-distances.npy"}
+    np.save(out_dir / files["neighbours"], neighbours)
+    np.save(out_dir / files["distances"], distances)
+    return {"kind": "topk", "rows": count, "k": k, "files": files,
+            "sha256": {key: content_hash(out_dir / name) for key, name in files.items()}}
+
+
+def open_pairwise(out_dir, entry, table):
+    """매니페스트 항목의 거리 표를 mmap 해 PairwiseDistances 로 (쓸 수 없으면 None)"""
+    if not entry or entry.get("rows") != len(table):
+        return None
+    arrays = {}
+    try:
+        for key, name in entry["files"].items():
+            path = Path(out_dir) / name
+            if content_hash(path) != entry["sha256"][key]:
+                return None
+            arrays[key] = np.load(path, mmap_mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if entry["kind"] == "matrix":
+        return PairwiseDistances(table.lat, table.lng, matrix=arrays["matrix"])
+    return PairwiseDistances(table.lat, table.lng, neighbours=arrays["neighbours"],
+                             neighbour_distances=arrays["distances"])
@@ -0,0 +1,116 @@
+"""고정 레이아웃 바이너리 POI 파일 (mmap 으로 여러 프로세스가 공유)
+
+한 호스트에서 여러 Streamlit 서버 프로세스가 같은 파일을 mmap 하면 운영체제 페이지 캐시에
+데이터가 한 벌만 올라간다. 읽기는 mmap 위의 NumPy 뷰로 하며 복사하지 않는다.
+
+레이아웃 (리틀 엔디언, 각 구역은 64바이트 경계에 정렬):
+
+    헤더 (64바이트)
+        magic        8s   b"POIBIN\\x00\\x01"
+        format       u32  POI_FILE_FORMAT
+        reserved     u32
+        rows         u64  마커 수
+        pool_count   u32  문자열 풀 수
+        reserved     u32
+        lat_offset   u64  float64[rows]
+        lng_offset   u64  float64[rows]
+        code_offset  u64  uint8[rows]   카테고리 코드
+        pools_offset u64  풀 목록 (풀마다 u64 offsets_offset, u64 heap_offset, u64 heap_size)
+    풀마다
+        offsets      int64[rows + 1]  heap 안의 문자열 시작 위치
+        heap         bytes            UTF-8 문자열을 이어 붙인 것
+"""
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from poi.table import StringPool
+
+POI_FILE_MAGIC = b"POIBIN\x00\x01"
+POI_FILE_FORMAT = 1
+HEADER = struct.Struct("<8sIIQI4xQQQQ")
+POOL_ENTRY = struct.Struct("<QQQ")
+ALIGNMENT = 64
+
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_poi_file(path, lat, lng, category_code, pools):
+    """좌표/카테고리 배열과 문자열 풀 목록을 고정 레이아웃 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = Path(path)
+    rows = len(lat)
+    sections = []  # (위치, 바이트)
+    position = HEADER.size
+
+    def place(data):
+        nonlocal position
+        position = _align(position)
+        sections.append((position, data))
+        start = position
+        position += len(data)
+        return start
+
+    lat_offset = place(np.ascontiguousarray(lat, dtype="<f8").tobytes())
+    lng_offset = place(np.ascontiguousarray(lng, dtype="<f8").tobytes())
+    code_offset = place(np.ascontiguousarray(category_code, dtype=np.uint8).tobytes())
+    pools_offset = place(b"\0" * (POOL_ENTRY.size * len(pools)))
+
+    pool_entries = []
+    for pool in pools:
+        offsets_offset = place(np.ascontiguousarray(pool.offsets, dtype="<i8").tobytes())
+        heap = bytes(pool.heap)
+        heap_offset = place(heap)
+        pool_entries.append(POOL_ENTRY.pack(offsets_offset, heap_offset, len(heap)))
+    sections[3] = (pools_offset, b"".join(pool_entries))
+
+    header = HEADER.pack(POI_FILE_MAGIC, POI_FILE_FORMAT, 0, rows, len(pools),
+                         lat_offset, lng_offset, code_offset, pools_offset)
+
+    tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for offset, data in sections:
+            f.seek(offset)
+            f.write(data)
+        f.truncate(position)  # 마지막 구역이 빈 heap 이어도 파일 길이가 모든 오프셋을 포함하도록
+    os.replace(tmp_path, path)
+
+
+def open_poi_file(path):
+    """
+    파일을 읽기 전용으로 mmap 해 (lat, lng, category_code, [StringPool]) 반환
+    배열과 풀 heap 은 모두 mmap 위의 읽기 전용 뷰다. 형식이 맞지 않으면 ValueError.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < HEADER.size:
+        raise ValueError("POI 파일 헤더가 잘렸습니다.")
+    (magic, file_format, _, rows, pool_count, lat_offset, lng_offset,
+     code_offset, pools_offset) = HEADER.unpack_from(buffer, 0)
+    if magic != POI_FILE_MAGIC or file_format != POI_FILE_FORMAT:
+        raise ValueError("POI 파일 형식이 다릅니다.")
+
+    def view(dtype, count, offset):
+        if offset + np.dtype(dtype).itemsize * count > len(buffer):
+            raise ValueError("POI 파일이 잘렸습니다.")
+        return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+    lat = view("<f8", rows, lat_offset)
+    lng = view("<f8", rows, lng_offset)
+    category_code = view(np.uint8, rows, code_offset)
+
+    pools = []
+    heap_view = memoryview(buffer)
+    for i in range(pool_count):
+        offsets_offset, heap_offset, heap_size = POOL_ENTRY.unpack_from(buffer, pools_offset + i * POOL_ENTRY.size)
+        if heap_offset + heap_size > len(buffer):
+            raise ValueError("POI 파일이 잘렸습니다.")
+        pools.append(StringPool(heap_view[heap_offset:heap_offset + heap_size],
+                                view("<i8", rows + 1, offsets_offset)))
+    return lat, lng, category_code, pools
@@ -0,0 +1,80 @@
+"""이동 수단별 도달 가능 범위 (현재 위치에서 15/30/60분 안에 갈 수 있는 POI)
+
+도로 거리를 직선거리 × DETOUR_FACTOR 로, 이동 시간을 도로 거리 / 평균 속도로 추정한다.
+속도는 지도 페이지 내비게이션의 예상 시간과 같은 값(m/분)이다. 가장 큰 반경으로 공유 공간 인덱스에
+반경 질의(GridIndex.within, 정렬 없음)를 한 번만 하고, (이동 수단, 시간)마다 그 결과를 거리로 걸러
+나누므로 위치가 바뀔 때마다 다시 계산해도 수 ms 안에 끝난다.
+
+도달 범위 영역은 도달 가능한 POI 가 있는 격자 칸을 가로로 이어 붙인 사각형 목록으로 근사한다
+(지도에 다각형으로 그릴 때 쓰며, POI 가 없는 강/산 지역은 비어 보인다).
+"""
+import numpy as np
+
+from poi.geo import METERS_PER_DEGREE
+
+# 이동 수단별 평균 속도 (m/분)
+TRAVEL_SPEEDS = {"walking": 67, "transit": 200, "driving": 500}
+# 도로 거리 / 직선거리 (서울 시내 가정, calculate_course_route_info_with_korean_names 와 같은 값)
+DETOUR_FACTOR = 1.4
+# 도달 범위를 나누는 시간 (분)
+REACH_MINUTES = (15, 30, 60)
+# 도달 범위 영역 격자 칸 크기의 최솟값 (m)과 반경 방향 최대 칸 수 (영역 전달 크기 제한)
+REACH_CELL_M = 250.0
+REACH_GRID_CELLS = 24
+
+
+def reach_radius_m(speed, minutes, detour=DETOUR_FACTOR):
+    """평균 속도 speed(m/분)로 minutes 분 안에 갈 수 있는 직선 반경(m)"""
+    return speed * minutes / detour
+
+
+def reachable(index, lat, lng, groups=None, speeds=TRAVEL_SPEEDS, minutes=REACH_MINUTES, detour=DETOUR_FACTOR):
+    """
+    이동 수단/시간별 도달 가능한 POI
+    {이동 수단: {분: {"radius_m": 직선 반경, "rows": 행 번호(순서 없음), "distances": 직선거리,
+                     "counts": {그룹: 개수}}}}
+    index 는 공유 GridIndex, groups 는 행마다 그룹 번호(카테고리 코드 등)를 담은 정수 배열이다
+    (없으면 counts 는 빈 사전).
+    """
+    radii = {mode: {limit: reach_radius_m(speed, limit, detour) for limit in minutes} for mode, speed in speeds.items()}
+    largest = max((radius for bands in radii.values() for radius in bands.values()), default=0.0)
+    rows, distances = index.within(lat, lng, largest)
+    row_groups = None if groups is None else np.asarray(groups)[rows]
+
+    result = {}
+    for mode, bands in radii.items():
+        result[mode] = {}
+        for limit, radius_m in bands.items():
+            inside = distances <= radius_m
+            counts = {}
+            if row_groups is not None:
+                per_group = np.bincount(row_groups[inside])
+                counts = {group: int(per_group[group]) for group in np.flatnonzero(per_group).tolist()}
+            result[mode][limit] = {"radius_m": radius_m, "rows": rows[inside], "distances": distances[inside],
+                                   "counts": counts}
+    return result
+
+
+def reach_grid(lat, lng, rows_lat, rows_lng, radius_m, cells=REACH_GRID_CELLS):
+    """
+    도달 가능한 POI 가 있는 격자 칸들을 덮는 사각형 목록 [[남, 서, 북, 동], ...]
+    격자는 현재 위치를 칸 중심으로 두고, 칸 크기는 반경을 cells 칸 이하로 나누는 값(REACH_CELL_M 이상)이다.
+    같은 격자 행에서 이웃한 칸들은 사각형 하나로 합친다.
+    """
+    if not len(rows_lat):
+        return []
+    cell_lat = max(REACH_CELL_M, radius_m / cells) / METERS_PER_DEGREE
+    cell_lng = cell_lat / max(np.cos(np.radians(min(abs(lat), 89.0))), 1e-6)
+    grid_rows = np.floor((np.asarray(rows_lat) - lat) / cell_lat + 0.5).astype(np.int64)
+    grid_columns = np.floor((np.asarray(rows_lng) - lng) / cell_lng + 0.5).astype(np.int64)
+
+    # (행, 열)을 정수 하나로 묶어 중복 제거 (열은 ±2^31 안이므로 2^32 배)
+    keys = np.unique(grid_rows * (1 << 32) + grid_columns + (1 << 31))
+    grid_rows, grid_columns = keys >> 32, (keys & ((1 << 32) - 1)) - (1 << 31)
+    # 행이 바뀌거나 열이 이어지지 않는 곳에서 새 사각형 시작
+    starts = np.flatnonzero(np.concatenate([[True], (np.diff(grid_rows) != 0) | (np.diff(grid_columns) != 1)]))
+    ends = np.concatenate([starts[1:], [len(grid_rows)]]) - 1
+    south = lat + (grid_rows[starts] - 0.5) * cell_lat
+    west = lng + (grid_columns[starts] - 0.5) * cell_lng
+    east = lng + (grid_columns[ends] + 0.5) * cell_lng
+    return [[s, w, s + cell_lat, e] for s, w, e in zip(south.tolist(), west.tolist(), east.tolist())]
@@ -0,0 +1,130 @@
+"""원본 데이터 파일의 컬럼형(Parquet) 스냅샷 캐시"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# 스냅샷 저장 위치 및 형식 버전 (형식이 바뀌면 기존 스냅샷은 자동 무효화)
+SNAPSHOT_DIR = Path("data") / "snapshots"
+SNAPSHOT_FORMAT = 2
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_key(path):
+    """원본 파일의 절대 경로 (다른 폴더의 같은 이름 파일과 스냅샷을 구별하는 키)"""
+    return str(Path(path).resolve())
+
+
+def source_cache_name(path):
+    """원본 파일별 캐시 파일 이름의 공통 부분 (절대 경로 해시)"""
+    return hashlib.sha1(_source_key(path).encode("utf-8")).hexdigest()[:16]
+
+
+def _snapshot_paths(path, cache_dir):
+    """원본 파일에 대응하는 (스냅샷, 메타데이터) 경로"""
+    key = source_cache_name(path)
+    return cache_dir / f"{key}.parquet", cache_dir / f"{key}.json"
+
+
+def _load_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == SNAPSHOT_FORMAT else None
+
+
+def write_json(path, data):
+    """임시 파일에 쓴 뒤 교체 (동시 실행 중에도 깨진 파일이 보이지 않도록)"""
+    tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def find_snapshot(path, cache_dir=SNAPSHOT_DIR):
+    """
+    원본 파일의 지문(크기+수정시각+내용 해시)이 일치하는 스냅샷 경로 반환
+    크기/수정시각이 같으면 해시 계산을 생략하고, 수정시각만 바뀐 경우에는
+    내용 해시를 비교해 같으면 메타데이터만 갱신한다.
+    """
+    path = Path(path)
+    cache_dir = Path(cache_dir)
+    snapshot_path, meta_path = _snapshot_paths(path, cache_dir)
+
+    meta = _load_meta(meta_path)
+    if meta is None or meta.get("source") != _source_key(path) or not snapshot_path.exists():
+        return None
+
+    stat = path.stat()
+    if meta["size"] != stat.st_size:
+        return None
+    if meta["mtime_ns"] == stat.st_mtime_ns:
+        return snapshot_path
+
+    # 수정시각만 바뀐 경우 (복사, git checkout 등) 내용 해시로 재확인
+    if meta["sha256"] != content_hash(path):
+        return None
+    meta["mtime_ns"] = stat.st_mtime_ns
+    write_json(meta_path, meta)
+    return snapshot_path
+
+
+def write_snapshot(path, df, cache_dir=SNAPSHOT_DIR):
+    """파싱된 데이터프레임을 스냅샷으로 저장 (실패 시 False 반환, 원본 처리는 계속)"""
+    path = Path(path)
+    cache_dir = Path(cache_dir)
+    snapshot_path, meta_path = _snapshot_paths(path, cache_dir)
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        stat = path.stat()
+        tmp_path = snapshot_path.with_name(snapshot_path.name + f".{os.getpid()}.tmp")
+        df.to_parquet(tmp_path, engine="pyarrow")
+        os.replace(tmp_path, snapshot_path)
+        write_json(meta_path, {
+            "format": SNAPSHOT_FORMAT,
+            "source": _source_key(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": content_hash(path),
+            "rows": len(df),
+        })
+        return True
+    except Exception as e:
+        # pyarrow 미설치, 혼합 타입 열 등은 스냅샷 없이 진행
+        logger.warning("스냅샷 저장 실패 (%s): %s", path.name, e)
+        return False
+
+
+def read_source_frame(path, cache_dir=SNAPSHOT_DIR):
+    """스냅샷이 유효하면 스냅샷에서, 아니면 원본(xlsx는 openpyxl, csv는 pyarrow)을 읽고 스냅샷 갱신"""
+    snapshot_path = find_snapshot(path, cache_dir)
+    if snapshot_path is not None:
+        try:
+            return pd.read_parquet(snapshot_path, engine="pyarrow")
+        except Exception as e:
+            logger.warning("스냅샷 읽기 실패 (%s): %s", Path(path).name, e)
+
+    if Path(path).suffix.lower() == ".csv":
+        from poi.csvfile import read_csv_frame  # csvfile 이 이 모듈을 사용하므로 지연 import
+        df = read_csv_frame(path, cache_dir)
+    else:
+        df = pd.read_excel(path, engine='openpyxl')
+    if not df.empty:
+        write_snapshot(path, df, cache_dir)
+    return df
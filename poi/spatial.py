@@ -0,0 +1,230 @@
+"""균일 격자 공간 인덱스 (영역/반경/k-최근접/경로 주변 질의)
+
+POI 좌표를 일정한 크기(기본 250m)의 격자 칸으로 나누고, 칸 번호(행 우선) 순으로 정렬한
+행 번호 배열 하나와 정렬된 칸 번호 배열을 보관한다. 한 격자 행 안에서 연속한 칸들은 정렬된
+배열에서도 연속 구간이므로, 질의 영역이 걸치는 격자 행마다 이진 탐색 두 번으로 후보를 모은다.
+빈 칸은 저장하지 않으므로 메모리는 POI 수에만 비례한다.
+
+저장소 버전마다 한 번만 만들어 지도/코스/검색 기능이 함께 쓴다 (POIStore.spatial_index).
+"""
+import numpy as np
+
+from poi.geo import METERS_PER_DEGREE, MIN_METERS_PER_DEGREE_LAT, distance_m, segment_distance_m
+
+GRID_CELL_M = 250.0
+# nearest_per_group 에서 반경 탐색 대신 직접 거리를 계산하는 그룹 크기 상한
+SMALL_GROUP = 4096
+# corridor 에서 구간을 나누는 조각 길이의 최솟값 (m, 실제로는 폭의 두 배와 칸 크기 중 큰 값)
+CORRIDOR_PIECE_M = 250.0
+
+
+class GridIndex:
+    """
+    위경도 배열에 대한 읽기 전용 격자 인덱스
+    질의 결과는 모두 원본 배열의 행 번호(int64 배열)이다.
+    """
+    __slots__ = ("lat", "lng", "cell_m", "origin", "cell_deg", "columns", "order", "cells")
+
+    def __init__(self, lat, lng, cell_m=GRID_CELL_M):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.cell_m = float(cell_m)
+        count = len(self.lat)
+
+        if count:
+            south, west = float(self.lat.min()), float(self.lng.min())
+            north = float(self.lat.max())
+        else:
+            south = west = north = 0.0
+        # 경도 방향 칸 크기는 가장 높은 위도에서도 cell_m 이상이 되도록 정함
+        cell_lat = self.cell_m / METERS_PER_DEGREE
+        cell_lng = cell_lat / np.cos(np.radians(min(max(abs(south), abs(north)), 89.0)))
+        self.origin = (south, west)
+        self.cell_deg = (cell_lat, cell_lng)
+
+        rows, columns = self._cell_coords(self.lat, self.lng)
+        self.columns = int(columns.max()) + 1 if count else 1
+        cells = rows * self.columns + columns
+        self.order = np.argsort(cells, kind="stable")
+        self.cells = cells[self.order]
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __repr__(self):
+        return f"GridIndex(points={len(self)}, cell_m={self.cell_m:g})"
+
+    def _cell_coords(self, lat, lng):
+        """(격자 행, 격자 열) 배열 - 원점보다 남서쪽이면 음수"""
+        row = np.floor((np.asarray(lat) - self.origin[0]) / self.cell_deg[0]).astype(np.int64)
+        column = np.floor((np.asarray(lng) - self.origin[1]) / self.cell_deg[1]).astype(np.int64)
+        return row, column
+
+    def _candidates(self, south, west, north, east):
+        """영역이 걸친 칸에 든 행 번호 (영역 밖 행이 섞일 수 있음)"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        (row0, row1), (column0, column1) = self._cell_coords([south, north], [west, east])
+        column0, column1 = max(int(column0), 0), min(int(column1), self.columns - 1)
+        row0, row1 = max(int(row0), 0), int(row1)
+        if column0 > column1 or row0 > row1:
+            return np.empty(0, dtype=np.int64)
+
+        # 격자 행마다 [행*열수 + column0, 행*열수 + column1] 칸 구간을 정렬 배열에서 찾음
+        grid_rows = np.arange(row0, row1 + 1, dtype=np.int64) * self.columns
+        starts = np.searchsorted(self.cells, grid_rows + column0, side="left")
+        ends = np.searchsorted(self.cells, grid_rows + column1, side="right")
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        # 구간들을 이어 붙인 위치 배열 (구간마다 arange 를 만들지 않음)
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return self.order[np.arange(total, dtype=np.int64) + offsets]
+
+    def bbox(self, south, west, north, east):
+        """영역 안(경계 포함)의 행 번호 (행 번호 순)"""
+        rows = self._candidates(south, west, north, east)
+        lat, lng = self.lat[rows], self.lng[rows]
+        inside = (lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)
+        return np.sort(rows[inside])
+
+    def distances(self, lat, lng, rows=None):
+        """한 지점에서 지정한 행들(기본: 전체)까지의 거리(m) 배열 (poi.geo.distance_m)"""
+        if rows is None:
+            return distance_m(lat, lng, self.lat, self.lng)
+        rows = np.asarray(rows, dtype=np.int64)
+        return distance_m(lat, lng, self.lat[rows], self.lng[rows])
+
+    def within(self, lat, lng, radius_m, mask=None):
+        """
+        반경 radius_m 안의 (행 번호, 거리) - 순서 없음 (정렬이 필요 없는 집계용)
+        mask 는 행마다 포함 여부를 담은 불리언 배열이다 (카테고리 필터 등).
+        """
+        dlat = radius_m / MIN_METERS_PER_DEGREE_LAT
+        dlng = dlat / max(np.cos(np.radians(min(abs(lat) + dlat, 89.0))), 1e-6)
+        rows = self._candidates(lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        distance = self.distances(lat, lng, rows)
+        near = distance <= radius_m
+        return rows[near], distance[near]
+
+    def radius(self, lat, lng, radius_m, mask=None):
+        """반경 radius_m 안의 (행 번호, 거리) - 가까운 순 (mask 는 within 과 같음)"""
+        rows, distance = self.within(lat, lng, radius_m, mask)
+        order = np.lexsort((rows, distance))
+        return rows[order], distance[order]
+
+    def nearest(self, lat, lng, k, mask=None):
+        """
+        가장 가까운 k개의 (행 번호, 거리) - 가까운 순
+        칸 크기 반경에서 시작해 k개가 모일 때까지 반경을 두 배씩 늘린다.
+        """
+        if k <= 0 or not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # 모든 점을 덮는 반경 (질의 지점에서 데이터 영역의 가장 먼 모서리까지)
+        south, west = self.origin
+        north, east = float(self.lat.max()), float(self.lng.max())
+        farthest = float(distance_m(lat, lng, np.array([south, south, north, north]),
+                                     np.array([west, east, west, east])).max())
+
+        radius_m = self.cell_m
+        while True:
+            rows, distance = self.radius(lat, lng, radius_m, mask)
+            if len(rows) >= k or radius_m > farthest:
+                return rows[:k], distance[:k]
+            radius_m *= 2
+
+    def corridor(self, lats, lngs, width_m, mask=None):
+        """
+        경로(점들을 차례로 이은 선분들)에서 width_m 안의 (행 번호, 경로까지 거리, 구간 번호, 구간 안 위치) - 경로 순
+        구간 번호 i 는 i번째 점에서 i+1번째 점으로 가는 선분이고, 위치는 그 선분 위 가장 가까운 지점(0~1)이다.
+        긴 대각선 구간이 큰 영역을 질의하지 않도록 구간을 짧은 조각으로 나눠 조각마다 영역 후보를 모은 뒤,
+        후보마다 선분 거리를 계산해 폭 밖의 행을 버리고 가장 가까운 구간만 남긴다.
+        """
+        lats, lngs = np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64)
+        if len(lats) == 1:
+            lats, lngs = np.repeat(lats, 2), np.repeat(lngs, 2)  # 점 하나는 길이 0 구간
+        if len(lats) < 2 or not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64), np.empty(0)
+
+        piece_m = max(2 * width_m, self.cell_m, CORRIDOR_PIECE_M)
+        dlat = width_m / MIN_METERS_PER_DEGREE_LAT
+        dlng = dlat / max(np.cos(np.radians(min(float(np.abs(lats).max()) + dlat, 89.0))), 1e-6)
+        lengths = distance_m(lats[:-1], lngs[:-1], lats[1:], lngs[1:])
+        candidate_rows, candidate_legs = [], []
+        for leg, length in enumerate(lengths.tolist()):
+            steps = np.linspace(0, 1, max(1, int(np.ceil(length / piece_m))) + 1)
+            piece_lat = lats[leg] + (lats[leg + 1] - lats[leg]) * steps
+            piece_lng = lngs[leg] + (lngs[leg + 1] - lngs[leg]) * steps
+            rows = np.unique(np.concatenate([
+                self._candidates(min(south, north) - dlat, min(west, east) - dlng,
+                                 max(south, north) + dlat, max(west, east) + dlng)
+                for south, north, west, east in zip(piece_lat[:-1], piece_lat[1:], piece_lng[:-1], piece_lng[1:])]))
+            candidate_rows.append(rows)
+            candidate_legs.append(np.full(len(rows), leg, dtype=np.int64))
+
+        rows, legs = np.concatenate(candidate_rows), np.concatenate(candidate_legs)
+        if mask is not None:
+            keep = mask[rows]
+            rows, legs = rows[keep], legs[keep]
+        distance, position = segment_distance_m(self.lat[rows], self.lng[rows],
+                                                lats[legs], lngs[legs], lats[legs + 1], lngs[legs + 1])
+        near = distance <= width_m
+        rows, legs, distance, position = rows[near], legs[near], distance[near], position[near]
+
+        # 행마다 가장 가까운 구간 하나만 (같으면 앞 구간)
+        order = np.lexsort((legs, distance, rows))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = rows[order][1:] != rows[order][:-1]
+        order = order[first]
+        rows, legs, distance, position = rows[order], legs[order], distance[order], position[order]
+
+        order = np.lexsort((rows, position, legs))
+        return rows[order], distance[order], legs[order], position[order]
+
+    def nearest_per_group(self, lat, lng, groups, k):
+        """
+        그룹(카테고리 코드 등)마다 가장 가까운 k개 {그룹: (행 번호, 거리)} - 가까운 순
+        groups 는 행마다 그룹 번호를 담은 정수 배열이다. 큰 그룹들은 반경을 두 배씩 늘리며
+        한 번의 반경 질의 후보로 함께 답하고, SMALL_GROUP 개 이하의 작은 그룹은 반경을
+        데이터 전체로 키우지 않도록 그룹 행들과의 거리를 직접 계산한다.
+        """
+        groups = np.asarray(groups)
+        if k <= 0 or not len(self):
+            return {}
+        counts = np.bincount(groups)
+        small = counts <= SMALL_GROUP
+        needed = np.where(small, 0, np.minimum(counts, k))
+        result = {}
+
+        if needed.any():
+            south, west = self.origin
+            north, east = float(self.lat.max()), float(self.lng.max())
+            farthest = float(distance_m(lat, lng, np.array([south, south, north, north]),
+                                         np.array([west, east, west, east])).max())
+            radius_m = self.cell_m
+            while True:
+                rows, distance = self.radius(lat, lng, radius_m)
+                found = np.bincount(groups[rows], minlength=len(needed))
+                if np.all(found >= needed) or radius_m > farthest:
+                    break
+                radius_m *= 2
+
+            # 거리순 결과를 그룹별로 안정 정렬한 뒤 그룹 안 순위가 k 미만인 큰 그룹 행만 남김
+            by_group = np.argsort(groups[rows], kind="stable")
+            rows, distance = rows[by_group], distance[by_group]
+            row_groups = groups[rows]
+            starts = np.searchsorted(row_groups, row_groups, side="left")
+            keep = (np.arange(len(rows)) - starts < k) & ~small[row_groups]
+            for group in np.unique(row_groups[keep]).tolist():
+                selected = keep & (row_groups == group)
+                result[group] = (rows[selected], distance[selected])
+
+        for group in np.flatnonzero(small & (counts > 0)).tolist():
+            rows = np.flatnonzero(groups == group)
+            distance = self.distances(lat, lng, rows)
+            order = np.lexsort((rows, distance))[:k]
+            result[group] = (rows[order], distance[order])
+        return dict(sorted(result.items()))
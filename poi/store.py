@@ -0,0 +1,118 @@
+"""프로세스 공유 POI 저장소"""
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from poi.cluster import ClusterLevels
+from poi.constants import SOURCE_PATTERNS
+from poi.spatial import GridIndex
+from poi.table import CATEGORY_CODES
+
+
+def asset_signatures(folder, patterns=SOURCE_PATTERNS):
+    """에셋 폴더 파일별 (크기, 수정시각) 서명 {파일 이름: 서명} (이름순)"""
+    folder = Path(folder)
+    signatures = {}
+
+    if folder.exists():
+        files = sorted({path for pattern in patterns for path in folder.glob(pattern)})
+        for path in files:
+            stat = path.stat()
+            signatures[path.name] = (stat.st_size, stat.st_mtime_ns)
+
+    return signatures
+
+
+def version_from_signatures(signatures):
+    """파일 서명 목록으로 저장소 버전 문자열 계산"""
+    digest = hashlib.sha1()
+    for name, (size, mtime_ns) in signatures.items():
+        digest.update(f"{name}|{size}|{mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def compute_asset_version(folder, patterns=SOURCE_PATTERNS):
+    """에셋 폴더의 파일 이름/크기/수정시각으로 저장소 버전 문자열 계산"""
+    return version_from_signatures(asset_signatures(folder, patterns))
+
+
+class POIStore:
+    """
+    불변 POI 저장소
+    버전 단위로 한 번만 생성되어 서버 프로세스 내 모든 세션이 참조로 공유한다.
+    세션에는 저장소 자체가 아닌 버전 문자열만 보관한다.
+    마커는 모든 언어의 이름/주소를 담은 읽기 전용 MarkerTable 이며, 표시 언어는
+    화면을 그릴 때 문자열 풀만 바꿔 고르므로 언어 전환 시 데이터를 다시 읽지 않는다.
+    table 은 중복을 병합한 정규 POI 테이블(poi.dedup)이며, sources 는 정규 POI 별 원본 행
+    (오프셋 배열, 원본 행 번호 배열), files 는 원본 행 번호 범위 ((파일 이름, 시작, 끝), ...) 이다.
+    spatial_index 는 처음 쓸 때 한 번만 만드는 격자 공간 인덱스(poi.spatial)로, 지도/코스/검색이 함께 쓴다.
+    clusters() 는 지도용 확대 수준별 클러스터(poi.cluster)로, 카테고리 필터마다 처음 쓸 때 한 번 만든다.
+    pairwise 는 미리 만든 저장소의 POI 간 거리 표(poi.pairwise, mmap)이며 없으면 None 이다.
+    """
+    __slots__ = ("version", "table", "sources", "files", "pairwise", "created_at",
+                 "_spatial_index", "_clusters", "_lock")
+
+    def __init__(self, version, table, sources=None, files=(), pairwise=None):
+        if sources is None:
+            sources = (np.arange(len(table) + 1, dtype=np.int64), np.arange(len(table), dtype=np.int64))
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "table", table)
+        object.__setattr__(self, "sources", sources)
+        object.__setattr__(self, "files", tuple(files))
+        object.__setattr__(self, "pairwise", pairwise)
+        object.__setattr__(self, "created_at", time.time())
+        object.__setattr__(self, "_spatial_index", None)
+        object.__setattr__(self, "_clusters", {})
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("POIStore는 변경할 수 없습니다.")
+
+    def __len__(self):
+        return len(self.table)
+
+    def __bool__(self):
+        return len(self.table) > 0
+
+    @property
+    def spatial_index(self):
+        """마커 좌표의 GridIndex (버전당 한 번 생성, 세션 간 공유)"""
+        if self._spatial_index is None:
+            with self._lock:
+                if self._spatial_index is None:
+                    object.__setattr__(self, "_spatial_index", GridIndex(self.table.lat, self.table.lng))
+        return self._spatial_index
+
+    def clusters(self, category=None):
+        """카테고리(None: 전체) 마커의 ClusterLevels (버전/카테고리당 한 번 생성, 세션 간 공유)"""
+        levels = self._clusters.get(category)
+        if levels is None:
+            with self._lock:
+                levels = self._clusters.get(category)
+                if levels is None:
+                    table = self.table
+                    if category is None:
+                        levels = ClusterLevels(table.lat, table.lng)
+                    else:
+                        rows = np.flatnonzero(table.category_code == CATEGORY_CODES[category]) \
+                            if category in CATEGORY_CODES else np.empty(0, dtype=np.int64)
+                        levels = ClusterLevels(table.lat[rows], table.lng[rows], rows)
+                    self._clusters[category] = levels
+        return levels
+
+    def source_rows(self, index):
+        """정규 POI 의 원본 행 목록 [(파일 이름, 파일 안의 행 번호)]"""
+        offsets, rows = self.sources
+        links = []
+        for row in rows[offsets[index]:offsets[index + 1]].tolist():
+            for name, start, end in self.files:
+                if start <= row < end:
+                    links.append((name, row - start))
+                    break
+        return links
+
+    def __repr__(self):
+        return f"POIStore(version={self.version!r}, markers={len(self.table)})"
@@ -0,0 +1,307 @@
+"""구조체 배열(struct-of-arrays) 형태의 마커 테이블"""
+import numpy as np
+
+from poi.constants import CATEGORY_COLORS, LANGUAGES
+
+# 카테고리 코드 (uint8) ↔ 카테고리 이름/색상
+CATEGORY_NAMES = tuple(CATEGORY_COLORS)
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORY_NAMES)}
+CATEGORY_COLOR_LIST = tuple(CATEGORY_COLORS[category] for category in CATEGORY_NAMES)
+OTHER_CATEGORY_CODE = CATEGORY_CODES["기타"]
+
+
+def category_code(category):
+    """카테고리 이름의 uint8 코드 (모르는 카테고리는 기타)"""
+    return CATEGORY_CODES.get(category, OTHER_CATEGORY_CODE)
+
+
+def _readonly(array, dtype):
+    array = np.ascontiguousarray(array, dtype=dtype)
+    if array.flags.writeable and array.flags.owndata:
+        array.flags.writeable = False
+    return array
+
+
+class StringPool:
+    """
+    오프셋 인덱스 문자열 풀
+    모든 문자열을 하나의 UTF-8 바이트 힙에 이어 붙이고, i번째 문자열은
+    heap[offsets[i]:offsets[i+1]] 로 찾는다. 문자열마다 파이썬 객체를 두지 않는다.
+    """
+    __slots__ = ("heap", "offsets", "_search_heap")
+
+    def __init__(self, heap, offsets):
+        self.heap = heap
+        self.offsets = _readonly(offsets, np.int64)
+        self._search_heap = None
+
+    def __reduce__(self):
+        return (StringPool, (bytes(self.heap), self.offsets))
+
+    @classmethod
+    def from_strings(cls, strings):
+        """문자열 목록으로 풀 생성"""
+        encoded = [str(value).encode("utf-8") for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    @classmethod
+    def concat(cls, pools):
+        """여러 풀을 순서대로 이어 붙인 풀"""
+        pools = list(pools)
+        if not pools:
+            return cls.from_strings([])
+        heap = b"".join(bytes(pool.heap) for pool in pools)
+        parts = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for pool in pools:
+            parts.append(pool.offsets[1:] + base)
+            base += int(pool.offsets[-1])
+        return cls(heap, np.concatenate(parts))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return bytes(self.heap[start:end]).decode("utf-8")
+
+    def __eq__(self, other):
+        if not isinstance(other, StringPool):
+            return NotImplemented
+        return np.array_equal(self.offsets, other.offsets) and bytes(self.heap) == bytes(other.heap)
+
+    __hash__ = None
+
+    @property
+    def nbytes(self):
+        return len(self.heap) + self.offsets.nbytes
+
+    def take(self, indices):
+        """지정한 위치의 문자열 목록"""
+        return [self[int(i)] for i in indices]
+
+    def tolist(self):
+        text = bytes(self.heap)
+        offsets = self.offsets.tolist()
+        return [text[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def subset(self, indices):
+        """지정한 위치만 담은 새 풀"""
+        return StringPool.from_strings(self.take(indices))
+
+    def search(self, term):
+        """
+        term을 포함하는 문자열의 위치 배열 (ASCII 대소문자 무시)
+        힙 전체에 대해 bytes.find 를 반복하고, 찾은 바이트 위치를 오프셋 배열에서
+        이진 탐색해 문자열 번호로 바꾼다. 문자열 경계를 넘는 일치는 제외한다.
+        """
+        needle = term.encode("utf-8").lower()
+        if not needle:
+            return np.arange(len(self), dtype=np.int64)
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        if self._search_heap is None:
+            self._search_heap = bytes(self.heap).lower()
+        haystack = self._search_heap
+
+        hits = []
+        position = haystack.find(needle)
+        while position != -1:
+            index = int(np.searchsorted(self.offsets, position, side="right")) - 1
+            end = int(self.offsets[index + 1])
+            if position + len(needle) <= end:
+                hits.append(index)
+                position = haystack.find(needle, end)  # 같은 문자열의 중복 일치는 건너뜀
+            else:
+                position = haystack.find(needle, position + 1)
+        return np.asarray(hits, dtype=np.int64)
+
+
+class MarkerTable:
+    """
+    마커 테이블 (구조체 배열)
+    위경도는 float64 배열, 카테고리는 CATEGORY_NAMES 를 가리키는 uint8 코드,
+    이름/주소는 언어별 StringPool 로 보관한다. 색상은 카테고리 코드에서 결정된다.
+    표시나 코스 추천에 필요한 일부 행만 marker()/markers()로 딕셔너리로 만든다.
+    """
+    __slots__ = ("lat", "lng", "category_code", "titles", "addresses")
+
+    def __init__(self, lat, lng, category_code, titles, addresses):
+        self.lat = _readonly(lat, np.float64)
+        self.lng = _readonly(lng, np.float64)
+        self.category_code = _readonly(category_code, np.uint8)
+        self.titles = dict(titles)
+        self.addresses = dict(addresses)
+
+    def __reduce__(self):
+        return (MarkerTable, (self.lat, self.lng, self.category_code, self.titles, self.addresses))
+
+    @classmethod
+    def empty(cls, languages=LANGUAGES):
+        """마커가 없는 테이블 (언어별 풀은 모두 빈 풀)"""
+        pool = StringPool.from_strings([])
+        return cls(np.empty(0), np.empty(0), np.empty(0, dtype=np.uint8),
+                   {language: pool for language in languages},
+                   {language: pool for language in languages})
+
+    @classmethod
+    def from_columns(cls, lat, lng, category, titles, addresses):
+        """
+        열 목록으로 테이블 생성
+        titles/addresses 는 {언어: 문자열 목록} 이며, 같은 목록 객체는 하나의 풀을 공유한다.
+        """
+        pools = {}
+
+        def pool_for(values):
+            key = id(values)
+            if key not in pools:
+                pools[key] = (values, StringPool.from_strings(values))
+            return pools[key][1]
+
+        codes = np.full(len(lat), category_code(category), dtype=np.uint8) if isinstance(category, str) \
+            else np.fromiter(map(category_code, category), dtype=np.uint8, count=len(lat))
+        return cls(lat, lng, codes,
+                   {language: pool_for(values) for language, values in titles.items()},
+                   {language: pool_for(values) for language, values in addresses.items()})
+
+    @classmethod
+    def concat(cls, tables):
+        """여러 테이블을 순서대로 이어 붙인 테이블 (내용이 같은 언어별 풀은 공유)"""
+        tables = [table for table in tables if len(table)]
+        if not tables:
+            return cls.empty()
+        if len(tables) == 1:
+            return tables[0]
+
+        languages = list(dict.fromkeys(language for table in tables for language in table.titles))
+
+        def merged(attribute):
+            result = {}
+            for language in languages:
+                pool = StringPool.concat(table._pool(getattr(table, attribute), language) for table in tables)
+                # 언어별 열이 없어 대체값을 쓴 경우처럼 내용이 같으면 같은 풀 재사용
+                result[language] = next((existing for existing in result.values() if existing == pool), pool)
+            return result
+
+        return cls(np.concatenate([table.lat for table in tables]),
+                   np.concatenate([table.lng for table in tables]),
+                   np.concatenate([table.category_code for table in tables]),
+                   merged("titles"), merged("addresses"))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __repr__(self):
+        return f"MarkerTable(rows={len(self)}, languages={list(self.titles)})"
+
+    @property
+    def languages(self):
+        return tuple(self.titles)
+
+    @property
+    def nbytes(self):
+        pools = {id(pool): pool for pool in (*self.titles.values(), *self.addresses.values())}
+        return (self.lat.nbytes + self.lng.nbytes + self.category_code.nbytes +
+                sum(pool.nbytes for pool in pools.values()))
+
+    def _pool(self, pools, language):
+        """언어별 풀 (없는 언어는 첫 번째 언어로 대체, 언어가 하나도 없으면 빈 풀)"""
+        if language in pools:
+            return pools[language]
+        if pools:
+            return next(iter(pools.values()))
+        return StringPool.from_strings([])
+
+    def title_pool(self, language="한국어"):
+        return self._pool(self.titles, language)
+
+    def address_pool(self, language="한국어"):
+        return self._pool(self.addresses, language)
+
+    def category(self, index):
+        return CATEGORY_NAMES[self.category_code[index]]
+
+    def color(self, index):
+        return CATEGORY_COLOR_LIST[self.category_code[index]]
+
+    def marker(self, index, language="한국어"):
+        """한 행을 기존 마커 딕셔너리 형식으로 변환"""
+        index = int(index)
+        title = self.title_pool(language)[index]
+        address = self.address_pool(language)[index]
+        category = self.category(index)
+        return {
+            'lat': float(self.lat[index]),
+            'lng': float(self.lng[index]),
+            'title': title,
+            'color': self.color(index),
+            'category': category,
+            'info': build_info_html(None, title, address, category),
+            'address': address
+        }
+
+    def markers(self, indices=None, language="한국어"):
+        """지정한 행들(기본: 전체)을 마커 딕셔너리 목록으로 변환"""
+        if indices is None:
+            indices = range(len(self))
+        return [self.marker(index, language) for index in indices]
+
+    def rows(self, language="한국어", indices=None):
+        """지정한 행들(기본: 전체)의 (위도, 경도, 이름, 색상, 카테고리, 주소) 튜플을 순서대로 생성 (딕셔너리 없음)"""
+        if indices is None:
+            codes = self.category_code.tolist()
+            return zip(self.lat.tolist(), self.lng.tolist(),
+                       self.title_pool(language).tolist(),
+                       (CATEGORY_COLOR_LIST[code] for code in codes),
+                       (CATEGORY_NAMES[code] for code in codes),
+                       self.address_pool(language).tolist())
+        indices = np.asarray(indices, dtype=np.int64)
+        codes = self.category_code[indices].tolist()
+        return zip(self.lat[indices].tolist(), self.lng[indices].tolist(),
+                   self.title_pool(language).take(indices),
+                   (CATEGORY_COLOR_LIST[code] for code in codes),
+                   (CATEGORY_NAMES[code] for code in codes),
+                   self.address_pool(language).take(indices))
+
+    def search(self, term, language="한국어"):
+        """이름에 term 이 포함된 행 번호 배열"""
+        return self.title_pool(language).search(term)
+
+    def category_counts(self):
+        """{카테고리: 개수} (처음 등장한 순서)"""
+        if not len(self):
+            return {}
+        codes, first_index, counts = np.unique(self.category_code, return_index=True, return_counts=True)
+        order = np.argsort(first_index)
+        return {CATEGORY_NAMES[codes[i]]: int(counts[i]) for i in order}
+
+    def take(self, indices):
+        """지정한 행만 담은 새 테이블"""
+        indices = np.asarray(indices, dtype=np.int64)
+        pools = {}
+
+        def subset(pool):
+            if id(pool) not in pools:
+                pools[id(pool)] = pool.subset(indices)
+            return pools[id(pool)]
+
+        return MarkerTable(self.lat[indices], self.lng[indices], self.category_code[indices],
+                           {language: subset(pool) for language, pool in self.titles.items()},
+                           {language: subset(pool) for language, pool in self.addresses.items()})
+
+
+# 정보창 HTML 구성 함수
+def build_info_html(row, name, address, category):
+    """마커 정보창 HTML 구성"""
+    info = f"<div style='padding: 10px; max-width: 300px;'>"
+    info += f"<h3 style='margin-top: 0; color: #1976D2;'>{name}</h3>"
+    info += f"<p><strong>분류:</strong> {category}</p>"
+
+    if address:
+        info += f"<p><strong>주소:</strong> {address}</p>"
+
+    info += "</div>"
+    return info
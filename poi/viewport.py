@@ -0,0 +1,65 @@
+"""지도 화면 영역(뷰포트) 단위 마커 응답
+
+지도 컴포넌트가 postMessage 로 알려 오는 화면 영역(남/서/북/동 위경도)과 확대 수준을 받아,
+공유 공간 인덱스(poi.spatial)로 그 영역의 마커 행만 골라 JSON 으로 보낼 수 있는 응답을 만든다.
+응답 크기는 전체 POI 수가 아니라 화면에 보이는 마커 수에 비례한다.
+조금 움직일 때마다 다시 묻지 않도록 영역을 사방으로 넓혀 질의하고, 넓힌 영역을 응답에 담아
+지도가 그 밖으로 벗어나거나 확대 수준이 바뀔 때만 다시 요청하게 한다.
+확대 수준별 클러스터(poi.cluster)를 함께 주면 먼 확대 수준에서는 클러스터 중심과 개수만 보낸다.
+"""
+import math
+
+import numpy as np
+
+# 한 번에 보내는 최대 마커 수 (넘으면 행 번호 순으로 고르게 추림)
+MAX_VIEWPORT_MARKERS = 2000
+# 질의 영역을 화면 크기 대비 사방으로 넓히는 비율
+VIEWPORT_PADDING = 0.5
+# 웹 메르카토르 타일 한 장의 픽셀 크기
+TILE_SIZE = 256
+
+
+def initial_bounds(lat, lng, zoom, width_px=800, height_px=600):
+    """지도가 아직 영역을 알리지 않았을 때 중심/확대 수준/크기로 추정한 화면 영역"""
+    lng_per_px = 360 / (TILE_SIZE * 2 ** zoom)
+    half_width = width_px / 2 * lng_per_px
+    half_height = height_px / 2 * lng_per_px * math.cos(math.radians(lat))
+    return {"south": lat - half_height, "west": lng - half_width,
+            "north": lat + half_height, "east": lng + half_width}
+
+
+def pad_bounds(bounds, ratio=VIEWPORT_PADDING):
+    """영역을 높이/너비의 ratio 만큼 사방으로 넓힌 새 영역"""
+    height = bounds["north"] - bounds["south"]
+    width = bounds["east"] - bounds["west"]
+    return {"south": max(bounds["south"] - height * ratio, -90.0), "west": bounds["west"] - width * ratio,
+            "north": min(bounds["north"] + height * ratio, 90.0), "east": bounds["east"] + width * ratio}
+
+
+def viewport_payload(table, index, bounds, zoom, language="한국어", limit=MAX_VIEWPORT_MARKERS, clusters=None):
+    """
+    화면 영역 마커 응답
+    {"bounds": 넓힌 영역, "zoom": 확대 수준, "total": 영역 안 마커 수,
+     "rows": [[행 번호, 위도, 경도, 이름, 색상, 카테고리, 주소], ...],
+     "clusters": [[클러스터 키, 위도, 경도, POI 수, 펼침 확대 수준], ...]}
+    clusters(poi.cluster.ClusterLevels)를 주면 그 확대 수준의 클러스터로 묶고, 묶이지 않은 POI 만
+    rows 로 보낸다 (카테고리별 ClusterLevels 면 그 카테고리 POI 만 남음).
+    rows 가 limit 개를 넘으면 고르게 limit 개만 보낸다 (확대하면 다시 요청해 채움).
+    """
+    padded = pad_bounds(bounds)
+    rows = index.bbox(padded["south"], padded["west"], padded["north"], padded["east"])
+    cluster_items = []
+    if clusters is not None:
+        cluster_items, rows = clusters.query(rows, zoom)
+    total = len(rows)
+    if total > limit:
+        rows = rows[np.linspace(0, total - 1, limit).astype(np.int64)]
+    level = max(int(zoom), clusters.min_zoom) if clusters is not None else zoom
+    return {
+        "bounds": padded,
+        "zoom": zoom,
+        "total": total,
+        "rows": [[row, *values] for row, values in zip(rows.tolist(), table.rows(language, rows))],
+        "clusters": [[f"{level}/{cluster}", lat, lng, count, expansion]
+                     for cluster, lat, lng, count, expansion in cluster_items],
+    }
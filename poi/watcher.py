@@ -0,0 +1,156 @@
+"""에셋 폴더 변경 감지와 POI 저장소 증분 갱신"""
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from poi.compiled import COMPILED_DIR, load_compiled_store, load_pairwise
+from poi.constants import SOURCE_PATTERNS
+from poi.dedup import deduplicate
+from poi.ingest import INGEST_PARALLEL, detect_file_category, ingest_jobs, log_report, report_total
+from poi.store import POIStore, asset_signatures, version_from_signatures
+from poi.table import MarkerTable
+
+logger = logging.getLogger(__name__)
+
+# 폴링 간격(초) (POI_WATCH_INTERVAL=0 이면 백그라운드 폴링 없이 refresh() 호출 때만 확인)
+WATCH_INTERVAL = float(os.environ.get("POI_WATCH_INTERVAL", "5"))
+
+
+def _file_ranges(names, lengths):
+    """파일별 행 수로 원본 행 번호 범위 ((파일 이름, 시작, 끝), ...) 계산"""
+    ranges = []
+    start = 0
+    for name, length in zip(names, lengths):
+        ranges.append((name, start, start + length))
+        start += length
+    return ranges
+
+
+class AssetWatcher:
+    """
+    에셋 폴더 폴링 감시기
+    파일별 (크기, 수정시각) 서명과 MarkerTable 을 보관하고, 서명이 바뀌거나 새로 생긴
+    파일만 ingest_file(→ process_dataframe)로 다시 적재한다. 파일별 테이블을 이름순으로
+    이어 붙이고 중복을 병합(poi.dedup)한 새 POIStore 를 완성한 뒤 참조 하나만 바꿔
+    게시하므로, 세션은 다음 재실행 때 이전 버전 또는 완성된 새 버전 중 하나만 보게 된다.
+    첫 적재 때 원본 파일 내용이 미리 만든 저장소(python -m poi.build)와 같으면
+    원본을 파싱하지 않고 그 저장소를 사용한다.
+    """
+
+    def __init__(self, folder="asset", patterns=SOURCE_PATTERNS, interval=WATCH_INTERVAL,
+                 compiled_dir=COMPILED_DIR):
+        self.folder = Path(folder)
+        self.patterns = patterns
+        self.interval = interval
+        self.compiled_dir = compiled_dir
+        self._files = {}  # 파일 이름 → (서명, MarkerTable 또는 미리 만든 저장소의 행 범위)
+        self._compiled = None
+        self._store = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def store(self):
+        """현재 게시된 저장소 (아직 적재 전이면 refresh() 로 첫 버전 생성)"""
+        store = self._store
+        if store is None:
+            store = self.refresh()
+        return store
+
+    def refresh(self, report=log_report, parallel=None):
+        """
+        폴더를 한 번 확인해 바뀐 파일만 다시 적재하고 새 버전을 게시
+        버전이 그대로면 아무것도 읽지 않고 현재 저장소를 반환한다.
+        """
+        with self._refresh_lock:
+            signatures = asset_signatures(self.folder, self.patterns)
+            version = version_from_signatures(signatures)
+            if self._store is not None and self._store.version == version:
+                return self._store
+
+            if self._store is None and self.compiled_dir is not None:
+                store = self._load_compiled(signatures, version, report)
+                if store is not None:
+                    return store
+
+            if not self.folder.exists():
+                report("error", f"데이터 폴더({self.folder})가 존재하지 않습니다.")
+
+            changed = [name for name, signature in signatures.items()
+                       if name not in self._files or self._files[name][0] != signature]
+            removed = [name for name in self._files if name not in signatures]
+
+            # 바뀐 파일만 적재 (파싱이 필요한 파일이 여러 개면 프로세스 풀 사용)
+            jobs = [(self.folder / name, detect_file_category(name)) for name in changed]
+            results = ingest_jobs(jobs, INGEST_PARALLEL if parallel is None else parallel, report)
+
+            files = {name: entry for name, entry in self._files.items() if name in signatures}
+            for name, (table, messages) in zip(changed, results):
+                for level, message in messages:
+                    report(level, message)
+                files[name] = (signatures[name], table)
+
+            tables = [self._file_table(files[name][1]) for name in signatures]
+            table = MarkerTable.concat(tables)
+            report_total(table, report)
+            canonical, offsets, rows = deduplicate(table)
+            logger.info("중복 POI 병합: 원본 %d개 → 장소 %d개", len(table), len(canonical))
+
+            if self._store is not None:
+                logger.info("POI 저장소 %s → %s (변경 %d개, 삭제 %d개)",
+                            self._store.version, version, len(changed), len(removed))
+
+            self._files = files
+            self._store = POIStore(version, canonical, (offsets, rows),
+                                   _file_ranges(signatures, map(len, tables)))  # 참조 교체로 게시
+            return self._store
+
+    def _load_compiled(self, signatures, version, report):
+        """원본 파일 내용이 같으면 미리 만든 저장소를 첫 버전으로 게시 (파일별 테이블은 행 범위로 보관)"""
+        loaded = load_compiled_store(self.compiled_dir, self.folder)
+        if loaded is None:
+            return None
+        table, manifest, (canonical, offsets, rows) = loaded
+        ranges = {source["name"]: tuple(source["rows"]) for source in manifest["sources"]}
+
+        self._compiled = table
+        self._files = {name: (signature, ranges[name]) for name, signature in signatures.items()}
+        self._store = POIStore(version, canonical, (offsets, rows),
+                               ((name, start, end) for name, (start, end) in ranges.items()),
+                               pairwise=load_pairwise(self.compiled_dir, manifest, canonical))
+        logger.info("미리 만든 POI 저장소 %s 사용 (마커 %d개)", manifest["version"], len(table))
+        report_total(table, report)
+        return self._store
+
+    def _file_table(self, entry):
+        """파일별 테이블 (미리 만든 저장소의 행 범위이면 그 부분만 잘라 냄)"""
+        if isinstance(entry, MarkerTable):
+            return entry
+        start, end = entry
+        return self._compiled.take(np.arange(start, end))
+
+    def start(self):
+        """백그라운드 폴링 스레드 시작 (이미 실행 중이거나 간격이 0이면 무시)"""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="poi-asset-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """폴링 스레드 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("에셋 폴더 갱신 실패")
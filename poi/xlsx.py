@@ -0,0 +1,80 @@
+"""openpyxl read_only 모드 워크북 스트리밍 리더
+
+pd.read_excel 은 시트 전체를 데이터프레임으로 만든 뒤에야 필요한 열을 고를 수 있다.
+여기서는 행을 생성기로 읽으면서 필요한 열만 골라 고정 크기 청크로 내보내므로
+최대 메모리가 파일 크기가 아니라 청크 크기에 비례한다.
+"""
+import itertools
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# 이 크기 이상인 워크북은 스트리밍으로 적재 (스냅샷이 있으면 스냅샷 우선)
+STREAM_MIN_BYTES = int(os.environ.get("POI_STREAM_MIN_BYTES", 32 * 1024 * 1024))
+STREAM_CHUNK_ROWS = 20000
+
+
+def header_names(values):
+    """pd.read_excel 과 같은 규칙의 열 이름 (빈 머리글은 'Unnamed: i', 중복은 '.1' 접미사)"""
+    names = []
+    counts = {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in counts:
+            counts[name] += 1
+            deduped = f"{name}.{counts[name]}"
+            while deduped in counts:
+                counts[name] += 1
+                deduped = f"{name}.{counts[name]}"
+            counts[deduped] = 0
+            name = deduped
+        else:
+            counts[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_sheet_chunks(path, columns=None, chunk_size=STREAM_CHUNK_ROWS):
+    """
+    첫 시트를 chunk_size 행씩 데이터프레임으로 생성
+    인덱스는 시트 전체 기준 행 번호이므로 청크를 이어 붙이면 pd.read_excel 결과와 같다.
+    columns 를 주면 그 열만 담는다 (None 값은 무시, 없는 열은 KeyError).
+    columns 가 함수이면 모든 열을 담은 첫 청크로 호출해 그 결과를 열 목록으로 쓰고,
+    None 을 돌려주면 읽기를 멈춘다 (워크북을 한 번만 열어 열 감지와 적재를 함께 처리).
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = header_names(next(rows, ()))
+        select = columns if callable(columns) else None
+
+        def take(names):
+            missing = [name for name in names if name not in header]
+            if missing:
+                raise KeyError(f"워크북에 없는 열: {missing}")
+            return names, [header.index(name) for name in names]
+
+        names, positions = take(header if columns is None or select else
+                                [column for column in dict.fromkeys(columns) if column is not None])
+
+        start = 0
+        while True:
+            batch = list(itertools.islice(rows, chunk_size))
+            if not batch:
+                break
+            data = {name: [row[position] if position < len(row) else None for row in batch]
+                    for name, position in zip(names, positions)}
+            chunk = pd.DataFrame(data, index=pd.RangeIndex(start, start + len(batch)), columns=names)
+            start += len(batch)
+
+            if select is not None:
+                selected = select(chunk)
+                select = None
+                if selected is None:
+                    break
+                names, positions = take([column for column in dict.fromkeys(selected) if column is not None])
+                chunk = chunk[names]
+            yield chunk
+    finally:
+        workbook.close()
@@ -1,13 +1,19 @@
 import streamlit as st
-import pandas as pd
 import json
 import os
 import time
 import random
 from datetime import datetime
 from pathlib import Path
-from geopy.distance import geodesic
 import numpy as np
+from poi.ingest import streamlit_report
+from poi.watcher import AssetWatcher
+from poi.table import CATEGORY_NAMES
+from poi.geo import distance_m, leg_distances_m
+from poi.hotels import HOTEL_FILE, PROXIMITY_RADII_M, load_hotel_proximity
+from poi.reach import DETOUR_FACTOR, REACH_MINUTES, TRAVEL_SPEEDS, reach_grid, reachable
+from poi.spatial import GridIndex
+from poi.viewport import initial_bounds, viewport_payload
 
 # 페이지 설정
 st.set_page_config(
@@ -24,17 +30,6 @@ st.set_page_config(
 # Google Maps 기본 중심 위치 (서울시청)
 DEFAULT_LOCATION = [37.5665, 126.9780]
 
-# 카테고리별 마커 색상
-CATEGORY_COLORS = {
-    "체육시설": "blue",
-    "공연행사": "purple",
-    "관광기념품": "green",
-    "한국음식점": "orange",
-    "미술관/전시": "pink",
-    "종로구 관광지": "red",
-    "기타": "gray"
-}
-
 # 언어별 카테고리 정의
 CATEGORIES_TRANSLATION = {
     "한국어": {
@@ -63,15 +58,6 @@ CATEGORIES_TRANSLATION = {
     }
 }
 
-# 파일 분류용 카테고리 매핑 (기존 FILE_CATEGORIES는 그대로 유지)
-FILE_CATEGORIES = {
-    "체육시설": ["체육시설", "공연행사"],
-    "관광기념품": ["관광기념품", "외국인전용"],
-    "한국음식점": ["음식점", "한국음식"],
-    "미술관/전시": ["미술관", "전시"],
-    "종로구 관광지": ["종로구", "관광데이터"]
-}
-
 # 세션 데이터 저장 파일
 SESSION_DATA_FILE = "data/session_data.json"
 
@@ -115,6 +101,10 @@ STYLE_CATEGORY_WEIGHTS = {
     "자연": {"종로구 관광지": 1.5, "체육시설": 1.0, "한국음식점": 0.8}
 }
 
+# 코스 경로 주변에서 들를 만한 곳을 찾는 폭 (m)과 카테고리별 최대 표시 수
+COURSE_CORRIDOR_WIDTH_M = 300
+COURSE_CORRIDOR_PER_CATEGORY = 3
+
 # 명시적으로 로드할 7개 파일 리스트
 EXCEL_FILES = [
     "서울시 자랑스러운 한국음식점 정보 한국어영어중국어 1.xlsx",
@@ -350,6 +340,13 @@ def init_session_state():
                 "map_places_by_category": "카테고리별 장소",
                 "map_category": "분류",
                 "map_other_category": "기타",
+                "map_nearby_places": "내 주변 장소",
+                "map_nearby_count": "카테고리별 개수",
+                "map_reach_title": "이동 시간별로 갈 수 있는 곳",
+                "map_reach_mode": "이동 수단",
+                "map_reach_show_area": "지도에 도달 범위 표시",
+                "map_reach_summary": "**{minutes}분 이내** · {count}곳",
+                "map_reach_caption": "직선거리의 {detour}배를 도로 거리로 보고 평균 속도로 계산한 추정치입니다.",
                 "map_no_destination_info": "목적지 정보가 없습니다.",
                 "map_back_to_map": "지도로 돌아가기",
                 "map_navigation_to": "까지 내비게이션",
@@ -418,6 +415,13 @@ def init_session_state():
                 "map_display_error": "코스 장소의 좌표 정보가 없어 지도에 표시할 수 없습니다.",
                 "save_course_button": "이 코스 저장하기",
                 "course_saved_success": "코스가 저장되었습니다!",
+                "course_on_the_way": "가는 길에 들를 곳",
+                "course_on_the_way_caption": "각 날의 코스 경로(장소 사이 직선 구간)에서 {width}m 안에 있는 장소입니다.",
+                "course_on_the_way_empty": "경로 주변에 들를 만한 장소가 없습니다.",
+                "course_add_stop": "➕ 코스에 추가",
+                "course_hotels_title": "여행 스타일에 맞는 장소가 가까운 숙소",
+                "course_hotels_radius": "주변 반경 (m)",
+                "course_hotels_caption": "반경 안 카테고리별 장소 수에 여행 스타일 가중치를 곱해 순위를 매깁니다.",
                 "travel_date_start": "여행 시작일",
                 "travel_date_end": "여행 종료일",
                 "travel_people_count": "여행 인원",
@@ -495,6 +499,13 @@ def init_session_state():
                 "map_places_by_category": "按类别查看地点",
                 "map_category": "类别",
                 "map_other_category": "其他",
+                "map_nearby_places": "我附近的地点",
+                "map_nearby_count": "每个类别的数量",
+                "map_reach_title": "按出行时间可到达的地点",
+                "map_reach_mode": "交通方式",
+                "map_reach_show_area": "在地图上显示可到达范围",
+                "map_reach_summary": "**{minutes}分钟内** · {count}处",
+                "map_reach_caption": "以直线距离的{detour}倍作为道路距离，按平均速度估算。",
                 "map_no_destination_info": "没有目的地信息。",
                 "map_back_to_map": "返回地图",
                 "map_navigation_to": "导航至",
@@ -563,6 +574,13 @@ def init_session_state():
                 "map_display_error": "由于路线地点缺少坐标信息，无法在地图上显示。",
                 "save_course_button": "保存此路线",
                 "course_saved_success": "路线已保存！",
+                "course_on_the_way": "顺路可去的地方",
+                "course_on_the_way_caption": "每天路线（地点之间的直线路段）{width}米以内的地点。",
+                "course_on_the_way_empty": "路线附近没有可去的地点。",
+                "course_add_stop": "➕ 加入路线",
+                "course_hotels_title": "附近有符合旅行风格地点的酒店",
+                "course_hotels_radius": "周边半径（米）",
+                "course_hotels_caption": "按半径内各类别地点数量乘以旅行风格权重排序。",
                 "travel_date_start": "旅行开始日期",
                 "travel_date_end": "旅行结束日期",
                 "travel_people_count": "旅行人数",
@@ -640,6 +658,13 @@ def init_session_state():
                 "map_places_by_category": "Places by Category",
                 "map_category": "Category",
                 "map_other_category": "Other",
+                "map_nearby_places": "Places Near Me",
+                "map_nearby_count": "Places per category",
+                "map_reach_title": "Reachable Places by Travel Time",
+                "map_reach_mode": "Travel mode",
+                "map_reach_show_area": "Show reachable area on map",
+                "map_reach_summary": "**Within {minutes} min** · {count} places",
+                "map_reach_caption": "Estimated from average speed, taking road distance as {detour}× the straight-line distance.",
                 "map_no_destination_info": "No destination information.",
                 "map_back_to_map": "Back to Map",
                 "map_navigation_to": "Navigation to",
@@ -708,6 +733,13 @@ def init_session_state():
                 "map_display_error": "Cannot display on map due to missing coordinate information for course locations.",
                 "save_course_button": "Save This Course",
                 "course_saved_success": "Course has been saved!",
+                "course_on_the_way": "Stops On The Way",
+                "course_on_the_way_caption": "Places within {width} m of each day's route (straight segments between stops).",
+                "course_on_the_way_empty": "No places found along the route.",
+                "course_add_stop": "➕ Add to course",
+                "course_hotels_title": "Hotels Close to Places Matching Your Style",
+                "course_hotels_radius": "Radius (m)",
+                "course_hotels_caption": "Ranked by the number of places per category within the radius, weighted by your travel styles.",
                 "travel_date_start": "Travel Start Date",
                 "travel_date_end": "Travel End Date",
                 "travel_people_count": "Number of Travelers",
@@ -738,13 +770,10 @@ def init_session_state():
     if 'transport_mode' not in st.session_state:
         st.session_state.transport_mode = None
     
-    # 관광 데이터 관련 상태
-    if 'all_markers' not in st.session_state:
-        st.session_state.all_markers = []
-    if 'markers_loaded' not in st.session_state:
-        st.session_state.markers_loaded = False
-    if 'tourism_data' not in st.session_state:
-        st.session_state.tourism_data = []
+    # 관광 데이터 관련 상태 (마커 자체는 공유 POI 저장소에 있고 세션에는 버전만 보관,
+    # 버전이 바뀌면 get_poi_store 가 세션 코스의 행 번호를 새 버전에 맞춘다)
+    if 'poi_store_version' not in st.session_state:
+        st.session_state.poi_store_version = None
     if 'saved_courses' not in st.session_state:
         st.session_state.saved_courses = []
         
@@ -865,430 +894,200 @@ def get_location_position():
 # 데이터 로드 함수
 #################################################
 
-def load_excel_files(language="한국어"):
-    """데이터 폴더에서 Excel 파일 로드 - 개선된 버전"""
-    data_folder = Path("asset")
-    all_markers = []
-    
-    # 파일이 존재하는지 확인
-    if not data_folder.exists():
-        st.error(f"데이터 폴더({data_folder})가 존재하지 않습니다.")
-        return []
-    
-    # 파일 목록 확인
-    excel_files = list(data_folder.glob("*.xlsx"))
-    
-    if not excel_files:
-        #st.error("Excel 파일을 찾을 수 없습니다. GitHub 저장소의 파일을 확인해주세요.")
-        st.info("확인할 경로: asset/*.xlsx")
-        return []
-    
-    # 찾은 파일 목록 표시
-    #st.success(f"{len(excel_files)}개의 Excel 파일을 찾았습니다.")
-    # for file_path in excel_files:
-    #     st.info(f"파일 발견: {file_path.name}")
-    
-    # 각 파일 처리
-    for file_path in excel_files:
-        try:
-            # 파일 카테고리 결정
-            file_category = "기타"
-            file_name_lower = file_path.name.lower()
-            
-            for category, keywords in FILE_CATEGORIES.items():
-                if any(keyword.lower() in file_name_lower for keyword in keywords):
-                    file_category = category
-                    break
-            
-            # 파일 로드
-            #st.info(f"'{file_path.name}' 파일을 '{file_category}' 카테고리로 로드 중...")
-            df = pd.read_excel(file_path, engine='openpyxl')
-            
-            if df.empty:
-                st.warning(f"'{file_path.name}' 파일에 데이터가 없습니다.")
-                continue
-            
-            # 데이터프레임 기본 정보 출력
-            #st.success(f"'{file_path.name}' 파일 로드 완료: {len(df)}행, {len(df.columns)}열")
-            
-            # 데이터 전처리 및 마커 변환
-            markers = process_dataframe(df, file_category, language)
-            
-            if markers:
-                all_markers.extend(markers)
-                #st.success(f"'{file_path.name}'에서 {len(markers)}개 마커 추출 성공")
-            else:
-                st.warning(f"'{file_path.name}'에서 유효한 마커를 추출할 수 없습니다.")
-            
-        except Exception as e:
-            st.error(f"'{file_path.name}' 파일 처리 오류: {str(e)}")
-            import traceback
-            st.error(traceback.format_exc())
-    
-    if not all_markers:
-        st.error("모든 파일에서 유효한 마커를 찾을 수 없습니다.")
-    else:
-        st.success(f"총 {len(all_markers)}개의 마커를 성공적으로 로드했습니다.")
-    
-    return all_markers
+@st.cache_resource(show_spinner=False)
+def get_asset_watcher():
+    """에셋 폴더 감시기 - 서버 프로세스 내 모든 세션이 공유, 첫 적재 후 백그라운드 폴링 시작"""
+    watcher = AssetWatcher(Path("asset"))
+    watcher.refresh(report=streamlit_report)
+    watcher.start()
+    return watcher
 
-def process_dataframe(df, category, language="한국어"):
-    """데이터프레임을 Google Maps 마커 형식으로 변환 - X, Y 좌표 처리 개선"""
-    markers = []
-    
-    # 1. X, Y 좌표 열 감지 (대소문자 및 다양한 이름 형식 지원)
-    x_candidates = [col for col in df.columns if ('x' in col.lower() or 'X' in col) and '좌표' in col]
-    y_candidates = [col for col in df.columns if ('y' in col.lower() or 'Y' in col) and '좌표' in col]
-    
-    # 중국어 좌표 열 처리
-    # if not x_candidates:
-    #     x_candidates = [col for col in df.columns if 'X坐标' in col or 'x坐标' in col]
-    # if not y_candidates:
-    #     y_candidates = [col for col in df.columns if 'Y坐标' in col or 'y坐标' in col]
-    
-    # 단순 X, Y 열 확인
-    # if not x_candidates:
-    #     x_candidates = [col for col in df.columns if col.upper() == 'X' or col.lower() == 'x']
-    # if not y_candidates:
-    #     y_candidates = [col for col in df.columns if col.upper() == 'Y' or col.lower() == 'y']
-    
-    # 경도/위도 열 확인
-    # if not x_candidates:
-    #     x_candidates = [col for col in df.columns if '경도' in col or 'longitude' in col.lower() or 'lon' in col.lower()]
-    # if not y_candidates:
-    #     y_candidates = [col for col in df.columns if '위도' in col or 'latitude' in col.lower() or 'lat' in col.lower()]
-    
-    # X, Y 좌표 열 선택
-    x_col = x_candidates[0] if x_candidates else None
-    y_col = y_candidates[0] if y_candidates else None
-    
-    # 2. X, Y 좌표 열이 없는 경우 숫자 열에서 자동 감지
-    if not x_col or not y_col:
-        st.warning(f"'{category}' 데이터에서 명시적인 X, Y 좌표 열을 찾을 수 없습니다. 숫자 열에서 자동 감지를 시도합니다.")
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        
-        if len(numeric_cols) >= 2:
-            # 각 열의 값 범위를 분석하여 위경도 추정
-            for col in numeric_cols:
-                if df[col].dropna().empty:
-                    continue
-                    
-                # 열의 값 통계 확인
-                col_mean = df[col].mean()
-                col_min = df[col].min()
-                col_max = df[col].max()
-                
-                # 경도(X) 범위 확인: 한국 경도는 대략 124-132
-                if 120 <= col_mean <= 140:
-                    x_col = col
-                    st.info(f"X좌표(경도)로 '{col}' 열을 자동 감지했습니다. 범위: {col_min:.2f}~{col_max:.2f}")
-                
-                # 위도(Y) 범위 확인: 한국 위도는 대략 33-43
-                elif 30 <= col_mean <= 45:
-                    y_col = col
-                    st.info(f"Y좌표(위도)로 '{col}' 열을 자동 감지했습니다. 범위: {col_min:.2f}~{col_max:.2f}")
-    
-    # 3. 좌표 열을 여전히 못 찾은 경우 마지막 시도: 단순히 마지막 두 개의 숫자 열 사용
-    # if not x_col or not y_col:
-    #     numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-    #     if len(numeric_cols) >= 2:
-    #         x_col = numeric_cols[-2]  # 뒤에서 두 번째 숫자 열
-    #         y_col = numeric_cols[-1]  # 마지막 숫자 열
-    #         st.warning(f"좌표 추정: X좌표='{x_col}', Y좌표='{y_col}' (마지막 두 숫자 열)")
-    
-    # 4. 여전히 좌표 열을 찾지 못한 경우
-    if not x_col or not y_col:
-        st.error(f"'{category}' 데이터에서 X, Y 좌표 열을 찾을 수 없습니다.")
-        st.error(f"사용 가능한 열: {', '.join(df.columns.tolist())}")
-        return []
-    
-    # 5. 좌표 데이터 전처리
-    #st.success(f"좌표 열 감지 성공: X='{x_col}', Y='{y_col}'")
-    
-    # NaN 값 처리
-    df = df.dropna(subset=[x_col, y_col])
-    
-    # 문자열을 숫자로 변환
-    # try:
-    #     df[x_col] = pd.to_numeric(df[x_col], errors='coerce')
-    #     df[y_col] = pd.to_numeric(df[y_col], errors='coerce')
-    #     df = df.dropna(subset=[x_col, y_col])  # 변환 후 NaN이 된 값 제거
-    # except Exception as e:
-    #     st.warning(f"좌표 변환 오류: {str(e)}")
-    
-    # 0 값 제거
-    df = df[(df[x_col] != 0) & (df[y_col] != 0)]
-    
-    # 6. 좌표 유효성 검증 및 교정
-    # 한국 영역 좌표 체크 (경도 124-132, 위도 33-43)
-    valid_coords = (df[x_col] >= 124) & (df[x_col] <= 132) & (df[y_col] >= 33) & (df[y_col] <= 43)
-    
-    # X,Y가 바뀐 경우 체크 (Y가 경도, X가 위도인 경우)
-  #  swapped_coords = (df[y_col] >= 124) & (df[y_col] <= 132) & (df[x_col] >= 33) & (df[x_col] <= 43)
-    
-    # X,Y가 바뀐 경우 자동 교정
-    # if swapped_coords.sum() > valid_coords.sum():
-    #     st.warning(f"'{category}' 데이터의 X,Y 좌표가 바뀐 것으로 보입니다. 자동으로 교정합니다.")
-    #     df['temp_x'] = df[x_col].copy()
-    #     df[x_col] = df[y_col]
-    #     df[y_col] = df['temp_x']
-    #     df = df.drop('temp_x', axis=1)
-        
-        # 다시 유효성 검증
-   #     valid_coords = (df[x_col] >= 124) & (df[x_col] <= 132) & (df[y_col] >= 33) & (df[y_col] <= 43)
-    
-    # 유효한 좌표만 필터링
-    valid_df = df[valid_coords]
-    
-    if valid_df.empty:
-        st.error(f"'{category}' 데이터에 유효한 한국 영역 좌표가 없습니다.")
-        st.info(f"원본 좌표 범위: X({df[x_col].min():.2f}~{df[x_col].max():.2f}), Y({df[y_col].min():.2f}~{df[y_col].max():.2f})")
-        
-        # 좌표 값 10000으로 나누기 시도 (혹시 UTM 좌표계인 경우)
-        if df[x_col].max() > 1000000 or df[y_col].max() > 1000000:
-            st.warning("좌표값이 매우 큽니다. UTM 좌표계일 수 있어 10000으로 나누어 변환을 시도합니다.")
-            df[x_col] = df[x_col] / 10000
-            df[y_col] = df[y_col] / 10000
-            
-            # 다시 유효성 검증
-            valid_coords = (df[x_col] >= 124) & (df[x_col] <= 132) & (df[y_col] >= 33) & (df[y_col] <= 43)
-            valid_df = df[valid_coords]
-            
-            if not valid_df.empty:
-                st.success(f"좌표 변환 성공! 유효한 좌표 {len(valid_df)}개 발견")
-            else:
-                st.error("좌표 변환 실패! 유효한 한국 영역 좌표를 찾을 수 없습니다.")
-                return []
-    
-    # 7. 이름 열 결정
-    name_col = get_name_column(df, category, language)
+def get_poi_store():
+    """현재 게시된 공유 POI 저장소 반환 (세션에는 버전 핸들만 저장)
     
-    # 8. 주소 열 결정
-    address_col = get_address_column(df, language)
-    
-    # 9. 각 행을 마커로 변환
-    success_count = 0
-    for idx, row in valid_df.iterrows():
-        try:
-            # 기본 정보
-            if name_col and pd.notna(row.get(name_col)):
-                name = str(row[name_col])
-            else:
-                name = f"{category} #{idx+1}"
-                
-            # 좌표 추출
-            lat = float(row[y_col])  # 위도 (Y좌표)
-            lng = float(row[x_col])  # 경도 (X좌표)
-            
-            # 좌표값 유효성 최종 확인
-            if not (33 <= lat <= 43 and 124 <= lng <= 132):
-                continue  # 유효하지 않은 좌표 건너뛰기
-            
-            # 주소 정보
-            address = ""
-            if address_col and address_col in row and pd.notna(row[address_col]):
-                address = row[address_col]
-            
-            # 정보창 HTML 구성
-            info = build_info_html(row, name, address, category)
-            
-            # 마커 색상 결정
-            color = CATEGORY_COLORS.get(category, "gray")
-            
-            # 마커 생성
-            marker = {
-                'lat': lat,
-                'lng': lng,
-                'title': name,
-                'color': color,
-                'category': category,
-                'info': info,
-                'address': address
-            }
-            markers.append(marker)
-            success_count += 1
-            
-        except Exception as e:
-            print(f"마커 생성 오류 (행 #{idx}): {e}")
-            continue
-    
-    #st.success(f"'{category}' 데이터에서 {success_count}개의 마커를 성공적으로 생성했습니다.")
-    return markers
+    에셋 파일이 바뀌면 감시기가 바뀐 파일만 다시 적재해 새 버전을 게시하고,
+    실행 중인 세션은 다음 재실행 때 새 버전을 사용한다.
+    """
+    store = get_asset_watcher().store
+    if st.session_state.get("poi_store_version") not in (None, store.version):
+        remap_session_rows(store)
+    st.session_state.poi_store_version = store.version
+    return store
 
-# 이름 열 결정 함수
-def get_name_column(df, category, language):
-    """카테고리와 언어에 따른 이름 열 결정"""
-    name_candidates = []
-    
-    # 언어별 기본 후보
-    if language == "한국어":
-        name_candidates = ['명칭(한국어)', '명칭', '이름', '시설명', '관광지명', '장소명', '상호', '상호명']
-    elif language == "영어":
-        name_candidates = ['명칭(영어)', 'PLACE', 'NAME', 'TITLE', 'ENGLISH_NAME', 'name']
-    elif language == "중국어":
-        name_candidates = ['명칭(중국어)', '名称', '中文名', '名稱']
-    
-    # 카테고리별 특수 처리
-    if category == "종로구 관광지" and language == "중국어":
-        name_candidates = ['名称'] + name_candidates
-    elif category == "한국음식점":
-        if language == "한국어":
-            name_candidates = ['상호명(한글)', '상호명', '업소명'] + name_candidates
-        elif language == "영어":
-            name_candidates = ['상호명(영문)', '영문명'] + name_candidates
-        elif language == "중국어":
-            name_candidates = ['상호명(중문)', '중문명'] + name_candidates
-    
-    # 후보 열 중 존재하는 첫 번째 열 사용
-    for col in name_candidates:
-        if col in df.columns:
-            return col
-    
-    # 명칭 열이 없으면 첫 번째 문자열 열 사용
-    string_cols = [col for col in df.columns if df[col].dtype == 'object']
-    if string_cols:
-        return string_cols[0]
-    
-    return None
+def remap_session_rows(store):
+    """
+    저장소 버전이 바뀌었을 때 세션의 만든 코스에 남은 이전 버전 행 번호(poi_id)를 새 저장소 행으로 바꾼다
+    (행 번호는 버전마다 다름). 같은 위치(1m 안)에 장소가 없으면 poi_id 를 지워 좌표로 계산하게 한다.
+    """
+    course_plan = st.session_state.get("course_plan")
+    if not course_plan:
+        return
+    for day_course in course_plan["courses"]:
+        for place in day_course:
+            place.pop('poi_id', None)
+            rows, distances = store.spatial_index.within(place['lat'], place['lng'], 1.0)
+            if len(rows):
+                place['poi_id'] = int(rows[np.argmin(distances)])
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _hotel_proximity(_poi_store, store_version, hotel_signature):
+    """저장소 버전/호텔 파일 서명별 호텔 주변 POI 집계 (저장소 객체는 캐시 키에서 제외)"""
+    return load_hotel_proximity(_poi_store)
+
+def get_hotel_proximity(poi_store):
+    """
+    호텔별 주변 POI 집계 표 (poi.hotels.HotelProximity, 호텔 파일이 없거나 읽을 수 없으면 None)
+    POI 저장소 버전과 호텔 파일마다 한 번만 계산(또는 캐시 파일에서 읽기)해 모든 세션이 공유한다.
+    """
+    if not HOTEL_FILE.exists():
+        return None
+    stat = HOTEL_FILE.stat()
+    try:
+        return _hotel_proximity(poi_store, poi_store.version, (stat.st_size, stat.st_mtime_ns))
+    except (OSError, ValueError, KeyError) as e:
+        st.warning(f"호텔 정보를 읽을 수 없습니다: {e}")
+        return None
+
+# 지도 범례 색상
+MAP_LEGEND_COLORS = {
+    "관광 명소": "red",
+    "숙박": "blue",
+    "음식점": "yellow",
+    "쇼핑": "green",
+    "교통": "purple",
+    "문화": "orange",
+    "기타": "pink"
+}
+
+# 도달 범위 영역 색상 (이동 시간 분 → 색상)
+REACH_OVERLAY_COLORS = {15: "#2E7D32", 30: "#F9A825", 60: "#C62828"}
+
+def map_category_counts(markers, poi_table=None):
+    """지도 마커(딕셔너리 목록 + POI 테이블)의 카테고리별 개수 (처음 등장한 순서)"""
+    categories = {}
+    for marker in markers:
+        category = marker.get('category', '기타')
+        categories[category] = categories.get(category, 0) + 1
+    if poi_table is not None:
+        for category, count in poi_table.category_counts().items():
+            categories[category] = categories.get(category, 0) + count
+    return categories
+
+def map_legend(categories):
+    """범례 항목 [(카테고리, 색상, 개수)] - 마커가 있는 카테고리만"""
+    return [(category, color, categories[category]) for category, color in MAP_LEGEND_COLORS.items() if categories.get(category)]
 
-# 주소 열 결정 함수
-def get_address_column(df, language):
-    """언어에 따른 주소 열 결정"""
-    address_candidates = []
-    
-    if language == "한국어":
-        address_candidates = ['주소(한국어)', '주소', '소재지', '도로명주소', '지번주소', '위치', 'ADDRESS']
-    elif language == "영어":
-        address_candidates = ['주소(영어)', 'ENGLISH_ADDRESS', 'address', 'location']
-    elif language == "중국어":
-        address_candidates = ['주소(중국어)', '地址', '位置', '中文地址']
-    
-    # 후보 열 중 존재하는 첫 번째 열 사용
-    for col in address_candidates:
-        if col in df.columns:
-            return col
-    
-    return None
-
-# 정보창 HTML 구성 함수
-def build_info_html(row, name, address, category):
-    """마커 정보창 HTML 구성"""
-    info = f"<div style='padding: 10px; max-width: 300px;'>"
-    info += f"<h3 style='margin-top: 0; color: #1976D2;'>{name}</h3>"
-    info += f"<p><strong>분류:</strong> {category}</p>"
-    
-    if address:
-        info += f"<p><strong>주소:</strong> {address}</p>"
-    
-    info += "</div>"
-    return info
-    
 def create_google_maps_html(api_key, center_lat, center_lng, markers=None, zoom=13, language="ko", 
-                           navigation_mode=False, start_location=None, end_location=None, transport_mode=None, daily_routes=None):
-    """Google Maps HTML 생성 - 내비게이션 기능 추가 및 수정"""
+                           navigation_mode=False, start_location=None, end_location=None, transport_mode=None, daily_routes=None,
+                           poi_table=None, poi_language="한국어"):
+    """Google Maps HTML 생성 - 내비게이션 기능 추가 및 수정 (poi_table: 마커 딕셔너리 없이 그릴 MarkerTable)"""
     if markers is None:
         markers = []
     
-    # 카테고리별 마커 그룹화
-    categories = {}
-    for marker in markers:
-        category = marker.get('category', '기타')
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(marker)
+    # 마커 데이터 행 [위도, 경도, 이름, 색상, 카테고리, 주소, 정보]
+    # 정보창 HTML은 미리 만들지 않고 마커를 클릭할 때 브라우저에서 원본 필드로 만든다.
+    # 정보가 null인 행(POI 테이블)은 이름/카테고리/주소로 정보창을 구성한다.
+    marker_rows = [
+        [m['lat'], m['lng'], m.get('title', ''), m.get('color', 'red'), m.get('category', ''), '', m.get('info', '')]
+        for m in markers
+    ]
+    if poi_table is not None:
+        marker_rows.extend(
+            [lat, lng, title, color, category, address, None]
+            for lat, lng, title, color, category, address in poi_table.rows(poi_language)
+        )
+    # </script> 로 스크립트가 끊기지 않도록 '</' 이스케이프
+    marker_data_json = json.dumps(marker_rows, ensure_ascii=False).replace("</", "<\\/")
+    
+    # 카테고리별 마커 수 (처음 등장한 순서)
+    categories = map_category_counts(markers, poi_table)
     
     # 범례 HTML
     legend_items = []
-    CATEGORY_COLORS = {
-        "관광 명소": "red",
-        "숙박": "blue",
-        "음식점": "yellow",
-        "쇼핑": "green",
-        "교통": "purple",
-        "문화": "orange",
-        "기타": "pink"
-    }
-    
-    for category, color in CATEGORY_COLORS.items():
-        # 해당 카테고리의 마커가 있는 경우만 표시
-        if any(m.get('category') == category for m in markers):
-            count = sum(1 for m in markers if m.get('category') == category)
-            legend_html_item = f'<div class="legend-item"><img src="https://maps.google.com/mapfiles/ms/icons/{color}-dot.png" alt="{category}"> {category} ({count})</div>'
-            legend_items.append(legend_html_item)
+    for category, color, count in map_legend(categories):
+        legend_html_item = f'<div class="legend-item"><img src="https://maps.google.com/mapfiles/ms/icons/{color}-dot.png" alt="{category}"> {category} ({count})</div>'
+        legend_items.append(legend_html_item)
     
     legend_html = "".join(legend_items)
     
     # 마커 JavaScript 코드 생성
-    markers_js = ""
-    for i, marker in enumerate(markers):
-        color = marker.get('color', 'red')
-        title = marker.get('title', '').replace("'", "\\\'").replace('"', '\\\"')
-        info = marker.get('info', '').replace("'", "\\\'").replace('"', '\\\"')
-        category = marker.get('category', '').replace("'", "\\\'").replace('"', '\\\"')
-        
-        # 마커 아이콘 URL
-        icon_url = f"https://maps.google.com/mapfiles/ms/icons/{color}-dot.png"
-        
-        # 정보창 HTML 내용
-        info_content = f"""
-            <div style="padding: 10px; max-width: 300px;">
-                <h3 style="margin-top: 0; color: #1976D2;">{title}</h3>
-                <p><strong>분류:</strong> {category}</p>
-                <div>{info}</div>
-            </div>
-        """.replace("'", "\\\\'").replace("\n", "")
-        
-        # 마커 생성 코드
-        marker_js_template = """
-            var marker{0} = new google.maps.Marker({{
-                position: {{ lat: {1}, lng: {2} }},
-                map: map,
-                title: '{3}',
-                icon: '{4}',
-                animation: google.maps.Animation.DROP
-            }});
+    # 마커마다 코드를 만들지 않고 데이터 배열 하나를 순회하며, 정보창은 하나를 공유한다.
+    markers_js = """
+            var markerData = """ + marker_data_json + """;
+            var sharedInfoWindow = new google.maps.InfoWindow();
+            infoWindows.push(sharedInfoWindow);
             
-            markers.push(marker{0});
-            markerCategories.push('{5}');
+            function escapeHtml(text) {
+                return String(text == null ? '' : text)
+                    .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+                    .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+            }
             
-            var infowindow{0} = new google.maps.InfoWindow({{
-                content: '{6}'
-            }});
+            // 정보창 HTML 구성 (poi.table.build_info_html 과 같은 형식)
+            function buildInfoHtml(title, address, category) {
+                var info = "<div style='padding: 10px; max-width: 300px;'>";
+                info += "<h3 style='margin-top: 0; color: #1976D2;'>" + escapeHtml(title) + "</h3>";
+                info += "<p><strong>분류:</strong> " + escapeHtml(category) + "</p>";
+                if (address) {
+                    info += "<p><strong>주소:</strong> " + escapeHtml(address) + "</p>";
+                }
+                info += "</div>";
+                return info;
+            }
             
-            marker{0}.addListener('click', function() {{
-                closeAllInfoWindows();
-                infowindow{0}.open(map, marker{0});
-                
-                // 마커 바운스 애니메이션
-                if (currentMarker) currentMarker.setAnimation(null);
-                marker{0}.setAnimation(google.maps.Animation.BOUNCE);
-                currentMarker = marker{0};
+            function infoContent(row) {
+                var info = row[6] === null ? buildInfoHtml(row[2], row[5], row[4]) : row[6];
+                return '<div style="padding: 10px; max-width: 300px;">' +
+                    '<h3 style="margin-top: 0; color: #1976D2;">' + escapeHtml(row[2]) + '</h3>' +
+                    '<p><strong>분류:</strong> ' + escapeHtml(row[4]) + '</p>' +
+                    '<div>' + info + '</div>' +
+                    '</div>';
+            }
+            
+            function addMarker(i) {
+                var row = markerData[i];
+                var marker = new google.maps.Marker({
+                    position: { lat: row[0], lng: row[1] },
+                    map: map,
+                    title: row[2],
+                    icon: 'https://maps.google.com/mapfiles/ms/icons/' + row[3] + '-dot.png',
+                    animation: google.maps.Animation.DROP
+                });
                 
-                // 애니메이션 종료
-                setTimeout(function() {{
-                    marker{0}.setAnimation(null);
-                }}, 1500);
+                markers.push(marker);
+                markerCategories.push(row[4]);
                 
-                // 부모 창에 마커 클릭 이벤트 전달
-                window.parent.postMessage({{
-                    'type': 'marker_click',
-                    'id': {0},
-                    'title': '{3}',
-                    'lat': {1},
-                    'lng': {2},
-                    'category': '{5}'
-                }}, '*');
-            }});
+                marker.addListener('click', function() {
+                    closeAllInfoWindows();
+                    sharedInfoWindow.setContent(infoContent(row));
+                    sharedInfoWindow.open(map, marker);
+                    
+                    // 마커 바운스 애니메이션
+                    if (currentMarker) currentMarker.setAnimation(null);
+                    marker.setAnimation(google.maps.Animation.BOUNCE);
+                    currentMarker = marker;
+                    
+                    // 애니메이션 종료
+                    setTimeout(function() {
+                        marker.setAnimation(null);
+                    }, 1500);
+                    
+                    // 부모 창에 마커 클릭 이벤트 전달
+                    window.parent.postMessage({
+                        'type': 'marker_click',
+                        'id': i,
+                        'title': row[2],
+                        'lat': row[0],
+                        'lng': row[1],
+                        'category': row[4]
+                    }, '*');
+                });
+            }
             
-            infoWindows.push(infowindow{0});
-        """
-        
-        # format 메서드로 동적 값 채우기
-        curr_marker_js = marker_js_template.format(
-            i, marker['lat'], marker['lng'], title, icon_url, category, info_content
-        )
-        
-        markers_js += curr_marker_js
+            for (var i = 0; i < markerData.length; i++) {
+                addMarker(i);
+            }
+    """
     
     # 필터링 함수
     filter_js = """
@@ -1632,8 +1431,9 @@ def create_google_maps_html(api_key, center_lat, center_lng, markers=None, zoom=
 
     
 def show_google_map(api_key, center_lat, center_lng, markers=None, zoom=13, height=600, language="한국어", 
-                   navigation_mode=False, start_location=None, end_location=None, transport_mode=None, daily_routes=None):
-    """Google Maps 컴포넌트 표시 - 내비게이션 기능 추가"""
+                   navigation_mode=False, start_location=None, end_location=None, transport_mode=None, daily_routes=None,
+                   poi_table=None):
+    """Google Maps 컴포넌트 표시 - 내비게이션 기능 추가 (poi_table: 공유 MarkerTable 을 그대로 표시)"""
     # 언어 코드 변환
     lang_code = LANGUAGE_CODES.get(language, "ko")
     
@@ -1658,7 +1458,9 @@ def show_google_map(api_key, center_lat, center_lng, markers=None, zoom=13, heig
             language=lang_code,
             navigation_mode=navigation_mode,
             daily_routes=daily_routes,  # 일별 경로 데이터 전달
-            transport_mode=transport_mode  # 교통 수단 정보 전달
+            transport_mode=transport_mode,  # 교통 수단 정보 전달
+            poi_table=poi_table,
+            poi_language=language
         )
         
         # HTML 컴포넌트로 표시
@@ -1686,6 +1488,9 @@ def show_google_map(api_key, center_lat, center_lng, markers=None, zoom=13, heig
                         tooltip=marker.get('title', ''),
                         icon=folium.Icon(color=marker.get('color', 'red'))
                     ).add_to(m)
+            if poi_table is not None:
+                for lat, lng, title, color, category, address in poi_table.rows(language):
+                    folium.Marker([lat, lng], popup=title, tooltip=title, icon=folium.Icon(color=color)).add_to(m)
             
             # folium 지도 표시
             folium_static(m)
@@ -1696,11 +1501,78 @@ def show_google_map(api_key, center_lat, center_lng, markers=None, zoom=13, heig
             
             # 비상용 텍스트 지도 표시
             st.warning("텍스트 기반 위치 정보:")
+            if poi_table is not None and len(poi_table):
+                markers = markers + poi_table.markers(range(min(10, len(poi_table))), language)
             if markers:
                 for i, marker in enumerate(markers[:10]):  # 상위 10개만
                     st.text(f"{i+1}. {marker.get('title', '무제')} - 좌표: ({marker['lat']}, {marker['lng']})")
             return False
 
+# 화면 영역 단위로 POI 마커를 주고받는 지도 컴포넌트 (components/poi_map/index.html)
+POI_MAP_COMPONENT = st.components.v1.declare_component(
+    "poi_map", path=str(Path(__file__).resolve().parent / "components" / "poi_map")
+)
+
+def show_poi_map(api_key, center_lat, center_lng, poi_store, markers=None, zoom=13, height=600, language="한국어", key="poi_map",
+                 overlays=None):
+    """공유 POI 저장소를 화면 영역 단위로 표시하는 Google Maps 컴포넌트
+    
+    지도는 이동/확대가 끝날 때마다 현재 영역과 카테고리 필터를 postMessage(setComponentValue)로 알리고,
+    서버는 저장소의 공간 인덱스로 그 영역의 마커만 골라 다음 렌더링 인자로 보낸다.
+    확대 수준 8~18 에서는 미리 만든 클러스터의 중심과 개수를 보내고 묶이지 않은 POI 만 마커로 보낸다.
+    전체 마커를 HTML 에 넣지 않으므로 전달량은 화면에 보이는 마커 수에 비례한다.
+    markers 는 항상 표시할 마커 딕셔너리 목록(내 위치 등)이다.
+    overlays 는 지도에 겹쳐 그릴 영역 목록 [{"color": 색상, "rects": [[남, 서, 북, 동], ...]}] 이다 (도달 범위 등).
+    """
+    if markers is None:
+        markers = []
+    
+    # 저장소가 비어 있으면(에셋 없음/적재 실패) 화면 영역 질의 없이 markers(내 위치)만 담은 기본 지도
+    if not poi_store:
+        return show_google_map(api_key, center_lat, center_lng, markers=markers, zoom=zoom, height=height,
+                               language=language)
+    
+    try:
+        # 지도가 알려 온 마지막 화면 영역과 카테고리 필터 (첫 렌더링이면 중심/확대 수준으로 추정)
+        viewport = st.session_state.get(key)
+        if viewport:
+            bounds, viewport_zoom, category = viewport, viewport["zoom"], viewport.get("category", "all")
+        else:
+            bounds, viewport_zoom, category = initial_bounds(center_lat, center_lng, zoom, height_px=height), zoom, "all"
+        # 확대 수준별 클러스터는 저장소 버전/카테고리마다 한 번 만들어 공유
+        clusters = poi_store.clusters(None if category == "all" else category)
+        payload = viewport_payload(poi_store.table, poi_store.spatial_index, bounds, viewport_zoom, language,
+                                   clusters=clusters)
+        payload["version"] = poi_store.version
+        payload["category"] = category
+        
+        categories = map_category_counts(markers, poi_store.table)
+        fixed_rows = [
+            [f"m{i}", m['lat'], m['lng'], m.get('title', ''), m.get('color', 'red'), m.get('category', ''), '', m.get('info', '')]
+            for i, m in enumerate(markers)
+        ]
+        POI_MAP_COMPONENT(
+            api_key=api_key,
+            center={"lat": center_lat, "lng": center_lng},
+            zoom=zoom,
+            language=LANGUAGE_CODES.get(language, "ko"),
+            height=height,
+            markers=fixed_rows,
+            categories=list(categories.items()),
+            legend=map_legend(categories),
+            viewport=payload,
+            overlays=overlays or [],
+            key=key,
+            default=None
+        )
+        return True
+    
+    except Exception as e:
+        # 컴포넌트를 쓸 수 없으면 전체 마커를 담은 기존 지도로 표시
+        st.warning(f"지도 컴포넌트 오류: {str(e)}")
+        return show_google_map(api_key, center_lat, center_lng, markers=markers, zoom=zoom, height=height,
+                               language=language, poi_table=poi_store.table)
+
 def display_visits(visits, current_lang_texts):
     """방문 기록 표시 함수"""
     if not visits:
@@ -1733,9 +1605,14 @@ def display_visits(visits, current_lang_texts):
 # 개선된 관광 코스 추천 함수
 #################################################
 
-def recommend_courses(data, travel_styles, num_days, include_children=False):
+def recommend_courses(data, travel_styles, num_days, include_children=False, spatial_index=None,
+                      pair_distances=None):
     """
     사용자 취향과 일정에 따른 관광 코스 추천 기능
+    data는 MarkerTable 이며, 후보로 뽑힌 장소만 딕셔너리로 변환한다.
+    spatial_index 는 data 좌표의 GridIndex (저장소 공유 인덱스, 없으면 새로 만든다)
+    pair_distances 는 data 의 POI 간 거리 표(poi.pairwise, 미리 만든 저장소에만 있음)로,
+    주면 두 번째 장소부터는 직전 장소에서 후보까지의 거리를 계산하지 않고 표에서 읽는다.
     """
     # 언어 설정에 따른 텍스트 가져오기
     current_lang_texts = st.session_state.texts[st.session_state.language]
@@ -1760,19 +1637,20 @@ def recommend_courses(data, travel_styles, num_days, include_children=False):
         return RECOMMENDATION_COURSES.get(course_type, []), course_type, []
 
     # 장소별 점수 계산
-    scored_places = []
+    # 점수는 카테고리에만 의존하므로 카테고리 코드별로 한 번 계산한 뒤 배열 인덱싱으로 적용
+    code_scores = np.ones(len(CATEGORY_NAMES))
 
-    for place in data:
+    for code, category in enumerate(CATEGORY_NAMES):
         # 기본 점수는 중요도
-        score = place.get('importance', 1.0)
+        score = 1.0
 
         # 여행 스타일에 따른 가중치 적용
         style_match = False
         for style in travel_styles:
             if style in STYLE_CATEGORY_WEIGHTS:
                 category_weights = STYLE_CATEGORY_WEIGHTS[style]
-                if place['category'] in category_weights:
-                    score *= category_weights[place['category']]
+                if category in category_weights:
+                    score *= category_weights[category]
                     style_match = True
 
         # 여행 스타일과 맞지 않는 장소는 점수 감소
@@ -1780,32 +1658,25 @@ def recommend_courses(data, travel_styles, num_days, include_children=False):
             score *= 0.5
 
         # 체육시설 점수 조정: 활동적인 스타일이 아니면 점수 대폭 감소
-        if place['category'] == "체육시설" and not any(style in travel_styles for style in ["활동적인", "Active", "活动型"]):
+        if category == "체육시설" and not any(style in travel_styles for style in ["활동적인", "Active", "活动型"]):
             score *= 0.3  # 더 강력하게 감소
 
         # 아이 동반인 경우 가족 친화적인 장소 선호 (미술관/전시)
-        if include_children and place['category'] == "미술관/전시":
+        if include_children and category == "미술관/전시":
             score *= 1.2
 
-        # 최종 점수 저장
-        scored_place = place.copy()
-        scored_place['score'] = score
-        scored_places.append(scored_place)
+        code_scores[code] = score
 
-    # 점수별 정렬
-    scored_places.sort(key=lambda x: x['score'], reverse=True)
+    scores = code_scores[data.category_code]
+
+    # 점수별 정렬 (같은 점수는 원래 순서 유지)
+    order = np.argsort(-scores, kind="stable")
 
     # 일수에 따른 장소 선택
     # 하루당 3곳 방문 가정 (아침, 점심, 저녁)
     places_per_day = 3
     total_places = num_days * places_per_day
 
-    # 카테고리 다양성 확보: 같은 카테고리 장소가 너무 많이 선택되지 않도록 함
-    category_counts = {}
-    for place in scored_places[:total_places * 2]:  # 상위 후보에서만 카운트
-        category = place['category']
-        category_counts[category] = category_counts.get(category, 0) + 1
-
     # 특정 카테고리가 너무 많으면 일부 제외
     MAX_PLACES_PER_CATEGORY = max(2, total_places // 3)  # 최소 2개, 또는 총 장소의 1/3
 
@@ -1815,67 +1686,81 @@ def recommend_courses(data, travel_styles, num_days, include_children=False):
     else:
         MAX_PLACES_PER_CATEGORY_GYM = MAX_PLACES_PER_CATEGORY
 
-    filtered_places = []
-    category_added = {}
-
     # 고득점 순으로 다양한 카테고리 장소 선택
-    for place in scored_places:
-        category = place['category']
-        max_for_category = MAX_PLACES_PER_CATEGORY_GYM if category == "체육시설" else MAX_PLACES_PER_CATEGORY
-
-        if category_added.get(category, 0) < max_for_category:
-            filtered_places.append(place)
-            category_added[category] = category_added.get(category, 0) + 1
-
-        # 충분한 장소를 모았으면 중단
-        if len(filtered_places) >= total_places * 2:
-            break
+    # 카테고리마다 점수순 상위 max_for_category개를 고른 뒤 점수 순서대로 합친다.
+    ordered_codes = data.category_code[order]
+    selected_positions = []
+    for code in np.unique(ordered_codes):
+        max_for_category = MAX_PLACES_PER_CATEGORY_GYM if CATEGORY_NAMES[code] == "체육시설" else MAX_PLACES_PER_CATEGORY
+        selected_positions.append(np.flatnonzero(ordered_codes == code)[:max_for_category])
+    selected_positions = np.sort(np.concatenate(selected_positions))[:total_places * 2]
+    candidate_indices = order[selected_positions]
 
     # 필터링된 장소가 충분하지 않으면 원래 목록 사용
-    if len(filtered_places) < total_places:
-        filtered_places = scored_places[:total_places * 2]
+    if len(candidate_indices) < total_places:
+        candidate_indices = order[:total_places * 2]
+
+    # 선택된 후보만 마커 딕셔너리로 변환
+    language = st.session_state.language
+    filtered_places = []
+    for index in candidate_indices:
+        place = data.marker(index, language)
+        place['score'] = float(scores[index])
+        place['poi_id'] = int(index)  # POI 간 거리 표/경로 주변 질의에서 쓰는 테이블 행 번호
+        filtered_places.append(place)
 
     # 동선 최적화: 그리디 알고리즘
     # 서울시청을 시작점으로 설정 (모든 날 아침에 숙소/시청에서 출발한다고 가정)
     seoul_city_hall = {"lat": 37.5665, "lng": 126.9780}
 
+    # 후보까지의 거리는 공유 공간 인덱스로 한 번에 계산 (poi.geo.distance_m, 장소별 geodesic 호출 없음)
+    if spatial_index is None:
+        spatial_index = GridIndex(data.lat, data.lng)
+    candidate_scores = scores[candidate_indices]
+    candidate_titles = [place['title'] for place in filtered_places]
+
     daily_courses = []
 
     for day in range(num_days):
         daily_course = []
         current_position = seoul_city_hall
+        current_row = None  # 현재 위치가 POI 이면 그 행 번호
 
-        # 이미 선택된 장소는 제외
-        available_places = [p for p in filtered_places if not any(p['title'] == dp['title'] for dc in daily_courses for dp in dc)]
+        # 이미 선택된 장소는 제외 (available 은 filtered_places 안의 위치 배열)
+        selected_titles = {dp['title'] for dc in daily_courses for dp in dc}
+        available = np.array([i for i, title in enumerate(candidate_titles) if title not in selected_titles], dtype=np.int64)
 
-        if not available_places:
+        if not len(available):
             break
 
         # 각 시간대별 최적 장소 선택
         for time_slot in range(places_per_day):
-            if not available_places:
+            if not len(available):
                 break
 
             # 거리 가중치가 적용된 점수 계산
-            for place in available_places:
-                distance = geodesic(
-                    (current_position['lat'], current_position['lng']),
-                    (place['lat'], place['lng'])
-                ).kilometers
+            if pair_distances is not None and current_row is not None:
+                distance = pair_distances.lookup(current_row, candidate_indices[available]) / 1000
+            else:
+                distance = spatial_index.distances(current_position['lat'], current_position['lng'],
+                                                   candidate_indices[available]) / 1000
 
-                # 거리에 따른 점수 감소 (너무 먼 곳은 피함)
-                distance_factor = max(0.5, 1 - (distance / 10))  # 10km 이상이면 점수 절반으로
-                place['adjusted_score'] = place.get('score', 1.0) * distance_factor
+            # 거리에 따른 점수 감소 (너무 먼 곳은 피함)
+            distance_factor = np.maximum(0.5, 1 - (distance / 10))  # 10km 이상이면 점수 절반으로
+            adjusted_scores = candidate_scores[available] * distance_factor
 
-            # 조정된 점수로 재정렬
-            available_places.sort(key=lambda x: x.get('adjusted_score', 0), reverse=True)
+            # 조정된 점수로 재정렬 (같은 점수는 직전 순서 유지)
+            ranking = np.argsort(-adjusted_scores, kind="stable")
+            available = available[ranking]
 
             # 최고 점수 장소 선택
-            next_place = available_places[0]
+            next_place = filtered_places[available[0]]
+            next_place['adjusted_score'] = float(adjusted_scores[ranking[0]])
             daily_course.append(next_place)
 
             # 선택된 장소 제거
-            available_places.remove(next_place)
+            current_row = int(candidate_indices[available[0]])
+            available = available[1:]
 
             # 현재 위치 업데이트
             current_position = {"lat": next_place['lat'], "lng": next_place['lng']}
@@ -1906,6 +1791,52 @@ def recommend_courses(data, travel_styles, num_days, include_children=False):
 
     return recommended_places, course_type, daily_courses
 
+
+def add_course_stop(course_plan, day_idx, place, api_key=None):
+    """
+    경로 주변 장소 place(find_corridor_stops 결과)를 day_idx 날 코스의 구간 place['leg'] 사이에 넣고
+    그날 경로 정보를 다시 계산한다. 구간이 바뀌므로 이전 구간 정보(route_info)는 버리고,
+    자동 최적화로 만든 코스면 Directions API 로 새 순서 그대로(재배열 없이)의 구간 정보를 다시 받는다.
+    """
+    day_course = course_plan["courses"][day_idx]
+    day_course.insert(place['leg'] + 1, {key: value for key, value in place.items() if key not in ('distance_m', 'leg')})
+    for stop in day_course:
+        stop.pop('route_info', None)
+    if course_plan["optimized"] and api_key:
+        course_plan["courses"][day_idx] = optimize_single_route(api_key, day_course, course_plan["transport_mode"],
+                                                                optimize=False)
+
+
+def find_corridor_stops(table, spatial_index, day_course, width_m=COURSE_CORRIDOR_WIDTH_M,
+                        per_category=COURSE_CORRIDOR_PER_CATEGORY, language="한국어"):
+    """
+    하루 코스 경로(장소를 차례로 이은 직선 구간) 주변 width_m 안의 들를 만한 장소
+    {카테고리 코드: [마커 딕셔너리, ...]} 이며 카테고리마다 경로에서 가까운 per_category 개를
+    경로 순으로 담는다. 마커에는 테이블 행 번호 'poi_id', 경로까지 거리 'distance_m', 구간 번호 'leg'
+    (leg번째 장소 → 다음 장소)가 붙는다.
+    공유 공간 인덱스의 경로 주변 질의(GridIndex.corridor)를 쓰며, 코스에 이미 있는 장소(poi_id)는 뺀다.
+    """
+    if not table or not day_course:
+        return {}
+    rows, distances, legs, _ = spatial_index.corridor([place['lat'] for place in day_course],
+                                                      [place['lng'] for place in day_course], width_m)
+    keep = ~np.isin(rows, [place['poi_id'] for place in day_course if 'poi_id' in place])
+    rows, distances, legs = rows[keep], distances[keep], legs[keep]
+
+    codes = table.category_code[rows]
+    stops = {}
+    for code in np.unique(codes).tolist():
+        selected = np.flatnonzero(codes == code)
+        selected = np.sort(selected[np.argsort(distances[selected], kind="stable")[:per_category]])
+        places = table.markers(rows[selected], language)
+        for place, row, distance, leg in zip(places, rows[selected].tolist(), distances[selected].tolist(),
+                                             legs[selected].tolist()):
+            place['poi_id'] = row
+            place['distance_m'] = distance
+            place['leg'] = leg
+        stops[code] = places
+    return stops
+
 #################################################
 # 페이지 함수
 #################################################
@@ -1975,6 +1906,13 @@ def show_login_page():
                 "map_places_by_category": "카테고리별 장소",
                 "map_category": "분류",
                 "map_other_category": "기타",
+                "map_nearby_places": "내 주변 장소",
+                "map_nearby_count": "카테고리별 개수",
+                "map_reach_title": "이동 시간별로 갈 수 있는 곳",
+                "map_reach_mode": "이동 수단",
+                "map_reach_show_area": "지도에 도달 범위 표시",
+                "map_reach_summary": "**{minutes}분 이내** · {count}곳",
+                "map_reach_caption": "직선거리의 {detour}배를 도로 거리로 보고 평균 속도로 계산한 추정치입니다.",
                 "map_no_destination_info": "목적지 정보가 없습니다.",
                 "map_back_to_map": "지도로 돌아가기",
                 "map_navigation_to": "까지 내비게이션",
@@ -2043,6 +1981,13 @@ def show_login_page():
                 "map_display_error": "코스 장소의 좌표 정보가 없어 지도에 표시할 수 없습니다.",
                 "save_course_button": "이 코스 저장하기",
                 "course_saved_success": "코스가 저장되었습니다!",
+                "course_on_the_way": "가는 길에 들를 곳",
+                "course_on_the_way_caption": "각 날의 코스 경로(장소 사이 직선 구간)에서 {width}m 안에 있는 장소입니다.",
+                "course_on_the_way_empty": "경로 주변에 들를 만한 장소가 없습니다.",
+                "course_add_stop": "➕ 코스에 추가",
+                "course_hotels_title": "여행 스타일에 맞는 장소가 가까운 숙소",
+                "course_hotels_radius": "주변 반경 (m)",
+                "course_hotels_caption": "반경 안 카테고리별 장소 수에 여행 스타일 가중치를 곱해 순위를 매깁니다.",
                 "travel_date_start": "여행 시작일",
                 "travel_date_end": "여행 종료일",
                 "travel_people_count": "여행 인원",
@@ -2120,6 +2065,13 @@ def show_login_page():
                 "map_places_by_category": "按类别查看地点",
                 "map_category": "类别",
                 "map_other_category": "其他",
+                "map_nearby_places": "我附近的地点",
+                "map_nearby_count": "每个类别的数量",
+                "map_reach_title": "按出行时间可到达的地点",
+                "map_reach_mode": "交通方式",
+                "map_reach_show_area": "在地图上显示可到达范围",
+                "map_reach_summary": "**{minutes}分钟内** · {count}处",
+                "map_reach_caption": "以直线距离的{detour}倍作为道路距离，按平均速度估算。",
                 "map_no_destination_info": "没有目的地信息。",
                 "map_back_to_map": "返回地图",
                 "map_navigation_to": "导航至",
@@ -2188,6 +2140,13 @@ def show_login_page():
                 "map_display_error": "由于路线地点缺少坐标信息，无法在地图上显示。",
                 "save_course_button": "保存此路线",
                 "course_saved_success": "路线已保存！",
+                "course_on_the_way": "顺路可去的地方",
+                "course_on_the_way_caption": "每天路线（地点之间的直线路段）{width}米以内的地点。",
+                "course_on_the_way_empty": "路线附近没有可去的地点。",
+                "course_add_stop": "➕ 加入路线",
+                "course_hotels_title": "附近有符合旅行风格地点的酒店",
+                "course_hotels_radius": "周边半径（米）",
+                "course_hotels_caption": "按半径内各类别地点数量乘以旅行风格权重排序。",
                 "travel_date_start": "旅行开始日期",
                 "travel_date_end": "旅行结束日期",
                 "travel_people_count": "旅行人数",
@@ -2265,6 +2224,13 @@ def show_login_page():
                 "map_places_by_category": "Places by Category",
                 "map_category": "Category",
                 "map_other_category": "Other",
+                "map_nearby_places": "Places Near Me",
+                "map_nearby_count": "Places per category",
+                "map_reach_title": "Reachable Places by Travel Time",
+                "map_reach_mode": "Travel mode",
+                "map_reach_show_area": "Show reachable area on map",
+                "map_reach_summary": "**Within {minutes} min** · {count} places",
+                "map_reach_caption": "Estimated from average speed, taking road distance as {detour}× the straight-line distance.",
                 "map_no_destination_info": "No destination information.",
                 "map_back_to_map": "Back to Map",
                 "map_navigation_to": "Navigation to",
@@ -2333,6 +2299,13 @@ def show_login_page():
                 "map_display_error": "Cannot display on map due to missing coordinate information for course locations.",
                 "save_course_button": "Save This Course",
                 "course_saved_success": "Course has been saved!",
+                "course_on_the_way": "Stops On The Way",
+                "course_on_the_way_caption": "Places within {width} m of each day's route (straight segments between stops).",
+                "course_on_the_way_empty": "No places found along the route.",
+                "course_add_stop": "➕ Add to course",
+                "course_hotels_title": "Hotels Close to Places Matching Your Style",
+                "course_hotels_radius": "Radius (m)",
+                "course_hotels_caption": "Ranked by the number of places per category within the radius, weighted by your travel styles.",
                 "travel_date_start": "Travel Start Date",
                 "travel_date_end": "Travel End Date",
                 "travel_people_count": "Number of Travelers",
@@ -2566,20 +2539,29 @@ def show_map_page():
     # 사용자 위치 가져오기
     user_location = get_location_position()
 
-    # 자동으로 Excel 파일 로드 (아직 로드되지 않은 경우)
-    if not st.session_state.markers_loaded or not st.session_state.all_markers:
-        with st.spinner(current_lang_texts.get("map_loading_data")):
-            all_markers = load_excel_files(st.session_state.language)
-            if all_markers:
-                st.session_state.all_markers = all_markers
-                st.session_state.markers_loaded = True
-                st.session_state.tourism_data = all_markers  # 코스 추천을 위해 저장
-                #st.success(current_lang_texts.get("map_load_complete").format(num_markers=len(all_markers)))
-            else:
-                st.warning(current_lang_texts.get("map_load_failed"))
+    # 공유 POI 저장소 조회 (프로세스 내 최초 1회만 Excel 파일 로드, 언어는 표시할 때 선택)
+    with st.spinner(current_lang_texts.get("map_loading_data")):
+        poi_store = get_poi_store()
+    if not poi_store:
+        st.warning(current_lang_texts.get("map_load_failed"))
+    poi_table = poi_store.table
 
     # 내비게이션 모드가 아닌 경우 기본 지도 표시
     if not st.session_state.navigation_active:
+        # 이동 수단/시간별 도달 가능 범위 (위치가 바뀔 때마다 공유 공간 인덱스로 다시 계산)
+        # 이동 수단과 영역 표시 여부는 정보 패널의 위젯 값이며, 지도보다 먼저 읽어 영역을 함께 그린다
+        reach_mode = st.session_state.get("reach_mode", "walking")
+        reach = reachable(poi_store.spatial_index, user_location[0], user_location[1], poi_table.category_code) if poi_table else {}
+        reach_overlays = []
+        if reach and st.session_state.get("reach_area"):
+            for minutes in sorted(REACH_MINUTES, reverse=True):  # 넓은 범위부터 아래에 그림
+                band = reach[reach_mode][minutes]
+                reach_overlays.append({
+                    "color": REACH_OVERLAY_COLORS.get(minutes, "#1976D2"),
+                    "rects": reach_grid(user_location[0], user_location[1], poi_table.lat[band["rows"]],
+                                        poi_table.lng[band["rows"]], band["radius_m"])
+                })
+
         map_col, info_col = st.columns([2, 1])
 
         with map_col:
@@ -2596,20 +2578,20 @@ def show_map_page():
                 'category': current_lang_texts.get("map_current_location_category")
             })
 
-            # 로드된 데이터 마커 추가
-            if st.session_state.all_markers:
-                markers.extend(st.session_state.all_markers)
-                #st.success(current_lang_texts.get("map_markers_displayed").format(num_markers=len(st.session_state.all_markers)))
+            # 로드된 데이터 마커는 지도가 알려 온 화면 영역 안의 것만 공간 인덱스로 골라 전달
+            #st.success(current_lang_texts.get("map_markers_displayed").format(num_markers=len(poi_table)))
 
             # Google Maps 표시
-            show_google_map(
+            show_poi_map(
                 api_key=api_key,
                 center_lat=user_location[0],
                 center_lng=user_location[1],
+                poi_store=poi_store,
                 markers=markers,
                 zoom=12,
                 height=600,
-                language=st.session_state.language
+                language=st.session_state.language,
+                overlays=reach_overlays
             )
 
         with info_col:
@@ -2617,16 +2599,19 @@ def show_map_page():
 
             # 검색 기능
             search_term = st.text_input(current_lang_texts.get("map_search_place"))
-            if search_term and st.session_state.all_markers:
-                search_results = [m for m in st.session_state.all_markers
-                                  if search_term.lower() in m['title'].lower()]
+            if search_term and poi_table:
+                # 이름 문자열 풀에서 바로 검색하고, 현재 위치에서 가까운 순으로 화면에 보일 상위 5개만 딕셔너리로 변환
+                search_results = poi_table.search(search_term, st.session_state.language)
+                search_distances = poi_store.spatial_index.distances(user_location[0], user_location[1], search_results)
+                nearest_first = np.argsort(search_distances, kind="stable")[:5]  # 상위 5개만
 
-                if search_results:
+                if len(search_results):
                     st.markdown(f"### 🔍 {current_lang_texts.get('map_search_results')} ({len(search_results)}개)")
-                    for i, marker in enumerate(search_results[:5]):  # 상위 5개만
+                    for i, marker in enumerate(poi_table.markers(search_results[nearest_first], st.session_state.language)):
                         with st.container():
                             st.markdown(f"**{marker['title']}**")
-                            st.caption(f"{current_lang_texts.get('map_category')}: {marker.get('category', current_lang_texts.get('map_other_category'))}")
+                            st.caption(f"{current_lang_texts.get('map_category')}: {marker.get('category', current_lang_texts.get('map_other_category'))}"
+                                       f" · {search_distances[nearest_first[i]] / 1000:.1f} km")
 
                             col1, col2 = st.columns([1,1])
                             with col1:
@@ -2656,20 +2641,49 @@ def show_map_page():
                 else:
                     st.info(current_lang_texts.get("map_no_search_results").format(search_term=search_term))
 
+            # 내 주변 장소: 카테고리마다 현재 위치에서 가장 가까운 k개 (공유 공간 인덱스로 조회)
+            if poi_table:
+                st.subheader(current_lang_texts.get("map_nearby_places"))
+                nearby_k = st.slider(current_lang_texts.get("map_nearby_count"), min_value=1, max_value=10, value=3, key="nearby_k")
+                categories_translation = CATEGORIES_TRANSLATION.get(st.session_state.language, CATEGORIES_TRANSLATION["한국어"])
+                nearby = poi_store.spatial_index.nearest_per_group(user_location[0], user_location[1],
+                                                                   poi_table.category_code, nearby_k)
+                for code, (rows, distances) in nearby.items():
+                    category = CATEGORY_NAMES[code]
+                    lines = [f"- {marker['title']} · {distance / 1000:.1f} km"
+                             for marker, distance in zip(poi_table.markers(rows, st.session_state.language), distances)]
+                    st.markdown(f"**{categories_translation.get(category, category)}**\n" + "\n".join(lines))
+
+            # 이동 시간별로 갈 수 있는 곳: 선택한 이동 수단으로 15/30/60분 안의 카테고리별 장소 수
+            if reach:
+                st.subheader(current_lang_texts.get("map_reach_title"))
+                reach_mode_names = {
+                    "walking": "🚶 " + current_lang_texts.get("map_walking"),
+                    "transit": "🚍 " + current_lang_texts.get("map_transit"),
+                    "driving": "🚗 " + current_lang_texts.get("map_driving")
+                }
+                reach_mode = st.radio(current_lang_texts.get("map_reach_mode"), list(TRAVEL_SPEEDS),
+                                      format_func=reach_mode_names.get, horizontal=True, key="reach_mode")
+                st.checkbox(current_lang_texts.get("map_reach_show_area"), key="reach_area")
+                st.caption(current_lang_texts.get("map_reach_caption").format(detour=DETOUR_FACTOR))
+                categories_translation = CATEGORIES_TRANSLATION.get(st.session_state.language, CATEGORIES_TRANSLATION["한국어"])
+                for minutes, band in reach[reach_mode].items():
+                    counts = ", ".join(f"{categories_translation.get(CATEGORY_NAMES[code], CATEGORY_NAMES[code])} {count}"
+                                       for code, count in band["counts"].items())
+                    st.markdown(current_lang_texts.get("map_reach_summary").format(minutes=minutes, count=len(band["rows"])) +
+                                (f"  \n{counts}" if counts else ""))
+
             # 카테고리별 통계 - 언어별 처리 개선
-            if st.session_state.all_markers:
+            if poi_table:
                 st.subheader(current_lang_texts.get("map_places_by_category"))
                 
                 # 현재 언어에 해당하는 카테고리 번역 가져오기
                 current_lang = st.session_state.language
                 categories_translation = CATEGORIES_TRANSLATION.get(current_lang, CATEGORIES_TRANSLATION["한국어"])
                 
-                # 카테고리별 카운트
+                # 카테고리별 카운트 (카테고리 코드 배열에서 집계)
                 categories = {}
-                for m in st.session_state.all_markers:
-                    # 원본 카테고리 이름 가져오기
-                    raw_cat = m.get('category', '기타')
-                    
+                for raw_cat, raw_count in poi_table.category_counts().items():
                     # 번역된 카테고리 이름 찾기
                     if raw_cat in categories_translation:
                         translated_cat = categories_translation[raw_cat]
@@ -2679,7 +2693,7 @@ def show_map_page():
                     
                     if translated_cat not in categories:
                         categories[translated_cat] = 0
-                    categories[translated_cat] += 1
+                    categories[translated_cat] += raw_count
 
                 # 번역된 카테고리 이름으로 출력
                 for cat, count in categories.items():
@@ -2703,7 +2717,7 @@ def show_map_page():
             user_lat, user_lng = user_location
 
             # 직선 거리 계산
-            distance = geodesic((user_lat, user_lng), (dest_lat, dest_lng)).meters
+            distance = float(distance_m(user_lat, user_lng, dest_lat, dest_lng))
 
             if not st.session_state.transport_mode:
                 st.markdown(f"### {current_lang_texts.get('map_select_transport')}")
@@ -2711,7 +2725,7 @@ def show_map_page():
                 col1, col2, col3 = st.columns(3)
 
                 with col1:
-                    walk_time = distance / 67  # 도보 속도 약 4km/h (67m/분)
+                    walk_time = distance / TRAVEL_SPEEDS["walking"]  # 도보 속도 약 4km/h (67m/분)
                     st.markdown(f"""
                     <div class="card">
                         <h3>🚶 {current_lang_texts.get('map_walking')}</h3>
@@ -2724,7 +2738,7 @@ def show_map_page():
                         st.rerun()
 
                 with col2:
-                    transit_time = distance / 200  # 대중교통 속도 약 12km/h (200m/분)
+                    transit_time = distance / TRAVEL_SPEEDS["transit"]  # 대중교통 속도 약 12km/h (200m/분)
                     st.markdown(f"""
                     <div class="card">
                         <h3>🚍 {current_lang_texts.get('map_transit')}</h3>
@@ -2737,7 +2751,7 @@ def show_map_page():
                         st.rerun()
 
                 with col3:
-                    car_time = distance / 500  # 자동차 속도 약 30km/h (500m/분)
+                    car_time = distance / TRAVEL_SPEEDS["driving"]  # 자동차 속도 약 30km/h (500m/분)
                     st.markdown(f"""
                     <div class="card">
                         <h3>🚗 {current_lang_texts.get('map_driving')}</h3>
@@ -2815,14 +2829,12 @@ def show_map_page():
                     st.markdown(f"- {current_lang_texts.get('map_distance')}: {distance:.0f}m")
 
                     # 교통수단별 예상 시간
+                    speed = TRAVEL_SPEEDS[transport_mode]  # m/min
                     if transport_mode == "walking":
-                        speed = 67  # m/min
                         transport_desc = current_lang_texts.get('map_walking')
                     elif transport_mode == "transit":
-                        speed = 200  # m/min
                         transport_desc = current_lang_texts.get('map_transit')
                     else:  # driving
-                        speed = 500  # m/min
                         transport_desc = current_lang_texts.get('map_driving')
 
                     time_min = distance / speed
@@ -3253,10 +3265,22 @@ def show_course_map_with_routes(api_key, daily_courses, transport_mode="DRIVING"
             return False
 
 
-def calculate_course_route_info_with_korean_names(daily_courses, transport_mode="DRIVING"):
+def course_leg_distances(day_course, pair_distances=None):
+    """
+    하루 코스의 연속 구간 직선 거리(m) 배열
+    모든 장소가 저장소 POI(poi_id)이고 POI 간 거리 표가 있으면 표에서 읽고, 아니면 좌표로 계산한다.
+    """
+    if pair_distances is not None and all('poi_id' in place for place in day_course):
+        return pair_distances.legs([place['poi_id'] for place in day_course])
+    return leg_distances_m([place['lat'] for place in day_course],
+                           [place['lng'] for place in day_course])
+
+
+def calculate_course_route_info_with_korean_names(daily_courses, transport_mode="DRIVING", pair_distances=None):
     """
     한국어 장소명을 사용한 코스의 예상 이동 시간과 거리 계산
     실제 Google Directions API 응답을 시뮬레이션
+    pair_distances 는 저장소의 POI 간 거리 표 (poi.pairwise, 없으면 좌표로 계산)
     """
     route_info = []
     
@@ -3277,16 +3301,13 @@ def calculate_course_route_info_with_korean_names(daily_courses, transport_mode=
         total_time = 0
         route_details = []
         
-        for i in range(len(day_course) - 1):
+        # 직선 거리 계산 (하루 코스의 구간 거리를 한 번에)
+        leg_distances = course_leg_distances(day_course, pair_distances) / 1000
+        
+        for i, distance in enumerate(leg_distances.tolist()):
             current = day_course[i]
             next_place = day_course[i + 1]
             
-            # 직선 거리 계산
-            distance = geodesic(
-                (current['lat'], current['lng']),
-                (next_place['lat'], next_place['lng'])
-            ).kilometers
-            
             # 실제 도로 거리 추정 (서울 시내 특성상 직선거리의 1.4배로 가정)
             road_distance = distance * 1.4
             time_hours = road_distance / speed
@@ -3314,10 +3335,11 @@ def calculate_course_route_info_with_korean_names(daily_courses, transport_mode=
     return route_info
 
 
-def calculate_course_route_info(daily_courses, transport_mode="DRIVING"):
+def calculate_course_route_info(daily_courses, transport_mode="DRIVING", pair_distances=None):
     """
     코스의 예상 이동 시간과 거리 계산 (간단한 추정)
     실제로는 Directions API의 응답에서 가져와야 하지만, 여기서는 추정값 제공
+    pair_distances 는 저장소의 POI 간 거리 표 (poi.pairwise, 없으면 좌표로 계산)
     """
     route_info = []
     
@@ -3337,16 +3359,10 @@ def calculate_course_route_info(daily_courses, transport_mode="DRIVING"):
         total_distance = 0
         total_time = 0
         
-        for i in range(len(day_course) - 1):
-            current = day_course[i]
-            next_place = day_course[i + 1]
-            
-            # 직선 거리 계산 (실제로는 도로 거리와 다름)
-            distance = geodesic(
-                (current['lat'], current['lng']),
-                (next_place['lat'], next_place['lng'])
-            ).kilometers
-            
+        # 직선 거리 계산 (실제로는 도로 거리와 다름, 하루 코스의 구간 거리를 한 번에)
+        leg_distances = course_leg_distances(day_course, pair_distances) / 1000
+        
+        for distance in leg_distances.tolist():
             # 도로 거리 추정 (직선 거리의 1.3배로 가정)
             road_distance = distance * 1.3
             time_hours = road_distance / speed
@@ -3396,16 +3412,11 @@ def show_course_page():
         change_page("menu")
         st.rerun()
     
-    # 자동으로 데이터 로드 (아직 로드되지 않은 경우)
-    if not st.session_state.markers_loaded or not st.session_state.all_markers:
-        with st.spinner(current_lang_texts["map_loading_data"]):
-            all_markers = load_excel_files(st.session_state.language)
-            if all_markers:
-                st.session_state.all_markers = all_markers
-                st.session_state.markers_loaded = True
-                st.session_state.tourism_data = all_markers
-            else:
-                st.warning(current_lang_texts["map_load_failed"])
+    # 공유 POI 저장소 조회 (프로세스 내 최초 1회만 데이터 로드)
+    with st.spinner(current_lang_texts["map_loading_data"]):
+        poi_store = get_poi_store()
+    if not poi_store:
+        st.warning(current_lang_texts["map_load_failed"])
     
     # AI 추천 아이콘 및 소개
     col1, col2 = st.columns([1, 5])
@@ -3465,6 +3476,29 @@ def show_course_page():
             if st.checkbox(style, key="style_" + style):
                 selected_styles.append(style)
     
+    # 선택한 여행 스타일의 카테고리 장소가 주변에 많은 숙소 (미리 계산한 호텔 × POI 집계로 바로 순위 계산)
+    hotel_proximity = get_hotel_proximity(poi_store) if poi_store and selected_styles else None
+    if hotel_proximity is not None:
+        with st.expander("🏨 " + current_lang_texts["course_hotels_title"]):
+            # 화면의 스타일 목록은 STYLE_CATEGORY_WEIGHTS 와 같은 순서 (언어와 무관하게 가중치를 찾음)
+            style_weights = dict(zip(travel_styles, STYLE_CATEGORY_WEIGHTS.values()))
+            weights = {}
+            for style in selected_styles:
+                for category, weight in style_weights[style].items():
+                    weights[category] = weights.get(category, 0.0) + weight
+            
+            hotel_radius = st.select_slider(current_lang_texts["course_hotels_radius"], options=list(PROXIMITY_RADII_M),
+                                            value=1000, key="hotel_radius")
+            st.caption(current_lang_texts["course_hotels_caption"])
+            categories_translation = CATEGORIES_TRANSLATION.get(st.session_state.language, CATEGORIES_TRANSLATION["한국어"])
+            radius_index = hotel_proximity.radii.index(hotel_radius)
+            for rank, hotel in enumerate(hotel_proximity.rank(hotel_radius, weights, limit=5).tolist(), start=1):
+                counts = ", ".join(
+                    f"{categories_translation.get(category, category)} {int(hotel_proximity.counts[hotel, code, radius_index])}"
+                    for code, category in enumerate(CATEGORY_NAMES)
+                    if category in weights and hotel_proximity.counts[hotel, code, radius_index])
+                st.markdown(f"{rank}. **{hotel_proximity.names[hotel]}** ({hotel_proximity.locations[hotel]}) · {counts}")
+    
     # 교통 수단 선택 (개선됨)
     st.markdown("### 교통 수단 선택")
     
@@ -3499,10 +3533,12 @@ def show_course_page():
             with st.spinner(current_lang_texts["generating_course_spinner"]):
                 # 1단계: 기본 코스 추천
                 recommended_places, course_type, daily_courses = recommend_courses(
-                    st.session_state.all_markers if hasattr(st.session_state, 'all_markers') else [],
+                    poi_store.table,
                     selected_styles,
                     delta,
-                    include_children
+                    include_children,
+                    spatial_index=poi_store.spatial_index,
+                    pair_distances=poi_store.pairwise
                 )
                 
                 st.success(current_lang_texts["course_generation_complete"])
@@ -3534,145 +3570,187 @@ def show_course_page():
                             st.info("기본 순서로 코스를 표시합니다.")
                             optimized_courses = daily_courses
                 
-                # 4단계: 코스 표시
-                st.markdown("## " + current_lang_texts['recommended_course_title'])
-                st.markdown("**" + course_type + "** - " + str(delta) + "일 일정 (" + transport_options[transport_mode] + ")")
-                
-                # 5단계: 지도 표시 (새로운 방식!)
-                if optimized_courses and any(optimized_courses):
+                # 만든 코스는 세션에 보관 (경로 주변 장소 추가, 방문/저장 버튼으로 다시 실행돼도 유지)
+                st.session_state.course_plan = {
+                    "type": course_type,
+                    "days": delta,
+                    "date": start_date.strftime("%Y-%m-%d"),
+                    "styles": selected_styles,
+                    "transport_mode": transport_mode,
+                    "optimized": optimize_routes,
+                    "courses": optimized_courses
+                }
+    
+    course_plan = st.session_state.get("course_plan")
+    if course_plan:
+        course_type = course_plan["type"]
+        transport_mode = course_plan["transport_mode"]
+        optimized_courses = course_plan["courses"]
+        api_key = st.session_state.google_maps_api_key
+        
+        # 4단계: 코스 표시
+        st.markdown("## " + current_lang_texts['recommended_course_title'])
+        st.markdown("**" + course_type + "** - " + str(course_plan["days"]) + "일 일정 (" + transport_options[transport_mode] + ")")
+        
+        # 5단계: 지도 표시 (새로운 방식!)
+        if optimized_courses and any(optimized_courses):
+            
+            # 탭으로 정보 구분
+            tab1, tab2, tab3 = st.tabs(["🗺️ 지도", "📋 상세 일정", "🛍️ " + current_lang_texts["course_on_the_way"]])
+            
+            with tab1:
+                try:
+                    # 새로운 waypoints 기반 지도 표시
+                    map_html = create_waypoints_map_html(
+                        api_key=api_key,
+                        daily_courses=optimized_courses,
+                        transport_mode=transport_mode,
+                        language=st.session_state.language
+                    )
                     
-                    # 탭으로 정보 구분
-                    tab1, tab2 = st.tabs(["🗺️ 지도", "📋 상세 일정"])
+                    st.components.v1.html(map_html, height=600, scrolling=False)
                     
-                    with tab1:
-                        try:
-                            # 새로운 waypoints 기반 지도 표시
-                            map_html = create_waypoints_map_html(
-                                api_key=api_key,
-                                daily_courses=optimized_courses,
-                                transport_mode=transport_mode,
-                                language=st.session_state.language
-                            )
-                            
-                            st.components.v1.html(map_html, height=600, scrolling=False)
-                            
-                        except Exception as e:
-                            st.error("지도 표시 오류: " + str(e))
-                            st.error("기본 지도 표시로 전환합니다.")
+                except Exception as e:
+                    st.error("지도 표시 오류: " + str(e))
+                    st.error("기본 지도 표시로 전환합니다.")
+            
+            with tab2:
+                # 일별 상세 코스 표시
+                for day_idx, day_course in enumerate(optimized_courses):
+                    if not day_course:
+                        continue
+                        
+                    st.markdown("### 📅 Day " + str(day_idx + 1))
                     
-                    with tab2:
-                        # 일별 상세 코스 표시
-                        for day_idx, day_course in enumerate(optimized_courses):
-                            if not day_course:
-                                continue
-                                
-                            st.markdown("### 📅 Day " + str(day_idx + 1))
-                            
-                            # 하루 총 정보
-                            total_distance = 0
-                            total_duration = 0
-                            total_fare = 0
-                            
-                            for place in day_course:
-                                if 'route_info' in place:
-                                    ri = place['route_info']
-                                    total_distance += ri.get('distance', {}).get('value', 0)
-                                    total_duration += ri.get('duration', {}).get('value', 0)
-                                    total_fare += ri.get('fare', {}).get('value', 0)
-                            
-                            if show_detailed_info and total_distance > 0:
-                                col1, col2, col3 = st.columns(3)
-                                with col1:
-                                    st.metric("총 거리", "{:.1f} km".format(total_distance/1000))
-                                with col2:
-                                    st.metric("총 시간", "{:.0f} 분".format(total_duration//60))
-                                with col3:
-                                    if total_fare > 0:
-                                        st.metric("예상 요금", "₩{:,.0f}".format(total_fare))
+                    # 하루 총 정보
+                    total_distance = 0
+                    total_duration = 0
+                    total_fare = 0
+                    
+                    for place in day_course:
+                        if 'route_info' in place:
+                            ri = place['route_info']
+                            total_distance += ri.get('distance', {}).get('value', 0)
+                            total_duration += ri.get('duration', {}).get('value', 0)
+                            total_fare += ri.get('fare', {}).get('value', 0)
+                    
+                    if show_detailed_info and total_distance > 0:
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("총 거리", "{:.1f} km".format(total_distance/1000))
+                        with col2:
+                            st.metric("총 시간", "{:.0f} 분".format(total_duration//60))
+                        with col3:
+                            if total_fare > 0:
+                                st.metric("예상 요금", "₩{:,.0f}".format(total_fare))
+                    
+                    # 장소별 상세 정보
+                    for place_idx, place in enumerate(day_course):
+                        with st.container():
+                            col1, col2 = st.columns([3, 1])
                             
-                            # 장소별 상세 정보
-                            for place_idx, place in enumerate(day_course):
-                                with st.container():
-                                    col1, col2 = st.columns([3, 1])
-                                    
-                                    with col1:
-                                        # 시간대 표시
-                                        if place_idx == 0:
-                                            time_slot = "오전 (09:00-12:00)"
-                                        elif place_idx == 1:
-                                            time_slot = "오후 (13:00-16:00)"
-                                        else:
-                                            time_slot = "저녁 (16:00-19:00)"
-                                        
-                                        st.markdown("**" + str(place_idx + 1) + ". " + place['title'] + "** (" + time_slot + ")")
-                                        st.caption("분류: " + place.get('category', '관광지'))
-                                        
-                                        # 경로 정보 표시
-                                        if show_detailed_info and 'route_info' in place and place_idx < len(day_course) - 1:
-                                            ri = place['route_info']
-                                            if ri.get('distance', {}).get('text'):
-                                                st.caption("다음까지: " + ri['distance']['text'] + ", " + ri['duration']['text'])
-                                    
-                                    with col2:
-                                        # 방문 버튼 (실제 방문 기록용)
-                                        visit_key = "visit_" + str(day_idx) + "_" + str(place_idx)
-                                        if st.button("📍 방문", key=visit_key):
-                                            success, xp = add_visit(
-                                                st.session_state.username,
-                                                place['title'],
-                                                place['lat'],
-                                                place['lng']
-                                            )
-                                            if success:
-                                                st.success("'" + place['title'] + "' 방문 완료! +" + str(xp) + " XP")
-                                                time.sleep(1)
-                                                st.rerun()
-                                            else:
-                                                st.info("이미 오늘 방문한 장소입니다.")
+                            with col1:
+                                # 시간대 표시
+                                if place_idx == 0:
+                                    time_slot = "오전 (09:00-12:00)"
+                                elif place_idx == 1:
+                                    time_slot = "오후 (13:00-16:00)"
+                                else:
+                                    time_slot = "저녁 (16:00-19:00)"
+                                
+                                st.markdown("**" + str(place_idx + 1) + ". " + place['title'] + "** (" + time_slot + ")")
+                                st.caption("분류: " + place.get('category', '관광지'))
                                 
-                                if place_idx < len(day_course) - 1:
-                                    st.markdown("⬇️")
+                                # 경로 정보 표시
+                                if show_detailed_info and 'route_info' in place and place_idx < len(day_course) - 1:
+                                    ri = place['route_info']
+                                    if ri.get('distance', {}).get('text'):
+                                        st.caption("다음까지: " + ri['distance']['text'] + ", " + ri['duration']['text'])
                             
-                            st.markdown("---")
-                else:
-                    st.warning("코스 장소의 좌표 정보가 없어 지도에 표시할 수 없습니다.")
-                
-                # 6단계: 코스 저장 버튼
-                st.markdown("---")
-                if st.button(current_lang_texts["save_course_button"], use_container_width=True):
-                    if 'saved_courses' not in st.session_state:
-                        st.session_state.saved_courses = []
-                    
-                    # 코스 정보 저장
-                    course_info = {
-                        "type": course_type,
-                        "days": delta,
-                        "date": start_date.strftime("%Y-%m-%d"),
-                        "styles": selected_styles,
-                        "transport_mode": transport_mode,
-                        "optimized": optimize_routes
-                    }
+                            with col2:
+                                # 방문 버튼 (실제 방문 기록용)
+                                visit_key = "visit_" + str(day_idx) + "_" + str(place_idx)
+                                if st.button("📍 방문", key=visit_key):
+                                    success, xp = add_visit(
+                                        st.session_state.username,
+                                        place['title'],
+                                        place['lat'],
+                                        place['lng']
+                                    )
+                                    if success:
+                                        st.success("'" + place['title'] + "' 방문 완료! +" + str(xp) + " XP")
+                                        time.sleep(1)
+                                        st.rerun()
+                                    else:
+                                        st.info("이미 오늘 방문한 장소입니다.")
+                        
+                        if place_idx < len(day_course) - 1:
+                            st.markdown("⬇️")
                     
-                    if optimized_courses:
-                        course_info["daily_places"] = []
-                        for day in optimized_courses:
-                            day_places = []
-                            for place in day:
-                                place_info = {
-                                    "title": place['title'],
-                                    "category": place.get('category', ''),
-                                    "lat": place['lat'],
-                                    "lng": place['lng']
-                                }
-                                if 'route_info' in place:
-                                    place_info["route_info"] = place['route_info']
-                                day_places.append(place_info)
-                            course_info["daily_places"].append(day_places)
+                    st.markdown("---")
+            
+            with tab3:
+                # 경로 주변 들를 만한 곳 (카테고리별, 공유 공간 인덱스의 경로 주변 질의)
+                st.caption(current_lang_texts["course_on_the_way_caption"].format(width=COURSE_CORRIDOR_WIDTH_M))
+                categories_translation = CATEGORIES_TRANSLATION.get(st.session_state.language, CATEGORIES_TRANSLATION["한국어"])
+                for day_idx, day_course in enumerate(optimized_courses):
+                    if not day_course:
+                        continue
                     
-                    st.session_state.saved_courses.append(course_info)
-                    save_session_data()
+                    st.markdown("### 📅 Day " + str(day_idx + 1))
+                    stops = find_corridor_stops(poi_store.table, poi_store.spatial_index, day_course,
+                                                language=st.session_state.language)
+                    if not stops:
+                        st.info(current_lang_texts["course_on_the_way_empty"])
+                        continue
                     
-                    st.success(current_lang_texts["course_saved_success"])
+                    for code, places in stops.items():
+                        category = CATEGORY_NAMES[code]
+                        st.markdown(f"**{categories_translation.get(category, category)}**")
+                        for place in places:
+                            line = f"- {place['title']} · {place['distance_m']:.0f} m"
+                            if place['leg'] < len(day_course) - 1:
+                                line += f" ({day_course[place['leg']]['title']} → {day_course[place['leg'] + 1]['title']})"
+                            col1, col2 = st.columns([4, 1])
+                            with col1:
+                                st.markdown(line)
+                            with col2:
+                                # 구간 사이에 넣고 그날 경로를 다시 계산한 뒤 코스 전체를 다시 그린다
+                                if st.button(current_lang_texts["course_add_stop"], key=f"add_stop_{day_idx}_{place['poi_id']}"):
+                                    add_course_stop(course_plan, day_idx, place, api_key)
+                                    st.rerun()
+        else:
+            st.warning("코스 장소의 좌표 정보가 없어 지도에 표시할 수 없습니다.")
+        
+        # 6단계: 코스 저장 버튼
+        st.markdown("---")
+        if st.button(current_lang_texts["save_course_button"], use_container_width=True):
+            if 'saved_courses' not in st.session_state:
+                st.session_state.saved_courses = []
+            
+            # 코스 정보 저장
+            course_info = {key: value for key, value in course_plan.items() if key != "courses"}
+            
+            if optimized_courses:
+                course_info["daily_places"] = []
+                for day in optimized_courses:
+                    day_places = []
+                    for place in day:
+                        place_info = {
+                            "title": place['title'],
+                            "category": place.get('category', ''),
+                            "lat": place['lat'],
+                            "lng": place['lng']
+                        }
+                        if 'route_info' in place:
+                            place_info["route_info"] = place['route_info']
+                        day_places.append(place_info)
+                    course_info["daily_places"].append(day_places)
+            
+            st.session_state.saved_courses.append(course_info)
+            save_session_data()
+            
+            st.success(current_lang_texts["course_saved_success"])
 
 
 # 2. create_optimized_course_routes() 함수 추가
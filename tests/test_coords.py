@@ -0,0 +1,79 @@
+"""poi.coords 좌표계 변환/감지/축 교정 테스트 (기준점은 PROJ 9 로 계산한 값)"""
+import numpy as np
+import pytest
+
+from poi.coords import (PROJECTIONS, REFERENCE_POINTS, WGS84, check_reference_points, detect_projection,
+                        detect_swapped, normalize_coordinates, reference_tolerance_m, tm_to_wgs84)
+
+# 서울 영역 좌표 범위 (WGS84 경도/위도, UTM-K, 중부원점 TM(2010))
+SEOUL_RANGES = {
+    WGS84: ((126.76, 127.18), (37.41, 37.70)),
+    "EPSG:5179": ((935_000, 972_000), (1_935_000, 1_967_000)),
+    "EPSG:5186": ((180_000, 220_000), (530_000, 570_000)),
+}
+
+
+def _error_m(lat, lng, expected_lat, expected_lng):
+    return float(np.hypot((lat - expected_lat) * 111320.0,
+                          (lng - expected_lng) * 111320.0 * np.cos(np.radians(expected_lat))))
+
+
+def _seoul_sample(projection, rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    (x0, x1), (y0, y1) = SEOUL_RANGES[projection]
+    return rng.uniform(x0, x1, rows), rng.uniform(y0, y1, rows)
+
+
+@pytest.mark.parametrize("name, lat, lng, projection, x, y", [
+    (name, lat, lng, projection, x, y)
+    for name, lat, lng, projected in REFERENCE_POINTS
+    for projection, (x, y) in projected.items()
+])
+def test_reference_point_within_tolerance(name, lat, lng, projection, x, y):
+    got_lat, got_lng = tm_to_wgs84(x, y, projection)
+    tolerance_m = reference_tolerance_m(lng - PROJECTIONS[projection]["lon0"])
+    assert _error_m(got_lat, got_lng, lat, lng) <= tolerance_m
+
+
+def test_check_reference_points_passes():
+    assert check_reference_points() == []
+
+
+@pytest.mark.parametrize("projection", [WGS84, "EPSG:5179", "EPSG:5186"])
+def test_detect_projection_from_sample_ranges(projection):
+    x, y = _seoul_sample(projection)
+    assert detect_projection(x, y) == projection
+
+
+def test_tm_column_swapped_is_detected_and_corrected():
+    x, y = _seoul_sample("EPSG:5186")
+    lng, lat, projection, swapped = normalize_coordinates(x, y)
+    assert (projection, swapped) == ("EPSG:5186", 0)
+    assert not detect_swapped(x, y, "EPSG:5186")
+
+    # 뒤바뀐 TM 좌표도 한국 영역 사각형 안(바다)으로 역변환되지만, 데이터 단위로 판별해 모두 교정
+    assert detect_swapped(y, x, "EPSG:5186")
+    swapped_lng, swapped_lat, swapped_projection, swapped_rows = normalize_coordinates(y, x)
+    assert (swapped_projection, swapped_rows) == ("EPSG:5186", len(x))
+    np.testing.assert_array_equal(swapped_lat, lat)
+    np.testing.assert_array_equal(swapped_lng, lng)
+
+
+def test_utmk_column_swapped_rows_are_corrected_per_row():
+    x, y = _seoul_sample("EPSG:5179")
+    expected_lng, expected_lat, _, _ = normalize_coordinates(x, y, "EPSG:5179")
+
+    flipped = np.arange(len(x)) % 3 == 0
+    mixed_x, mixed_y = np.where(flipped, y, x), np.where(flipped, x, y)
+    lng, lat, projection, swapped = normalize_coordinates(mixed_x, mixed_y)
+    assert (projection, swapped) == ("EPSG:5179", int(flipped.sum()))
+    np.testing.assert_array_equal(lat, expected_lat)
+    np.testing.assert_array_equal(lng, expected_lng)
+    assert not detect_swapped(mixed_x, mixed_y, "EPSG:5179")  # 행마다 교정하는 좌표계
+
+
+def test_wgs84_swapped_rows_are_corrected_per_row():
+    lng, lat, projection, swapped = normalize_coordinates(np.array([126.978, 37.5665]), np.array([37.5665, 126.978]))
+    assert (projection, swapped) == (WGS84, 1)
+    np.testing.assert_array_equal(lat, [37.5665, 37.5665])
+    np.testing.assert_array_equal(lng, [126.978, 126.978])